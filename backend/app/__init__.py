@@ -4,6 +4,7 @@ from app.extensions import db, cors
 from config import config
 from sqlalchemy.exc import InvalidRequestError
 from flask_migrate import Migrate
+from app.commands import register_commands
 
 # Initialize Flask-Migrate
 migrate = Migrate()
@@ -43,6 +44,17 @@ def create_app(config_name="default"):
     # Register blueprints
     register_blueprints(app)
 
+    # Register CLI commands
+    register_commands(app)
+
+    # Build in-process indexes at worker start
+    build_indexes(app)
+
+    # Optional in-process background jobs. Email workers are not started
+    # here: run `flask email-worker` (or call start_email_workers from the
+    # serving process) so CLI commands and every gunicorn worker don't open SMTP pollers
+    start_scheduler(app)
+
     return app
 
 
@@ -51,11 +63,60 @@ def register_extensions(app):
     db.init_app(app)
     migrate.init_app(app, db)
 
+    from app.services.token_revocation import RevokedTokenSet
+    app.extensions["revoked_tokens"] = RevokedTokenSet(app.config["REVOKED_TOKEN_POLL_SECONDS"])
+
+    from app.utils import rate_limit_store
+    app.extensions["rate_limit_store"] = rate_limit_store(app.config["RATELIMIT_STORAGE_URL"])
+
     # Avoid auto-creating tables on every app start in production
     # Only use db.create_all() in development, not in production.
     if not app.config["DEBUG"]:
+        from app.services.search_backends import ensure_search_index
         with app.app_context():
             db.create_all()  # This is fine in dev, but prefer migrations in production
+            ensure_search_index()
+
+def build_indexes(app):
+    """Load in-memory lookup structures from the database."""
+    from app.services.suggest_index import book_suggest_index
+    with app.app_context():
+        book_suggest_index.rebuild()
+
+def start_scheduler(app):
+    """Start the in-process housekeeping sweeper if an interval is configured."""
+    interval = app.config.get("OVERDUE_SWEEP_INTERVAL_SECONDS")
+    if not interval:
+        return
+    from app.utils import PeriodicTask
+    from app.services import OverdueService, HoldService, BlocklistService
+
+    def sweep():
+        with app.app_context():
+            OverdueService.sweep()
+            HoldService.expire_ready()
+            # A few batches per run, so a large backlog never holds up the overdue sweep
+            BlocklistService.purge_expired(max_batches=10)
+            db.session.remove()
+
+    task = PeriodicTask("overdue-sweeper", interval, sweep)
+    app.extensions["overdue_sweeper"] = task
+    task.start()
+
+def start_email_workers(app, workers=None):
+    """
+    Start `workers` email outbox threads (default EMAIL_WORKERS) and return
+    the pool, or None if there are none to start. Never called by create_app.
+    """
+    workers = app.config.get("EMAIL_WORKERS") if workers is None else workers
+    if not workers:
+        return None
+    from app.services.email_outbox_service import OutboxWorkerPool
+
+    pool = OutboxWorkerPool(app, workers, app.config["EMAIL_BATCH_SIZE"], app.config["EMAIL_POLL_SECONDS"])
+    app.extensions["email_outbox"] = pool
+    pool.start()
+    return pool
 
 def register_blueprints(app):
     """Register blueprints for your app."""
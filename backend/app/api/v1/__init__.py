@@ -7,4 +7,8 @@ from app.api.v1 import users  # This ensures the routes in users.py get register
 from app.api.v1 import auth  # This ensures the routes in auth.py get registered
 from app.api.v1 import book_routes  # This ensures the routes in book_routes.py get registered
 from app.api.v1 import member_routes  # This ensures the routes in member_routes.py get registered
-from app.api.v1 import transaction_routes  # This ensures the routes in transaction_routes.py get registered
\ No newline at end of file
+from app.api.v1 import transaction_routes  # This ensures the routes in transaction_routes.py get registered
+from app.api.v1 import metrics_routes  # This ensures the routes in metrics_routes.py get registered
+from app.api.v1 import export_routes  # This ensures the routes in export_routes.py get registered
+from app.api.v1 import report_routes  # This ensures the routes in report_routes.py get registered
+from app.api.v1 import hold_routes  # This ensures the routes in hold_routes.py get registered
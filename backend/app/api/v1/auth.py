@@ -1,6 +1,7 @@
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp
 from app.services.auth_service import AuthService
+from app.api.v1.rate_limiting import rate_limited
 from functools import wraps
 import os
 
@@ -29,7 +30,7 @@ def token_required(f):
             return jsonify({"status": "error", "message": "Invalid token type"}), 401
         
         # Add user_id to request
-        request.user_id = payload.get('sub')
+        request.user_id = int(payload.get('sub'))
         
         return f(*args, **kwargs)
     
@@ -37,6 +38,7 @@ def token_required(f):
 
 # Auth endpoints
 @api_v1_bp.route("/auth/register", methods=["POST"])
+@rate_limited("register")
 def register():
     """Register a new user."""
     try:
@@ -61,6 +63,7 @@ def register():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @api_v1_bp.route("/auth/login", methods=["POST"])
+@rate_limited("login", by_account=True)
 def login():
     """Login a user."""
     try:
@@ -84,6 +87,7 @@ def login():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @api_v1_bp.route("/auth/refresh", methods=["POST"])
+@rate_limited("refresh")
 def refresh():
     """Refresh access token."""
     try:
@@ -102,6 +106,7 @@ def refresh():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @api_v1_bp.route("/auth/forgot-password", methods=["POST"])
+@rate_limited("forgot_password", by_account=True)
 def forgot_password():
     """Initiate forgot password process."""
     try:
@@ -120,6 +125,7 @@ def forgot_password():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @api_v1_bp.route("/auth/reset-password", methods=["POST"])
+@rate_limited("reset_password")
 def reset_password():
     """Reset password using reset token."""
     try:
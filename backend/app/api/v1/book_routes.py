@@ -2,7 +2,11 @@
 
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp # Import the shared blueprint
-from app.services import BookService # Assuming your BookService is here
+from app.api.v1.conditional import versioned
+from app.api.v1.responses import write_response
+from app.services import BookService, ImportService # Assuming your BookService is here
+from app.services.import_service import detect_format, FORMATS
+from app.utils import parse_page_args, parse_id_list, get_upload_stream
 
 # Book endpoints
 
@@ -26,30 +30,71 @@ def create_book():
     except ValueError:
         return jsonify({"status": "error", "message": "total_stock must be an integer"}), 400
 
-    book_id = BookService.create_book(title, author, total_stock, isbn)
-
-    if book_id:
-        # Fetch the created book to return in the response
-        created_book = BookService.get_book(book_id)
-        print(created_book)
-        return jsonify({"status": "success", "data": created_book}), 201 # 201 Created
-    else:
-        # Service returns None on database error
-        return jsonify({"status": "error", "message": "Failed to create book"}), 500
+    result = BookService.create_book(title, author, total_stock, isbn)
+    return write_response(result, 201) # 201 Created
 
 
 @api_v1_bp.route("/books", methods=["GET"])
+@versioned('books')
 def get_all_books():
-    """Get all books."""
+    """
+    Get a page of books. Supports ?after=<id>&limit=<n>.
+    With ?ids=1,2,3 returns just those books, in that order.
+    """
+    if 'ids' in request.args:
+        return get_books_by_ids(request.args['ids'])
+
     try:
-        books = BookService.get_all_books()
-        return jsonify({"status": "success", "data": books}), 200
+        after, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        books, next_cursor = BookService.get_all_books(after=after, limit=limit)
+        return jsonify({"status": "success", "data": books, "next_cursor": next_cursor}), 200
     except Exception as e:
         # Catch any unexpected errors from the service
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@api_v1_bp.route("/books/batch", methods=["POST"])
+def get_books_batch():
+    """Get several books by id. Expects JSON body with 'ids': [int]; for lists too long for a URL."""
+    data = request.get_json(silent=True) or {}
+    return get_books_by_ids(data.get('ids'))
+
+
+def get_books_by_ids(raw_ids):
+    """Shared multi-get response for GET /books?ids= and POST /books/batch."""
+    try:
+        ids = parse_id_list(raw_ids)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        books, missing = BookService.get_books(ids)
+        return jsonify({"status": "success", "data": books, "missing": missing}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/books/availability", methods=["GET"])
+def get_books_availability():
+    """Get live available_stock for ?ids=1,2,3 as {id: available_stock}."""
+    try:
+        ids = parse_id_list(request.args.get('ids', ''))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        availability, missing = BookService.get_availability(ids)
+        return jsonify({"status": "success", "data": availability, "missing": missing}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @api_v1_bp.route("/books/<int:book_id>", methods=["GET"])
+@versioned('books')
 def get_book(book_id):
     """Get a specific book by ID."""
     try:
@@ -81,55 +126,71 @@ def update_book(book_id):
              return jsonify({"status": "error", "message": "total_stock must be an integer"}), 400
 
 
-    success = BookService.update_book(book_id, data) # Assuming update_book handles which fields to update
-
-    if success:
-        # Fetch the updated book to return
-        updated_book = BookService.get_book(book_id)
-        if updated_book:
-             return jsonify({"status": "success", "data": updated_book}), 200
-        else:
-             # Should not happen if update was successful but book vanished
-             return jsonify({"status": "error", "message": "Book updated but could not be retrieved"}), 500
-    else:
-        # The service layer should ideally provide a more specific reason for failure
-        # e.g., book not found, or cannot update stock due to issued books
-        # For simplicity here, returning a generic 400 or 404
-        book_exists = BookService.get_book(book_id)
-        if not book_exists:
-            return jsonify({"status": "error", "message": "Book not found"}), 404
-        else:
-            # Assume failure is due to business logic (e.g., trying to reduce stock below issued)
-            return jsonify({"status": "error", "message": "Failed to update book. Check for issued copies or invalid data."}), 400
+    result = BookService.update_book(book_id, data)
+    return write_response(result)
 
 
 @api_v1_bp.route("/books/<int:book_id>", methods=["DELETE"])
 def delete_book(book_id):
     """Delete a book."""
-    success = BookService.delete_book(book_id) # Assuming delete_book handles the check for issued copies
-
-    if success:
-        return jsonify({"status": "success", "message": "Book deleted successfully"}), 200
-    else:
-        # Service returns False if issued copies exist or book not found
-        book_exists = BookService.get_book(book_id)
-        if not book_exists:
-            return jsonify({"status": "error", "message": "Book not found"}), 404
-        else:
-            # If it exists but couldn't be deleted, it's likely due to issued copies
-            return jsonify({"status": "error", "message": "Cannot delete book: Copies are currently issued."}), 400 # Bad Request
+    result = BookService.delete_book(book_id)
+    return write_response(result)
 
 
 @api_v1_bp.route("/books/search", methods=["GET"])
+@versioned('books')
 def search_books():
-    """Search for books by title or author."""
+    """Search for books by title or author. Supports ?limit=<n>&offset=<n>."""
     query = request.args.get('q')
     if not query:
         return jsonify({"status": "error", "message": "Missing search query parameter 'q'"}), 400
 
     try:
-        books = BookService.search_books(query)
-        return jsonify({"status": "success", "data": books}), 200
+        limit = int(request.args.get('limit', 0)) or None
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"status": "error", "message": "'limit' and 'offset' must be integers"}), 400
+
+    try:
+        books, next_offset = BookService.search_books(query, limit=limit, offset=offset)
+        return jsonify({"status": "success", "data": books, "next_offset": next_offset}), 200
     except Exception as e:
         print(e)
-        return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/books/suggest", methods=["GET"])
+def suggest_books():
+    """Autocomplete books by title or author prefix. Supports ?limit=<n> (max 50)."""
+    prefix = request.args.get('prefix', '')
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+    except ValueError:
+        return jsonify({"status": "error", "message": "'limit' must be an integer"}), 400
+
+    try:
+        books = BookService.suggest_books(prefix, limit)
+        return jsonify({"status": "success", "data": books}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/books/import", methods=["POST"])
+def import_books():
+    """
+    Bulk import books from a CSV or NDJSON upload, upserting on ISBN.
+    Send the file as multipart field 'file' or as the raw request body;
+    pass ?format=csv|ndjson if it cannot be inferred.
+    """
+    stream, filename, mimetype = get_upload_stream(request)
+    fmt = request.args.get('format') or detect_format(filename, mimetype)
+    if fmt not in FORMATS:
+        return jsonify({"status": "error", "message": "Unsupported format. Use csv or ndjson."}), 415
+
+    try:
+        report = ImportService.import_books(stream, fmt)
+        return jsonify({"status": "success", "data": report}), 200
+    except UnicodeDecodeError:
+        return jsonify({"status": "error", "message": "Upload must be UTF-8 encoded"}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
@@ -0,0 +1,60 @@
+# app/api/v1/conditional.py
+
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.services import VersionService
+from app.services.entity_cache import sync_with_versions
+
+
+def versioned(*resources, time_relative=()):
+    """
+    Adds a strong ETag derived from the version counters of `resources`.
+
+    Query parameters named in `time_relative` make the response depend on
+    the clock rather than only on writes (e.g. ?overdue=true); requests
+    using them skip the ETag and always run the view.
+
+    The ETag covers the counters and the full request path (including the
+    query string), so every page and filter gets its own tag. When the
+    client's If-None-Match matches, a 304 is returned without calling the
+    view, so no list query runs and no JSON is serialized.
+
+    Versions are read before the view runs: if a write lands in between,
+    the response carries the older tag and the next request simply gets a
+    fresh 200, never a stale 304. Entity caches that are behind the
+    versions read are cleared first, so a body served from this worker's
+    cache is never older than its tag.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if any(request.args.get(name) for name in time_relative):
+                return f(*args, **kwargs)
+            try:
+                versions = VersionService.get_versions(resources)
+            except SQLAlchemyError:
+                db.session.rollback()
+                return f(*args, **kwargs)
+            sync_with_versions(versions)
+
+            key = ";".join(f"{name}={versions[name]}" for name in sorted(versions))
+            etag = hashlib.sha1(f"{key}|{request.full_path}".encode()).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            # Let browsers keep the body but revalidate on every use
+            response.cache_control.no_cache = True
+            return response
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,27 @@
+# app/api/v1/export_routes.py
+
+from flask import Response, jsonify, stream_with_context
+from app.api.v1 import api_v1_bp # Import the shared blueprint
+from app.services.export_service import ExportService, EXPORTS, EXPORT_FORMATS
+
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+@api_v1_bp.route("/export/<filename>", methods=["GET"])
+def export_resource(filename):
+    """
+    Stream a full export of books, members or transactions.
+    The filename picks the resource and format, e.g. transactions.csv or
+    members.ndjson; add .gz (books.csv.gz) for a gzip-compressed download.
+    """
+    compress = filename.endswith('.gz')
+    resource, _, fmt = filename[:-3 if compress else None].partition('.')
+    if resource not in EXPORTS:
+        return jsonify({"status": "error", "message": f"Unknown export: {resource}"}), 404
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"status": "error", "message": "Unsupported format. Use csv or ndjson."}), 415
+
+    body = stream_with_context(ExportService.iter_export(resource, fmt, compress=compress))
+    response = Response(body, mimetype='application/gzip' if compress else MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
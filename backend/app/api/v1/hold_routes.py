@@ -0,0 +1,101 @@
+# app/api/v1/hold_routes.py
+
+from flask import Response, request, jsonify, stream_with_context, current_app
+from app.api.v1 import api_v1_bp # Import the shared blueprint
+from app.api.v1.responses import write_response
+from app.extensions import db
+from app.services import HoldService
+from app.services.hold_service import hold_notifier
+
+# Longest a hold event stream sleeps before re-reading the hold. Covers
+# holds changed by another worker process, whose notifications never reach
+# this one, and keeps proxies from closing an idle connection.
+HOLD_EVENTS_RECHECK_SECONDS = 15
+
+
+@api_v1_bp.route("/books/<int:book_id>/holds", methods=["POST"])
+def place_hold(book_id):
+    """
+    Join the hold queue for a book. Expects JSON body with 'member_id': int.
+    If a copy is on the shelf it is set aside at once.
+    """
+    data = request.get_json(silent=True) or {}
+    member_id = data.get('member_id')
+    if not member_id:
+        return jsonify({"status": "error", "message": "Missing member_id"}), 400
+
+    result = HoldService.place_hold(book_id, member_id)
+    return write_response(result, 201)
+
+
+@api_v1_bp.route("/books/<int:book_id>/holds", methods=["GET"])
+def get_book_holds(book_id):
+    """Get a book's active holds: Ready ones first, then the waiting queue in order."""
+    try:
+        return jsonify({"status": "success", "data": HoldService.get_queue(book_id)}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/holds/<int:hold_id>", methods=["GET"])
+def get_hold(hold_id):
+    """Get a hold, with its queue position while it is waiting."""
+    try:
+        hold = HoldService.get_hold(hold_id)
+        if hold:
+            return jsonify({"status": "success", "data": hold}), 200
+        else:
+            return jsonify({"status": "error", "message": "Hold not found"}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/holds/<int:hold_id>", methods=["DELETE"])
+def cancel_hold(hold_id):
+    """Cancel a hold. A copy set aside for it passes to the next in the queue."""
+    result = HoldService.cancel_hold(hold_id)
+    return write_response(result)
+
+
+def hold_event(hold):
+    """Formats a hold as one server-sent event, serialised like the JSON API."""
+    return f"event: hold\ndata: {current_app.json.dumps(hold)}\n\n"
+
+
+@api_v1_bp.route("/holds/<int:hold_id>/events", methods=["GET"])
+def hold_events(hold_id):
+    """
+    Server-sent events for a hold, instead of polling the book.
+
+    Sends a `hold` event with the current state, and another whenever its
+    status or queue position changes. The stream ends once the hold is no
+    longer waiting (Ready, Fulfilled, Cancelled or Expired).
+    """
+    hold = HoldService.get_hold(hold_id)
+    if not hold:
+        return jsonify({"status": "error", "message": "Hold not found"}), 404
+
+    book_id = hold['book_id']
+
+    def stream():
+        sent = None
+        while True:
+            # Read the version before the hold, so a change in between wakes the wait below
+            version = hold_notifier.version(book_id)
+            hold = HoldService.get_hold(hold_id)
+            # Hand the connection back to the pool while waiting
+            db.session.close()
+            state = (hold['status'], hold.get('position'))
+            if state != sent:
+                yield hold_event(hold)
+                sent = state
+            if hold['status'] != 'Waiting':
+                return
+            if not hold_notifier.wait(book_id, version, HOLD_EVENTS_RECHECK_SECONDS):
+                yield ": keepalive\n\n"
+
+    db.session.close()
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
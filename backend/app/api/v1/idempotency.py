@@ -0,0 +1,91 @@
+# app/api/v1/idempotency.py
+
+import hashlib
+from functools import wraps
+from flask import request, jsonify, make_response, current_app
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.services import IdempotencyService
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def idempotent(f):
+    """
+    Honours an Idempotency-Key header on a write endpoint.
+
+    The first request with a key claims it and runs the view; its response
+    is stored for IDEMPOTENCY_KEY_TTL_SECONDS. A retry with the same key and
+    the same method, path and body gets the stored response back (with an
+    Idempotent-Replayed header) after a single primary-key read, without
+    running the view. The same key with a different request is rejected
+    with 422, and a retry while the first attempt is still running gets 409.
+
+    Server errors are not stored: the claim is released so the client can
+    retry. If the response cannot be stored, the client still gets it; the
+    claim then lapses after IDEMPOTENCY_CLAIM_LEASE_SECONDS and a retry
+    runs the view again. Requests without the header are passed straight
+    through.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"status": "error",
+                            "message": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+        digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+        digest.update(request.get_data())
+        fingerprint = digest.hexdigest()
+
+        try:
+            stored = IdempotencyService.get(key)
+            if stored is None:
+                stored = IdempotencyService.claim(key, fingerprint, current_app.config['IDEMPOTENCY_KEY_TTL_SECONDS'],
+                                                  current_app.config['IDEMPOTENCY_CLAIM_LEASE_SECONDS'])
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Idempotency key lookup failed: {e}")
+            return jsonify({"status": "error", "message": "Could not check the idempotency key"}), 500
+
+        if stored is not None:
+            if stored['fingerprint'] != fingerprint:
+                return jsonify({"status": "error",
+                                "message": f"{IDEMPOTENCY_HEADER} was already used for a different request"}), 422
+            if stored['status_code'] is None:
+                return jsonify({"status": "error",
+                                "message": "A request with this idempotency key is still in progress"}), 409
+            response = make_response(stored['response_body'], stored['status_code'])
+            response.mimetype = 'application/json'
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            finish(key, None)
+            raise
+        finish(key, response)
+        return response
+
+    return decorated
+
+
+def finish(key, response):
+    """
+    Stores a response for a claimed key, or releases the claim after a
+    server error. The view's own write has already committed, so a failure
+    here is logged and never replaces the real response.
+    """
+    try:
+        if response is None or response.status_code >= 500:
+            IdempotencyService.release(key)
+        else:
+            IdempotencyService.complete(key, response.status_code, response.get_data(as_text=True))
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print(f"Error storing idempotency key {key}: {e}")
@@ -2,7 +2,12 @@
 
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp # Import the shared blueprint
-from app.services import MemberService # Assuming your MemberService is here
+from app.api.v1.conditional import versioned
+from app.api.v1.idempotency import idempotent
+from app.api.v1.responses import write_response
+from app.services import MemberService, ImportService, FeeService, MemberStatsService # Assuming your MemberService is here
+from app.services.import_service import detect_format, FORMATS
+from app.utils import parse_page_args, parse_id_list, get_upload_stream
 
 # Member endpoints
 
@@ -17,30 +22,55 @@ def create_member():
     if not name:
         return jsonify({"status": "error", "message": "Missing required field: name"}), 400
 
-    member_id = MemberService.create_member(name, email, phone)
-    print(member_id)
-
-    if member_id:
-        # Fetch the created member to return
-        created_member = MemberService.get_member(member_id)
-        print(f"Created member: {created_member}")
-        return jsonify({"status": "success", "data": created_member}), 201 # 201 Created
-    else:
-        # Service returns None on database error or if email unique constraint fails
-        return jsonify({"status": "error", "message": "Failed to create member. Email might already exist."}), 500 # Or 409 Conflict for email
+    result = MemberService.create_member(name, email, phone)
+    return write_response(result, 201) # 201 Created
 
 
 @api_v1_bp.route("/members", methods=["GET"])
+@versioned('members')
 def get_all_members():
-    """Get all members."""
+    """
+    Get a page of members. Supports ?after=<id>&limit=<n>.
+    With ?ids=1,2,3 returns just those members, in that order.
+    """
+    if 'ids' in request.args:
+        return get_members_by_ids(request.args['ids'])
+
+    try:
+        after, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        members, next_cursor = MemberService.get_all_members(after=after, limit=limit)
+        return jsonify({"status": "success", "data": members, "next_cursor": next_cursor}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/members/batch", methods=["POST"])
+def get_members_batch():
+    """Get several members by id. Expects JSON body with 'ids': [int]; for lists too long for a URL."""
+    data = request.get_json(silent=True) or {}
+    return get_members_by_ids(data.get('ids'))
+
+
+def get_members_by_ids(raw_ids):
+    """Shared multi-get response for GET /members?ids= and POST /members/batch."""
+    try:
+        ids = parse_id_list(raw_ids)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
     try:
-        members = MemberService.get_all_members()
-        return jsonify({"status": "success", "data": members}), 200
+        members, missing = MemberService.get_members(ids)
+        return jsonify({"status": "success", "data": members, "missing": missing}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
 @api_v1_bp.route("/members/<int:member_id>", methods=["GET"])
+@versioned('members')
 def get_member(member_id):
     """Get a specific member by ID."""
     try:
@@ -61,45 +91,19 @@ def update_member(member_id):
          return jsonify({"status": "error", "message": "No update data provided"}), 400
 
     # Service handles which fields to update
-    success = MemberService.update_member(member_id, data)
-
-    if success:
-        # Fetch the updated member to return
-        updated_member = MemberService.get_member(member_id)
-        if updated_member:
-             return jsonify({"status": "success", "data": updated_member}), 200
-        else:
-             return jsonify({"status": "error", "message": "Member updated but could not be retrieved"}), 500
-    else:
-        # Assume failure is due to member not found or invalid data
-        member_exists = MemberService.get_member(member_id)
-        if not member_exists:
-            return jsonify({"status": "error", "message": "Member not found"}), 404
-        else:
-             # Could also be due to email unique constraint violation
-             return jsonify({"status": "error", "message": "Failed to update member. Email might already exist or invalid data."}), 400 # Or 409 Conflict
+    result = MemberService.update_member(member_id, data)
+    return write_response(result)
 
 
 @api_v1_bp.route("/members/<int:member_id>", methods=["DELETE"])
 def delete_member(member_id):
     """Delete a member."""
-    # Assuming delete_member in service handles checking debt and open transactions
-    success = MemberService.delete_member(member_id)
-
-    if success:
-        return jsonify({"status": "success", "message": "Member deleted successfully"}), 200
-    else:
-        # Service returns False if debt exists or open transactions exist, or member not found
-        member = MemberService.get_member(member_id)
-        if not member:
-             return jsonify({"status": "error", "message": "Member not found"}), 404
-        elif member.get('outstanding_debt', 0) > 0:
-             return jsonify({"status": "error", "message": f"Cannot delete member: Outstanding debt is KES {member['outstanding_debt']}."}), 400
-        else:
-             # Assume open transactions or other unexpected issue
-             return jsonify({"status": "error", "message": "Cannot delete member: Has open transactions or other issues."}), 400 # Bad Request
+    # The service checks debt and open transactions in the DELETE itself
+    result = MemberService.delete_member(member_id)
+    return write_response(result)
 
 @api_v1_bp.route("/members/<int:member_id>/debt", methods=["GET"])
+@versioned('members')
 def get_member_debt(member_id):
     """Get a member's outstanding debt."""
     try:
@@ -112,7 +116,35 @@ def get_member_debt(member_id):
         return jsonify({"status": "error", "message": str(e)}), 500
     
 
+@api_v1_bp.route("/members/<int:member_id>/summary", methods=["GET"])
+@versioned('members', 'transactions')
+def get_member_summary(member_id):
+    """Get a member's open, overdue and lifetime loan counts and current debt."""
+    try:
+        summary = MemberStatsService.get_summary(member_id)
+        if summary:
+            return jsonify({"status": "success", "data": summary}), 200
+        else:
+            return jsonify({"status": "error", "message": "Member not found"}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/members/<int:member_id>/projected-debt", methods=["GET"])
+def get_member_projected_debt(member_id):
+    """Get what a member would owe if they returned all open loans now."""
+    try:
+        projection = FeeService.get_projected_debt(member_id)
+        if projection is not None:
+            return jsonify({"status": "success", "data": projection}), 200
+        else:
+            return jsonify({"status": "error", "message": "Member not found"}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @api_v1_bp.route("/members/<int:member_id>/payment", methods=["POST"])
+@idempotent
 def record_member_payment(member_id):
     """
     Records a payment for a member, reducing their outstanding debt.
@@ -134,22 +166,25 @@ def record_member_payment(member_id):
     except (ValueError, TypeError):
          return jsonify({"status": "error", "message": "'amount' must be a valid number"}), 400
 
-    # Call the service method to record the payment
-    success, message = MemberService.record_payment(member_id, amount)
-
-    if success:
-        # On success, return a 200 OK response with the success message
-        return jsonify({"status": "success", "message": message}), 200
-    else:
-        # On failure, determine the appropriate status code based on the message
-        # If the message indicates a client-side issue (like invalid amount or member not found), use 4xx
-        # Otherwise, default to 500 for server-side errors
-        status_code = 400 # Default to Bad Request for client-side issues
-        if "Member with ID" in message and "not found" in message:
-             status_code = 404 # Not Found if member doesn't exist
-        elif "positive" in message and "amount" in message:
-             status_code = 400 # Bad Request for invalid amount
-        else:
-             status_code = 500 # Internal Server Error for unexpected issues
+    result = MemberService.record_payment(member_id, amount)
+    return write_response(result)
 
-        return jsonify({"status": "error", "message": message}), status_code
\ No newline at end of file
+@api_v1_bp.route("/members/import", methods=["POST"])
+def import_members():
+    """
+    Bulk import members from a CSV or NDJSON upload, upserting on email.
+    Send the file as multipart field 'file' or as the raw request body;
+    pass ?format=csv|ndjson if it cannot be inferred.
+    """
+    stream, filename, mimetype = get_upload_stream(request)
+    fmt = request.args.get('format') or detect_format(filename, mimetype)
+    if fmt not in FORMATS:
+        return jsonify({"status": "error", "message": "Unsupported format. Use csv or ndjson."}), 415
+
+    try:
+        report = ImportService.import_members(stream, fmt)
+        return jsonify({"status": "success", "data": report}), 200
+    except UnicodeDecodeError:
+        return jsonify({"status": "error", "message": "Upload must be UTF-8 encoded"}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
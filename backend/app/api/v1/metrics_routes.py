@@ -0,0 +1,52 @@
+# app/api/v1/metrics_routes.py
+
+from flask import Response
+from sqlalchemy.exc import SQLAlchemyError
+from app.api.v1 import api_v1_bp # Import the shared blueprint
+from app.extensions import db
+from app.services import BlocklistService
+from app.services.entity_cache import ENTITY_CACHES
+from app.services.token_revocation import revoked_tokens
+
+CACHE_METRICS = [
+    ('hits', 'counter', 'Entity cache lookups served from memory.'),
+    ('misses', 'counter', 'Entity cache lookups that went to the database.'),
+    ('evictions', 'counter', 'Entries evicted to respect the size bound.'),
+    ('invalidations', 'counter', 'Entries removed by writes.'),
+    ('size', 'gauge', 'Entries currently cached.'),
+]
+
+
+def format_metric(name, kind, help_text, samples):
+    """Formats one metric family in the Prometheus text exposition format."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return lines
+
+
+@api_v1_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Expose per-worker metrics in the Prometheus text format."""
+    stats = [cache.stats() for cache in ENTITY_CACHES]
+    lines = []
+    for field, kind, help_text in CACHE_METRICS:
+        suffix = "_total" if kind == "counter" else ""
+        lines += format_metric(
+            f"library_entity_cache_{field}{suffix}", kind, help_text,
+            [({"cache": s['name']}, s[field]) for s in stats]
+        )
+    lines += format_metric("library_revoked_tokens_cached", "gauge",
+                           "Revoked token ids held in this worker's memory.", [({}, len(revoked_tokens()))])
+    try:
+        blocklist = BlocklistService.get_stats()
+    except SQLAlchemyError:
+        db.session.rollback()
+    else:
+        lines += format_metric("library_token_blocklist_rows", "gauge",
+                               "Rows in the token blocklist table.", [({}, blocklist['total_rows'])])
+        lines += format_metric("library_token_blocklist_expired_rows", "gauge",
+                               "Token blocklist rows past their expiry, waiting to be purged.",
+                               [({}, blocklist['expired_rows'])])
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,64 @@
+# app/api/v1/rate_limiting.py
+
+from functools import wraps
+from flask import request, jsonify, current_app
+
+
+def client_ip():
+    """The client address; run behind ProxyFix if a proxy sets X-Forwarded-For."""
+    return request.remote_addr or 'unknown'
+
+
+def account_email():
+    """The account named in a JSON body's 'email' field, normalised, or None."""
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def parse_rate(value):
+    """Parses a 'count/seconds' rate such as '10/60' into (count, seconds)."""
+    count, _, seconds = value.partition('/')
+    return int(count), int(seconds)
+
+
+def rate_limited(name, by_ip=True, by_account=False):
+    """
+    Sliding-window rate limit for an endpoint, checked before the view runs,
+    so rejected requests never reach password hashing, SMTP or the database.
+
+    Limits come from config as 'count/seconds' strings:
+    RATELIMIT_<NAME>_IP per client address and RATELIMIT_<NAME>_ACCOUNT per
+    'email' in the JSON body. Over the limit, the response is 429 with a
+    Retry-After header. Counters live in the app's rate limit store
+    (RATELIMIT_STORAGE_URL), so a shared store makes workers agree.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not current_app.config.get('RATELIMIT_ENABLED', True):
+                return f(*args, **kwargs)
+            store = current_app.extensions['rate_limit_store']
+            checks = []
+            if by_ip:
+                checks.append(('IP', client_ip()))
+            if by_account:
+                email = account_email()
+                if email:
+                    checks.append(('ACCOUNT', email))
+            for scope, value in checks:
+                limit, window = parse_rate(current_app.config[f'RATELIMIT_{name.upper()}_{scope}'])
+                allowed, retry_after = store.hit(f"{name}:{scope.lower()}:{value}", limit, window)
+                if not allowed:
+                    response = jsonify({
+                        "status": "error",
+                        "message": f"Too many requests. Try again in {retry_after} seconds."
+                    })
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
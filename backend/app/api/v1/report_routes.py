@@ -0,0 +1,74 @@
+# app/api/v1/report_routes.py
+
+from datetime import date
+from flask import request, jsonify
+from app.api.v1 import api_v1_bp # Import the shared blueprint
+from app.services.report_service import ReportService
+
+# Most rows returned by the top-N reports
+MAX_REPORT_LIMIT = 100
+
+
+def parse_report_args(args):
+    """
+    Parses ?from=<date>&to=<date>&limit=<n> for the /reports endpoints.
+    Missing dates are left as None (the service defaults to the last 30 days).
+    Raises ValueError on invalid values.
+    """
+    window = {}
+    for name, key in (('from', 'since'), ('to', 'until')):
+        value = args.get(name)
+        try:
+            window[key] = date.fromisoformat(value) if value else None
+        except ValueError:
+            raise ValueError(f"'{name}' must be an ISO 8601 date (YYYY-MM-DD)")
+    if window['since'] and window['until'] and window['since'] > window['until']:
+        raise ValueError("'from' must not be after 'to'")
+    limit = args.get('limit')
+    try:
+        limit = int(limit) if limit else 10
+    except ValueError:
+        raise ValueError("'limit' must be an integer")
+    return window, max(1, min(limit, MAX_REPORT_LIMIT))
+
+
+@api_v1_bp.route("/reports/daily", methods=["GET"])
+def get_daily_report():
+    """Get issues, returns and fees charged per day. Supports ?from=&to=."""
+    try:
+        window, _ = parse_report_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        days = ReportService.get_daily(**window)
+        for day in days:
+            day['day'] = day['day'].isoformat()
+        return jsonify({"status": "success", "data": days}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/reports/top-books", methods=["GET"])
+def get_top_books_report():
+    """Get the most issued books. Supports ?from=&to=&limit=."""
+    try:
+        window, limit = parse_report_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        return jsonify({"status": "success", "data": ReportService.get_top_books(limit=limit, **window)}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@api_v1_bp.route("/reports/busiest-members", methods=["GET"])
+def get_busiest_members_report():
+    """Get the members with the most issues and returns. Supports ?from=&to=&limit=."""
+    try:
+        window, limit = parse_report_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        return jsonify({"status": "success", "data": ReportService.get_busiest_members(limit=limit, **window)}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
@@ -0,0 +1,30 @@
+# app/api/v1/responses.py
+
+from flask import jsonify
+from app.services import Outcome
+
+# HTTP status for each failed write outcome
+OUTCOME_STATUS = {
+    Outcome.NOT_FOUND: 404,
+    Outcome.CONFLICT: 409,
+    Outcome.HAS_OPEN_LOANS: 400,
+    Outcome.DEBT_OUTSTANDING: 400,
+    Outcome.UNAVAILABLE: 400,
+    Outcome.INVALID: 400,
+    Outcome.ERROR: 500,
+}
+
+
+def write_response(result, success_status=200):
+    """
+    Turns a service WriteResult into a JSON response.
+
+    Successful writes return the written row as `data`; failures return the
+    service message with the status mapped from the outcome.
+    """
+    if result.ok:
+        body = {"status": "success", "message": result.message}
+        if result.data is not None:
+            body["data"] = result.data
+        return jsonify(body), success_status
+    return jsonify({"status": "error", "message": result.message}), OUTCOME_STATUS[result.outcome]
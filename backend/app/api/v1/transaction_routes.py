@@ -1,12 +1,22 @@
 # app/api/v1/transaction_routes.py
 
+from datetime import date, datetime
 from flask import request, jsonify
 from app.api.v1 import api_v1_bp # Import the shared blueprint
-from app.services import TransactionService # Assuming your TransactionService is here
+from app.api.v1.conditional import versioned
+from app.api.v1.idempotency import idempotent
+from app.api.v1.responses import write_response
+from app.services import TransactionService, FeeService # Assuming your TransactionService is here
+from app.services.transaction_service import TRANSACTION_STATUSES, DATE_FILTERS
+from app.utils import parse_page_args, parse_id_list
+
+# Most items in one batch issue or return request
+MAX_BATCH_ITEMS = 50
 
 # Transaction endpoints
 
 @api_v1_bp.route("/transactions/issue", methods=["POST"])
+@idempotent
 def issue_book():
     """Issue a book to a member."""
     data = request.get_json()
@@ -16,72 +26,164 @@ def issue_book():
     if not book_id or not member_id:
         return jsonify({"status": "error", "message": "Missing book_id or member_id"}), 400
 
-    # Assuming service returns (success_boolean, message_string)
-    success, message = TransactionService.issue_book(book_id, member_id)
-
-    if success:
-        return jsonify({"status": "success", "message": message}), 201 # 201 Created
-    else:
-        # Service message contains the reason for failure (book unavailable, debt limit, not found)
-        status_code = 400 # Default bad request
-        if "not found" in message:
-            status_code = 404
-        elif "not available" in message or "debt" in message:
-             status_code = 400 # Business logic constraint
-        else:
-             status_code = 500 # Unexpected error
-
-        return jsonify({"status": "error", "message": message}), status_code
+    result = TransactionService.issue_book(book_id, member_id)
+    return write_response(result, 201) # 201 Created
 
 
 @api_v1_bp.route("/transactions/return/<int:transaction_id>", methods=["POST"]) # Using POST as it changes state
+@idempotent
 def return_book(transaction_id):
     """Process the return of a book transaction."""
 
-    # Assuming service returns (success_boolean, message_string)
-    success, message = TransactionService.return_book(transaction_id)
-
-    if success:
-        return jsonify({"status": "success", "message": message}), 200
-    else:
-        # Service message contains the reason for failure (not found, already returned)
-        status_code = 400 # Default bad request
-        if "not found" in message:
-            status_code = 404
-        elif "already returned" in message:
-             status_code = 400 # Bad request due to state
-        else:
-             status_code = 500 # Unexpected error
+    result = TransactionService.return_book(transaction_id)
+    return write_response(result)
+
+@api_v1_bp.route("/transactions/issue/batch", methods=["POST"])
+@idempotent
+def issue_books_batch():
+    """
+    Issue several books to one member in one go.
+    Expects JSON body with 'member_id': int and 'book_ids': [int].
+    """
+    data = request.get_json(silent=True) or {}
+    member_id = data.get('member_id')
+    if not member_id or not data.get('book_ids'):
+        return jsonify({"status": "error", "message": "Missing member_id or book_ids"}), 400
+    try:
+        # Repeats are kept: asking for the same title twice issues two copies
+        book_ids = [int(book_id) for book_id in data['book_ids']]
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "'book_ids' must be a list of integers"}), 400
+    if len(book_ids) > MAX_BATCH_ITEMS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BATCH_ITEMS} books per batch"}), 400
+
+    result = TransactionService.issue_books(member_id, book_ids)
+    return write_response(result)
+
+
+@api_v1_bp.route("/transactions/return/batch", methods=["POST"])
+@idempotent
+def return_books_batch():
+    """Process several returns in one go. Expects JSON body with 'transaction_ids': [int]."""
+    data = request.get_json(silent=True) or {}
+    try:
+        transaction_ids = parse_id_list(data.get('transaction_ids'))
+    except ValueError:
+        return jsonify({"status": "error", "message": "'transaction_ids' must be a list of integers"}), 400
+    if not transaction_ids:
+        return jsonify({"status": "error", "message": "Missing transaction_ids"}), 400
+    if len(transaction_ids) > MAX_BATCH_ITEMS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BATCH_ITEMS} returns per batch"}), 400
 
-        return jsonify({"status": "error", "message": message}), status_code
+    result = TransactionService.return_books(transaction_ids)
+    return write_response(result)
 
 # Optional: Get all transactions, or filter in different ways
 
+def parse_bool(value, name):
+    """Parses a true/false query parameter."""
+    lowered = value.lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValueError(f"'{name}' must be true or false")
+
+
+def parse_date_or_datetime(value, name):
+    """
+    Parses an ISO 8601 date or datetime. A bare date stays a date, so the
+    filters can treat it as the whole day.
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO 8601 date or datetime")
+
+
+def parse_transaction_filters(args):
+    """
+    Parses the /transactions filter parameters into a filters dict.
+    Raises ValueError on invalid values.
+    """
+    filters = {}
+    status = args.get('status')
+    if status:
+        if status not in TRANSACTION_STATUSES:
+            raise ValueError(f"'status' must be one of: {', '.join(TRANSACTION_STATUSES)}")
+        filters['status'] = status
+    for name in ('is_returned', 'overdue'):
+        if args.get(name):
+            filters[name] = parse_bool(args[name], name)
+    for name in ('member_id', 'book_id'):
+        if args.get(name):
+            try:
+                filters[name] = int(args[name])
+            except ValueError:
+                raise ValueError(f"'{name}' must be an integer")
+    for name in DATE_FILTERS:
+        if args.get(name):
+            filters[name] = parse_date_or_datetime(args[name], name)
+    return filters
+
+
 @api_v1_bp.route("/transactions", methods=["GET"])
+@versioned('transactions', 'books', 'members', time_relative=('overdue',))
 def get_all_transactions():
-    """Get all transactions."""
-    # You might want pagination or filtering for a large number of transactions
+    """
+    Get a page of transactions. Supports ?after=<id>&limit=<n>&order=asc|desc
+    and the filters status, is_returned, member_id, book_id, issued_from,
+    issued_to, returned_from, returned_to and overdue=true.
+    """
+    order = request.args.get('order', 'desc')
     try:
-        transactions = TransactionService.get_all_transactions() # You'll need to add this method to TransactionService
-        return jsonify({"status": "success", "data": transactions}), 200
+        after, limit = parse_page_args(request.args)
+        filters = parse_transaction_filters(request.args)
+        if order not in ('asc', 'desc'):
+            raise ValueError("'order' must be asc or desc")
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        transactions, next_cursor = TransactionService.get_all_transactions(
+            after=after, limit=limit, filters=filters, order=order
+        )
+        return jsonify({"status": "success", "data": transactions, "next_cursor": next_cursor}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api_v1_bp.route("/transactions/liability", methods=["GET"])
+def get_outstanding_liability():
+    """Get the total fees owed if every open loan were returned now."""
+    try:
+        return jsonify({"status": "success", "data": FeeService.get_outstanding_liability()}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @api_v1_bp.route("/transactions/member/<int:member_id>", methods=["GET"])
+@versioned('transactions', 'books')
 def get_transactions_by_member(member_id):
-    """Get transactions for a specific member."""
+    """
+    Get a page of a member's transactions, newest first, including archived
+    history. Supports ?after=<id>&limit=<n>.
+    """
     try:
-        transactions = TransactionService.get_transactions_by_member(member_id)
-        # Service returns list (empty if none), handle potential None if get_member fails within service
-        if transactions is not None:
-             return jsonify({"status": "success", "data": transactions}), 200
-        else:
-            # This case might be hit if the member ID is invalid and the service checks this
-             return jsonify({"status": "error", "message": "Could not retrieve transactions, check member ID"}), 404 # Or 500 if it's a db error
+        after, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        transactions, next_cursor = TransactionService.get_transactions_by_member(member_id, after=after, limit=limit)
+        return jsonify({"status": "success", "data": transactions, "next_cursor": next_cursor}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @api_v1_bp.route("/transactions/open/member/<int:member_id>", methods=["GET"])
+@versioned('transactions', 'books')
 def get_open_transactions_by_member(member_id):
     """Get open (not returned) transactions for a specific member."""
     try:
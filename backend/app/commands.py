@@ -0,0 +1,159 @@
+# app/commands.py
+
+import click
+from flask.cli import with_appcontext
+
+
+@click.command("search-index")
+@with_appcontext
+def search_index_command():
+    """Create the book full-text search index for the current database."""
+    from app.services.search_backends import ensure_search_index
+    ensure_search_index()
+    click.echo("Book search index is up to date.")
+
+
+@click.command("sweep-overdue")
+@click.option("--batch-size", default=500, show_default=True, help="Open loans updated per batch.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches; the next run resumes.")
+@with_appcontext
+def sweep_overdue_command(batch_size, max_batches):
+    """Mark overdue loans and refresh their accrued fees."""
+    from app.services import OverdueService
+    stats = OverdueService.sweep(batch_size=batch_size, max_batches=max_batches)
+    state = "complete" if stats['completed'] else "paused"
+    click.echo(f"Overdue sweep {state}: {stats['scanned']} loans scanned, "
+               f"{stats['newly_overdue']} newly overdue, {stats['batches']} batches.")
+
+
+@click.command("archive-transactions")
+@click.option("--older-than-days", type=int, default=None,
+              help="Archive loans returned more than this many days ago (default: ARCHIVE_AFTER_DAYS).")
+@click.option("--batch-size", default=1000, show_default=True, help="Transactions moved per batch.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches.")
+@with_appcontext
+def archive_transactions_command(older_than_days, batch_size, max_batches):
+    """Move old returned transactions into transactions_archive."""
+    from flask import current_app
+    from app.services import ArchiveService
+    if older_than_days is None:
+        older_than_days = current_app.config["ARCHIVE_AFTER_DAYS"]
+    stats = ArchiveService.archive_returned(older_than_days, batch_size=batch_size, max_batches=max_batches)
+    state = "complete" if stats['completed'] else "paused"
+    click.echo(f"Archive {state}: {stats['archived']} transactions moved in {stats['batches']} batches.")
+
+
+@click.command("rebuild-member-stats")
+@with_appcontext
+def rebuild_member_stats_command():
+    """Recompute the member_stats loan counters from transactions."""
+    from app.services import MemberStatsService
+    count = MemberStatsService.rebuild()
+    click.echo(f"Member stats rebuilt for {count} members.")
+
+
+@click.command("rebuild-reports")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), required=True, help="First day to rebuild.")
+@click.option("--until", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="Last day to rebuild (default: today).")
+@with_appcontext
+def rebuild_reports_command(since, until):
+    """Recompute the daily report rollups for a date range."""
+    from datetime import date
+    from app.services import ReportService
+    since = since.date()
+    until = until.date() if until else date.today()
+    ReportService.rebuild(since, until)
+    click.echo(f"Report rollups rebuilt for {since} to {until}.")
+
+
+@click.command("purge-idempotency-keys")
+@click.option("--batch-size", default=1000, show_default=True, help="Keys deleted per batch.")
+@with_appcontext
+def purge_idempotency_keys_command(batch_size):
+    """Delete expired Idempotency-Key responses."""
+    from app.services import IdempotencyService
+    deleted = IdempotencyService.purge_expired(batch_size=batch_size)
+    click.echo(f"Purged {deleted} expired idempotency keys.")
+
+
+@click.command("expire-holds")
+@with_appcontext
+def expire_holds_command():
+    """Expire Ready holds past their pickup window and pass the copies on."""
+    from app.services import HoldService
+    expired = HoldService.expire_ready()
+    click.echo(f"Expired {expired} holds.")
+
+
+@click.command("purge-token-blocklist")
+@click.option("--batch-size", default=500, show_default=True, help="Rows deleted per batch.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches.")
+@click.option("--pause", default=0.0, show_default=True, help="Seconds to sleep between batches.")
+@with_appcontext
+def purge_token_blocklist_command(batch_size, max_batches, pause):
+    """Delete token blocklist rows whose token has expired."""
+    from app.services import BlocklistService
+    stats = BlocklistService.purge_expired(batch_size=batch_size, max_batches=max_batches, pause=pause)
+    state = "complete" if stats['completed'] else "paused"
+    click.echo(f"Blocklist purge {state}: {stats['purged']} rows deleted in {stats['batches']} batches.")
+
+
+@click.command("send-emails")
+@click.option("--batch-size", default=20, show_default=True, help="Messages sent per SMTP session batch.")
+@with_appcontext
+def send_emails_command(batch_size):
+    """Send every email in the outbox that is due, then exit."""
+    from flask import current_app
+    from app.services.email_outbox_service import EmailOutboxService, BREAKER_FAILURES, BREAKER_RESET_SECONDS
+    from app.services.mailer import SmtpSender
+    from app.utils import CircuitBreaker
+    sender = SmtpSender.from_config(current_app.config)
+    breaker = CircuitBreaker("smtp", BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+    claimed = 0
+    try:
+        while breaker.state == CircuitBreaker.CLOSED:
+            batch = EmailOutboxService.deliver_batch(sender, breaker, batch_size)
+            if not batch:
+                break
+            claimed += batch
+    finally:
+        sender.close()
+    click.echo(f"Processed {claimed} outbox messages over {sender.connections_opened} SMTP connections.")
+
+
+@click.command("email-worker")
+@click.option("--workers", type=int, default=None, help="Sender threads. Defaults to EMAIL_WORKERS.")
+@with_appcontext
+def email_worker_command(workers):
+    """Run the email outbox workers in the foreground until interrupted."""
+    import signal
+    import threading
+    from flask import current_app
+    from app import start_email_workers
+    pool = start_email_workers(current_app._get_current_object(), workers)
+    if pool is None:
+        raise click.UsageError("No email workers to run; set EMAIL_WORKERS or pass --workers.")
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stopping.set())
+    click.echo(f"Sending email with {pool.workers} workers. Press Ctrl+C to stop.")
+    try:
+        stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop(timeout=30)
+    click.echo("Email workers stopped.")
+
+
+def register_commands(app):
+    """Register Flask CLI commands."""
+    app.cli.add_command(search_index_command)
+    app.cli.add_command(sweep_overdue_command)
+    app.cli.add_command(archive_transactions_command)
+    app.cli.add_command(rebuild_member_stats_command)
+    app.cli.add_command(rebuild_reports_command)
+    app.cli.add_command(purge_idempotency_keys_command)
+    app.cli.add_command(expire_holds_command)
+    app.cli.add_command(purge_token_blocklist_command)
+    app.cli.add_command(send_emails_command)
+    app.cli.add_command(email_worker_command)
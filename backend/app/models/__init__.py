@@ -1,4 +1,11 @@
 from .user import User
 from .book_model import Book
-from .transaction_model import Transaction
-from .member_model import Member
\ No newline at end of file
+from .transaction_model import Transaction, TransactionArchive
+from .member_model import Member
+from .resource_version import ResourceVersion
+from .job_checkpoint import JobCheckpoint
+from .member_stats import MemberStats
+from .report_rollups import DailyCirculation, DailyBookIssues, DailyMemberActivity
+from .idempotency_key import IdempotencyKey
+from .hold import Hold
+from .email_outbox import EmailOutbox
@@ -0,0 +1,28 @@
+from app.extensions import db
+
+class Hold(db.Model):
+    """
+    A member's place in the queue for a book.
+
+    Waiting holds are served oldest first; a Ready hold has a copy set aside
+    until expires_at.
+    """
+    __tablename__ = 'holds'
+    id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='Waiting')
+    created_at = db.Column(db.DateTime, nullable=False)
+    ready_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # FIFO head of a book's queue, and a member's ready hold on a book
+        db.Index('ix_holds_book_status_id', 'book_id', 'status', 'id'),
+        db.Index('ix_holds_member_status', 'member_id', 'status'),
+        # Ready holds past their pickup window
+        db.Index('ix_holds_status_expires_at', 'status', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<Hold(id={self.id}, book_id={self.book_id}, member_id={self.member_id}, status='{self.status}')>"
@@ -0,0 +1,19 @@
+from app.extensions import db
+
+class IdempotencyKey(db.Model):
+    """
+    Stored response for a client-supplied Idempotency-Key.
+    A row with no status_code is a placeholder for a request still running;
+    once its claimed_until has passed, another request may take the key over.
+    """
+    __tablename__ = 'idempotency_keys'
+    idempotency_key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    claimed_until = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(key='{self.idempotency_key}', status_code={self.status_code})>"
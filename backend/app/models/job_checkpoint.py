@@ -0,0 +1,11 @@
+from app.extensions import db
+
+class JobCheckpoint(db.Model):
+    """Progress marker for a batched background job, so an interrupted run resumes where it stopped."""
+    __tablename__ = 'job_checkpoints'
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<JobCheckpoint(name='{self.name}', last_id={self.last_id})>"
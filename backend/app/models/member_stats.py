@@ -0,0 +1,12 @@
+from app.extensions import db
+
+class MemberStats(db.Model):
+    """Per-member loan counters, kept current by the circulation writes."""
+    __tablename__ = 'member_stats'
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id'), primary_key=True)
+    open_loans = db.Column(db.Integer, nullable=False, default=0)
+    overdue_loans = db.Column(db.Integer, nullable=False, default=0)
+    lifetime_loans = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MemberStats(member_id={self.member_id}, open_loans={self.open_loans})>"
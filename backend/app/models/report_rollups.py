@@ -0,0 +1,35 @@
+from app.extensions import db
+
+class DailyCirculation(db.Model):
+    """Issues, returns and fees charged per day."""
+    __tablename__ = 'daily_circulation'
+    day = db.Column(db.Date, primary_key=True)
+    issues = db.Column(db.Integer, nullable=False, default=0)
+    returns = db.Column(db.Integer, nullable=False, default=0)
+    fees_charged = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyCirculation(day={self.day}, issues={self.issues}, returns={self.returns})>"
+
+
+class DailyBookIssues(db.Model):
+    """Issues per book per day, for top-borrowed titles."""
+    __tablename__ = 'daily_book_issues'
+    day = db.Column(db.Date, primary_key=True)
+    book_id = db.Column(db.Integer, primary_key=True)
+    issues = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyBookIssues(day={self.day}, book_id={self.book_id}, issues={self.issues})>"
+
+
+class DailyMemberActivity(db.Model):
+    """Issues and returns per member per day, for the busiest members."""
+    __tablename__ = 'daily_member_activity'
+    day = db.Column(db.Date, primary_key=True)
+    member_id = db.Column(db.Integer, primary_key=True)
+    issues = db.Column(db.Integer, nullable=False, default=0)
+    returns = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyMemberActivity(day={self.day}, member_id={self.member_id}, issues={self.issues})>"
@@ -0,0 +1,14 @@
+from app.extensions import db
+
+class ResourceVersion(db.Model):
+    """
+    Monotonic write counter per API resource, used to build ETags. Each
+    resource's counter is split over a few shard rows; its version is their sum.
+    """
+    __tablename__ = 'resource_versions'
+    resource = db.Column(db.String(50), primary_key=True)
+    shard = db.Column(db.SmallInteger, primary_key=True, default=0)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ResourceVersion(resource='{self.resource}', shard={self.shard}, version={self.version})>"
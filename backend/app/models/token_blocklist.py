@@ -10,7 +10,8 @@ class TokenBlocklist(db.Model):
     token_type = db.Column(db.String(10), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    # Purged once past, so the table only holds tokens that are still valid
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     
     def __repr__(self):
         return f"<TokenBlocklist {self.jti}>"
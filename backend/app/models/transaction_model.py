@@ -8,13 +8,48 @@ class Transaction(db.Model):
     issue_date = db.Column(db.DateTime, nullable=False)
     return_date = db.Column(db.DateTime, nullable=True)
     fee_charged = db.Column(db.Numeric(10, 2), default=0.00)
+    accrued_fee = db.Column(db.Numeric(10, 2), default=0.00, server_default='0') # Kept current for open loans by the overdue sweeper
     is_returned = db.Column(db.Boolean, default=False)
     status = db.Column(db.String(50), default='Issued') # e.g., 'Issued', 'Returned', 'Overdue'
 
+    # Indexes for the filtered /transactions feed; each ends in id so the
+    # keyset ORDER BY id can be read straight off the index
+    __table_args__ = (
+        db.Index('ix_transactions_member_id_id', 'member_id', 'id'),
+        db.Index('ix_transactions_book_id_id', 'book_id', 'id'),
+        db.Index('ix_transactions_status_id', 'status', 'id'),
+        db.Index('ix_transactions_is_returned_issue_date', 'is_returned', 'issue_date'),
+        db.Index('ix_transactions_is_returned_return_date', 'is_returned', 'return_date'),
+        # Never reuse ids: archived rows keep theirs, so a reused id would collide
+        {'sqlite_autoincrement': True},
+    )
+
     # Optional: Relationships if you plan to use ORM for simple fetches
     # book = db.relationship('Book', backref=db.backref('transactions', lazy=True))
     # member = db.relationship('Member', backref=db.backref('transactions', lazy=True))
 
 
     def __repr__(self):
-        return f"<Transaction(book_id={self.book_id}, member_id={self.member_id}, status='{self.status}')>"
\ No newline at end of file
+        return f"<Transaction(book_id={self.book_id}, member_id={self.member_id}, status='{self.status}')>"
+
+
+class TransactionArchive(db.Model):
+    """Returned transactions moved out of the hot table by the archive job. Ids are kept."""
+    __tablename__ = 'transactions_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id'), nullable=False)
+    issue_date = db.Column(db.DateTime, nullable=False)
+    return_date = db.Column(db.DateTime, nullable=True)
+    fee_charged = db.Column(db.Numeric(10, 2), default=0.00)
+    accrued_fee = db.Column(db.Numeric(10, 2), default=0.00, server_default='0')
+    is_returned = db.Column(db.Boolean, default=True)
+    status = db.Column(db.String(50), default='Returned')
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_transactions_archive_member_id_id', 'member_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f"<TransactionArchive(id={self.id}, book_id={self.book_id}, member_id={self.member_id})>"
\ No newline at end of file
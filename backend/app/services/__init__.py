@@ -2,4 +2,17 @@ from .member_service import MemberService
 from .auth_service import AuthService
 from .user_service import UserService
 from .book_service import BookService
-from .transaction_service import TransactionService
\ No newline at end of file
+from .transaction_service import TransactionService
+from .import_service import ImportService
+from .version_service import VersionService
+from .overdue_service import OverdueService
+from .fee_service import FeeService
+from .archive_service import ArchiveService
+from .export_service import ExportService
+from .member_stats_service import MemberStatsService
+from .report_service import ReportService
+from .idempotency_service import IdempotencyService
+from .hold_service import HoldService
+from .blocklist_service import BlocklistService
+from .email_outbox_service import EmailOutboxService
+from .outcomes import Outcome, WriteResult
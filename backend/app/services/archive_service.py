@@ -0,0 +1,78 @@
+# app/services/archive_service.py
+
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam, DateTime
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from .checkpoint_service import CheckpointService
+from .version_service import VersionService
+
+# Checkpoint holding the highest id ever archived. History pages whose ids
+# are all above it never need to look at the archive.
+ARCHIVE_WATERMARK = 'transactions_archive'
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_COLUMNS = "id, book_id, member_id, issue_date, return_date, fee_charged, accrued_fee, is_returned, status"
+
+
+class ArchiveService:
+    """
+    Service class for the hot/cold split of transactions.
+
+    Returned transactions past the configured age are moved from
+    `transactions` to `transactions_archive` with their ids, so the hot table
+    holds mostly open loans and recent history.
+    """
+
+    @staticmethod
+    def archive_returned(older_than_days, batch_size=ARCHIVE_BATCH_SIZE, max_batches=None, now=None):
+        """
+        Moves returned transactions whose return_date is older than
+        `older_than_days` into the archive, oldest ids first.
+
+        Each batch copies and deletes up to `batch_size` rows and raises the
+        archive watermark in one database transaction, so an interrupted run
+        leaves nothing half-moved. Returns a dict with 'archived', 'batches'
+        and 'completed'.
+        """
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=older_than_days)
+        stats = {'archived': 0, 'batches': 0, 'completed': False}
+
+        select_sql = text("""
+            SELECT id FROM transactions
+            WHERE is_returned = TRUE AND return_date < :cutoff
+            ORDER BY id
+            LIMIT :batch_size
+        """).bindparams(bindparam('cutoff', type_=DateTime))
+        copy_sql = text(f"""
+            INSERT INTO transactions_archive ({ARCHIVE_COLUMNS}, archived_at)
+            SELECT {ARCHIVE_COLUMNS}, :archived_at FROM transactions WHERE id IN :ids
+        """).bindparams(bindparam('ids', expanding=True), bindparam('archived_at', type_=DateTime))
+        delete_sql = text("""
+            DELETE FROM transactions WHERE id IN :ids
+        """).bindparams(bindparam('ids', expanding=True))
+
+        try:
+            watermark = CheckpointService.get(ARCHIVE_WATERMARK)
+            while max_batches is None or stats['batches'] < max_batches:
+                ids = db.session.execute(select_sql, {'cutoff': cutoff, 'batch_size': batch_size}).scalars().all()
+                if not ids:
+                    stats['completed'] = True
+                    break
+                db.session.execute(copy_sql, {'ids': ids, 'archived_at': now})
+                db.session.execute(delete_sql, {'ids': ids})
+                watermark = max(watermark, ids[-1])
+                CheckpointService.save(ARCHIVE_WATERMARK, watermark, now)
+                VersionService.bump('transactions')
+                db.session.commit()
+                stats['batches'] += 1
+                stats['archived'] += len(ids)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Archive error: {e}")
+        return stats
+
+    @staticmethod
+    def get_watermark():
+        """Returns the highest archived transaction id (0 if nothing is archived)."""
+        return CheckpointService.get(ARCHIVE_WATERMARK)
@@ -1,15 +1,18 @@
 import jwt
 import datetime
+import hashlib
+import time
 import uuid
 from datetime import timedelta, timezone
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from flask import current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.exc import SQLAlchemyError
 from app.extensions import db
 from app.models.user import User
 from app.models.token_blocklist import TokenBlocklist
+from app.services.token_revocation import revoked_tokens
+from app.services.entity_cache import verified_token_cache
+from app.services.email_outbox_service import EmailOutboxService
 import os
 
 class AuthService:
@@ -101,7 +104,7 @@ class AuthService:
                 return {"status": "error", "message": "Invalid token type"}, 401
             
             # Get user
-            user_id = payload.get('sub')
+            user_id = int(payload.get('sub'))
             user = User.query.get(user_id)
             
             if not user or not user.is_active:
@@ -146,54 +149,28 @@ class AuthService:
             baseServerUrl = os.environ.get('BASE_SERVER_URL', 'http://localhost:5000/api/v1')
             reset_url = f"{baseServerUrl}/auth/reset-password/{reset_token}"
             
-            # Send email with reset link
-            try:
-                # Email configuration
-                my_email = os.environ.get('EMAIL_USER')
-                password = os.environ.get('EMAIL_PASSWORD')
-                
-                # Create message
-                msg = MIMEMultipart()
-                msg['To'] = email
-                msg['Subject'] = "Password Reset Request"
-                msg['From'] = my_email
-                
-                # Create email body
-                body = f"""
-                Hello {user.username},
-                
-                You recently requested to reset your password. Please click the link below to reset it:
-                
-                {reset_url}
-                
-                This link will expire in 1 hour.
-                
-                If you did not request a password reset, please ignore this email.
-                
-                Regards,
-                Your Application Team
-                """
-                
-                msg.attach(MIMEText(body, 'plain', 'utf-8'))
-                
-                # Send email
-                with smtplib.SMTP('smtp.gmail.com', 587) as connection:
-                    connection.starttls()
-                    connection.login(my_email, password)
-                    connection.sendmail(my_email, email, msg.as_string())
-                
-                return {
-                    "status": "success",
-                    "message": "Password reset email sent. Please check your inbox."
-                }, 200
-                
-            except Exception as e:
-                # Log the email sending error but don't expose details to client
-                print(f"Email sending error: {str(e)}")
-                return {
-                    "status": "error", 
-                    "message": "Failed to send reset email. Please try again later."
-                }, 500
+            # Queue the email with the reset link; the outbox workers send it
+            body = f"""
+            Hello {user.username},
+            
+            You recently requested to reset your password. Please click the link below to reset it:
+            
+            {reset_url}
+            
+            This link will expire in 1 hour.
+            
+            If you did not request a password reset, please ignore this email.
+            
+            Regards,
+            Your Application Team
+            """
+            EmailOutboxService.enqueue(email, "Password Reset Request", body,
+                                       sender=current_app.config.get('MAIL_USERNAME'))
+            
+            return {
+                "status": "success",
+                "message": "Password reset email sent. Please check your inbox."
+            }, 200
             
         except Exception as e:
             return {"status": "error", "message": str(e)}, 500
@@ -203,14 +180,14 @@ class AuthService:
         """Reset password using reset token."""
         try:
             # Decode reset token
-            payload = jwt.decode(reset_token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+            payload = AuthService.decode_token(reset_token)
             
             # Check if token type is reset
             if payload.get('type') != 'reset':
                 return {"status": "error", "message": "Invalid token type"}, 401
             
             # Get user
-            user_id = payload.get('sub')
+            user_id = int(payload.get('sub'))
             user = User.query.get(user_id)
             
             if not user:
@@ -238,7 +215,7 @@ class AuthService:
         """Generate JWT access token."""
         jti = str(uuid.uuid4())  # Generate a unique token ID
         payload = {
-            'sub': user_id,
+            'sub': str(user_id),  # PyJWT requires a string subject
             'type': 'access',
             'jti': jti,  # JWT ID for token revocation
             'iat': datetime.datetime.now(timezone.utc),
@@ -251,7 +228,7 @@ class AuthService:
         """Generate JWT refresh token."""
         jti = str(uuid.uuid4())  # Generate a unique token ID
         payload = {
-            'sub': user_id,
+            'sub': str(user_id),  # PyJWT requires a string subject
             'type': 'refresh',
             'jti': jti,  # JWT ID for token revocation
             'iat': datetime.datetime.now(timezone.utc),
@@ -263,22 +240,42 @@ class AuthService:
     def generate_password_reset_token(user_id):
         """Generate password reset token."""
         payload = {
-            'sub': user_id,
+            'sub': str(user_id),  # PyJWT requires a string subject
             'type': 'reset',
             'iat': datetime.datetime.now(timezone.utc),
             'exp': datetime.datetime.now(timezone.utc) + datetime.timedelta(hours=1)  # Short expiry for security
         }
         return jwt.encode(payload, AuthService.JWT_SECRET, algorithm=AuthService.JWT_ALGORITHM)
 
+    @staticmethod
+    def decode_token(token):
+        """
+        Verify a JWT and return its payload, raising jwt.InvalidTokenError as
+        jwt.decode does.
+
+        Verified payloads are cached by the token's sha256 until the token's
+        exp, so later requests with the same token skip the HMAC check.
+        """
+        if not isinstance(token, str):
+            return jwt.decode(token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        payload = verified_token_cache.get(digest)
+        if payload is None:
+            payload = jwt.decode(token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+            ttl = payload.get('exp', 0) - time.time()
+            if ttl > 0:
+                verified_token_cache.set(digest, payload, ttl)
+        return dict(payload)
+
     @staticmethod
     def validate_token(token):
         """Validate JWT token."""
         try:
-            payload = jwt.decode(token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+            payload = AuthService.decode_token(token)
             
-            # Check if token is revoked
+            # Check if token is revoked, against the in-memory revoked set
             jti = payload.get('jti')
-            if jti and TokenBlocklist.is_token_revoked(jti):
+            if jti and revoked_tokens().is_revoked(jti):
                 return None  # Token is revoked
                 
             return payload
@@ -292,12 +289,12 @@ class AuthService:
         """Revoke a token."""
         try:
             # Decode token
-            payload = jwt.decode(token, AuthService.JWT_SECRET, algorithms=[AuthService.JWT_ALGORITHM])
+            payload = AuthService.decode_token(token)
             
             # Get token data
             jti = payload.get('jti')
             token_type = payload.get('type')
-            user_id = payload.get('sub')
+            user_id = int(payload.get('sub'))
             exp = datetime.datetime.fromtimestamp(payload.get('exp'))
             
             # Add token to blocklist
@@ -310,6 +307,7 @@ class AuthService:
             
             db.session.add(revoked_token)
             db.session.commit()
+            revoked_tokens().add(jti, exp)
             
             return {
                 "status": "success",
@@ -0,0 +1,60 @@
+# app/services/blocklist_service.py
+
+import time
+from datetime import datetime
+from sqlalchemy import text, bindparam, DateTime
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+
+# Small batches keep each delete's locks short on a busy blocklist
+PURGE_BATCH_SIZE = 500
+
+
+class BlocklistService:
+    """Service class for housekeeping of the token_blocklist table."""
+
+    @staticmethod
+    def purge_expired(batch_size=PURGE_BATCH_SIZE, max_batches=None, pause=0, now=None):
+        """
+        Deletes blocklist rows whose token has expired, oldest expiry
+        first, `batch_size` rows per committed batch. An expired token is
+        rejected on its exp claim alone, so its row is no longer needed.
+
+        `pause` sleeps between batches to leave room for other writers.
+        Returns a dict with 'purged', 'batches' and 'completed'.
+        """
+        now = now or datetime.now()
+        stats = {'purged': 0, 'batches': 0, 'completed': False}
+        select_sql = text("""
+            SELECT id FROM token_blocklist WHERE expires_at <= :now ORDER BY expires_at LIMIT :batch_size
+        """).bindparams(bindparam('now', type_=DateTime))
+        delete_sql = text("""
+            DELETE FROM token_blocklist WHERE id IN :ids
+        """).bindparams(bindparam('ids', expanding=True))
+
+        try:
+            while max_batches is None or stats['batches'] < max_batches:
+                ids = db.session.execute(select_sql, {'now': now, 'batch_size': batch_size}).scalars().all()
+                if not ids:
+                    stats['completed'] = True
+                    break
+                db.session.execute(delete_sql, {'ids': ids})
+                db.session.commit()
+                stats['purged'] += len(ids)
+                stats['batches'] += 1
+                if pause:
+                    time.sleep(pause)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Token blocklist purge failed: {e}")
+        return stats
+
+    @staticmethod
+    def get_stats(now=None):
+        """Returns the blocklist's row count and how many of those rows are expired."""
+        row = db.session.execute(text("""
+            SELECT COUNT(*) AS total_rows,
+                (SELECT COUNT(*) FROM token_blocklist WHERE expires_at <= :now) AS expired_rows
+            FROM token_blocklist
+        """).bindparams(bindparam('now', type_=DateTime)), {'now': now or datetime.now()}).mappings().fetchone()
+        return dict(row)
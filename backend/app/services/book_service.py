@@ -1,38 +1,85 @@
 # app/services/book_service.py
 
-from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from .. import db
+from app.utils import clamp_page_size, supports_returning, chunks, DEFAULT_PAGE_SIZE
+from .search_backends import get_search_backend, tokenize_query, LikeSearchBackend
+from .suggest_index import book_suggest_index
+from .entity_cache import book_cache, availability_cache, record_availability
+from .version_service import VersionService
+from .outcomes import Outcome, WriteResult
+
+BOOK_COLUMNS = "id, title, author, isbn, total_stock, available_stock"
+
+
+def stock_clamp_sql(new_total, old_available, old_total):
+    """SQL expression that moves available stock by the change in total, clamped to 0..new total."""
+    adjusted = f"{old_available} + {new_total} - {old_total}"
+    return (f"CASE WHEN {adjusted} < 0 THEN 0 "
+            f"WHEN {adjusted} > {new_total} THEN {new_total} "
+            f"ELSE {adjusted} END")
+
 
 class BookService:
     """Service class for book operations in the library."""
 
     @staticmethod
     def create_book(title, author, total_stock, isbn=None):
-        """Creates a new book record."""
-        sql = text("""
+        """
+        Creates a new book record.
+
+        Returns a WriteResult whose data is the new book row (read back with
+        RETURNING where the dialect supports it), or CONFLICT if the ISBN
+        already exists.
+        """
+        sql = """
         INSERT INTO books (title, author, isbn, total_stock, available_stock)
         VALUES (:title, :author, :isbn, :total_stock, :available_stock)
-        """)
+        """
+        params = {
+            'title': title,
+            'author': author,
+            'isbn': isbn,
+            'total_stock': total_stock,
+            'available_stock': total_stock
+        }
         try:
-            db.session.execute(sql, {
-                'title': title,
-                'author': author,
-                'isbn': isbn,
-                'total_stock': total_stock,
-                'available_stock': total_stock
-            })
+            if supports_returning('insert'):
+                row = db.session.execute(text(sql + f" RETURNING {BOOK_COLUMNS}"), params).mappings().fetchone()
+                book = dict(row)
+            else:
+                result = db.session.execute(text(sql), params)
+                book = BookService._load_book(result.lastrowid)
+            VersionService.bump('books')
             db.session.commit()
-            result = db.session.execute(text("SELECT LAST_INSERT_ID()")).fetchone()
-            return result[0] if result else None
+            BookService._cache_book(book)
+            return WriteResult(Outcome.OK, book, "Book created successfully")
+        except IntegrityError:
+            db.session.rollback()
+            return WriteResult(Outcome.CONFLICT, message="A book with this ISBN already exists.")
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Error creating book: {e}")
-            return None
+            return WriteResult(Outcome.ERROR, message="Failed to create book")
+
+    @staticmethod
+    def _cache_book(book):
+        """Refreshes the in-process lookup structures after a committed write."""
+        book_cache.invalidate(book['id'])
+        book_cache.set(book['id'], book)
+        record_availability(book['id'], book['available_stock'])
+        book_suggest_index.add(book['id'], book['title'], book['author'])
 
     @staticmethod
     def get_book(book_id):
-        """Retrieves a book by its ID."""
+        """Retrieves a book by its ID, reading through the entity cache."""
+        book = book_cache.get_or_load(book_id, lambda: BookService._load_book(book_id))
+        return dict(book) if book else None
+
+    @staticmethod
+    def _load_book(book_id):
+        """Reads a book row from the database."""
         sql = text("""
         SELECT id, title, author, isbn, total_stock, available_stock
         FROM books WHERE id = :book_id
@@ -41,78 +88,198 @@ class BookService:
         return dict(result) if result else None
 
     @staticmethod
-    def get_all_books():
-        """Retrieves all books."""
-        sql = text("SELECT id, title, author, isbn, total_stock, available_stock FROM books")
-        results = db.session.execute(sql).mappings().fetchall()
-        return [dict(row) for row in results]
+    def get_books(book_ids):
+        """
+        Retrieves several books by id.
+
+        Cache hits are served first; the rest are read with one
+        `WHERE id IN (...)` query per chunk of ids. Returns a tuple
+        (books, missing_ids), with books in the order the ids were given.
+        """
+        found = book_cache.get_or_load_many(book_ids, BookService._load_books)
+        books = [dict(found[book_id]) for book_id in book_ids if book_id in found]
+        missing = [book_id for book_id in book_ids if book_id not in found]
+        return books, missing
+
+    @staticmethod
+    def _load_books(book_ids):
+        """Reads book rows for the given ids, returning a dict keyed by id."""
+        sql = text("""
+        SELECT id, title, author, isbn, total_stock, available_stock
+        FROM books WHERE id IN :book_ids
+        """).bindparams(bindparam('book_ids', expanding=True))
+        books = {}
+        for chunk in chunks(book_ids):
+            for row in db.session.execute(sql, {'book_ids': chunk}).mappings():
+                books[row['id']] = dict(row)
+        return books
 
     @staticmethod
-    def update_book(book_id, data):
-        """Updates a book record."""
+    def get_availability(book_ids):
+        """
+        Returns (availability, missing_ids), where availability maps each
+        known book id to its available_stock.
+
+        Served from the availability map; misses are read with one narrow
+        `SELECT id, available_stock ... IN (...)` per chunk of ids.
+        """
+        availability = availability_cache.get_or_load_many(book_ids, BookService._load_availability)
+        missing = [book_id for book_id in book_ids if book_id not in availability]
+        return availability, missing
+
+    @staticmethod
+    def _load_availability(book_ids):
+        """Reads available_stock for the given ids, returning a dict keyed by id."""
         sql = text("""
-        UPDATE books
-        SET title = :title, author = :author, isbn = :isbn,
-            total_stock = :total_stock, available_stock = :available_stock
-        WHERE id = :book_id
+        SELECT id, available_stock FROM books WHERE id IN :book_ids
+        """).bindparams(bindparam('book_ids', expanding=True))
+        availability = {}
+        for chunk in chunks(book_ids):
+            for book_id, available_stock in db.session.execute(sql, {'book_ids': chunk}):
+                availability[book_id] = available_stock
+        return availability
+
+    @staticmethod
+    def get_all_books(after=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Retrieves one page of books ordered by id.
+
+        Uses keyset pagination: only books with an id greater than `after`
+        are returned. Returns a tuple (books, next_cursor), where next_cursor
+        is None on the last page.
+        """
+        limit = clamp_page_size(limit)
+        where = "WHERE id > :after" if after is not None else ""
+        sql = text(f"""
+        SELECT id, title, author, isbn, total_stock, available_stock
+        FROM books
+        {where}
+        ORDER BY id
+        LIMIT :limit
         """)
+        results = db.session.execute(sql, {'after': after, 'limit': limit + 1}).mappings().fetchall()
+        books = [dict(row) for row in results[:limit]]
+        next_cursor = books[-1]['id'] if len(results) > limit else None
+        return books, next_cursor
+
+    @staticmethod
+    def update_book(book_id, data):
+        """
+        Updates a book record in a single statement.
+
+        Only fields present in `data` are changed. When total_stock changes,
+        available_stock moves by the same amount, clamped to 0..total_stock,
+        computed in SQL from the row's current values. Returns a WriteResult
+        with the updated row, NOT_FOUND or CONFLICT (duplicate ISBN).
+        """
+        updates = []
+        params = {'book_id': book_id}
+        for field in ('title', 'author', 'isbn'):
+            if field in data:
+                updates.append(f"{field} = :{field}")
+                params[field] = data[field]
+        if 'total_stock' in data:
+            # available_stock is assigned first: MySQL evaluates SET left to right
+            updates.append("available_stock = " + stock_clamp_sql(':total_stock', 'available_stock', 'total_stock'))
+            updates.append("total_stock = :total_stock")
+            params['total_stock'] = data['total_stock']
+
+        if not updates:
+            book = BookService.get_book(book_id)
+            if not book:
+                return WriteResult(Outcome.NOT_FOUND, message="Book not found")
+            return WriteResult(Outcome.OK, book, "Nothing to update")
+
+        sql = f"UPDATE books SET {', '.join(updates)} WHERE id = :book_id"
         try:
-            current_book = BookService.get_book(book_id)
-            if not current_book:
-                return False
-
-            old_total = current_book['total_stock']
-            old_available = current_book['available_stock']
-            new_total = data.get('total_stock', old_total)
-            stock_diff = new_total - old_total
-            new_available = old_available + stock_diff
-            new_available = max(0, min(new_available, new_total))
-
-            db.session.execute(sql, {
-                'book_id': book_id,
-                'title': data.get('title', current_book['title']),
-                'author': data.get('author', current_book['author']),
-                'isbn': data.get('isbn', current_book['isbn']),
-                'total_stock': new_total,
-                'available_stock': new_available
-            })
+            if supports_returning('update'):
+                row = db.session.execute(text(sql + f" RETURNING {BOOK_COLUMNS}"), params).mappings().fetchone()
+                book = dict(row) if row else None
+            else:
+                result = db.session.execute(text(sql), params)
+                book = BookService._load_book(book_id) if result.rowcount else None
+            if not book:
+                db.session.rollback()
+                return WriteResult(Outcome.NOT_FOUND, message="Book not found")
+            VersionService.bump('books')
             db.session.commit()
-            return True
+            BookService._cache_book(book)
+            return WriteResult(Outcome.OK, book, "Book updated successfully")
+        except IntegrityError:
+            db.session.rollback()
+            return WriteResult(Outcome.CONFLICT, message="A book with this ISBN already exists.")
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Error updating book {book_id}: {e}")
-            return False
+            return WriteResult(Outcome.ERROR, message="Failed to update book")
 
     @staticmethod
     def delete_book(book_id):
-        """Deletes a book record if no issued copies are outstanding."""
-        issued_sql = text("""
-        SELECT COUNT(*) FROM transactions
-        WHERE book_id = :book_id AND is_returned = FALSE
-        """)
-        result = db.session.execute(issued_sql, {'book_id': book_id}).fetchone()
-        if result and result[0] > 0:
-            print(f"Cannot delete book {book_id}: {result[0]} copies are currently issued.")
-            return False
+        """
+        Deletes a book record if no issued copies are outstanding.
 
-        sql = text("DELETE FROM books WHERE id = :book_id")
+        The open-loan check is part of the DELETE itself; the reason is only
+        looked up when nothing was deleted. Returns a WriteResult with
+        NOT_FOUND or HAS_OPEN_LOANS on failure.
+        """
+        sql = text("""
+        DELETE FROM books
+        WHERE id = :book_id
+        AND NOT EXISTS (
+            SELECT 1 FROM transactions WHERE book_id = :book_id AND is_returned = FALSE
+        )
+        """)
         try:
-            db.session.execute(sql, {'book_id': book_id})
+            result = db.session.execute(sql, {'book_id': book_id})
+            if result.rowcount == 0:
+                db.session.rollback()
+                if BookService._load_book(book_id) is None:
+                    return WriteResult(Outcome.NOT_FOUND, message="Book not found")
+                return WriteResult(Outcome.HAS_OPEN_LOANS, message="Cannot delete book: Copies are currently issued.")
+            VersionService.bump('books')
             db.session.commit()
-            return True
+            book_cache.invalidate(book_id)
+            availability_cache.invalidate(book_id)
+            book_suggest_index.remove(book_id)
+            return WriteResult(Outcome.OK, {'id': book_id}, "Book deleted successfully")
+        except IntegrityError:
+            db.session.rollback()
+            return WriteResult(Outcome.CONFLICT, message="Cannot delete book: It has transaction history.")
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Error deleting book {book_id}: {e}")
-            return False
+            return WriteResult(Outcome.ERROR, message="Failed to delete book")
 
     @staticmethod
-    def search_books(query):
-        """Searches books by title or author."""
-        sql = text("""
-        SELECT id, title, author, isbn, total_stock, available_stock
-        FROM books
-        WHERE title LIKE :query OR author LIKE :query
-        """)
-        search_term = f"%{query}%"
-        results = db.session.execute(sql, {'query': search_term}).mappings().fetchall()
-        return [dict(row) for row in results]
+    def search_books(query, limit=DEFAULT_PAGE_SIZE, offset=0):
+        """
+        Searches books by title or author using the database's full-text index.
+
+        Results are ranked by relevance. Returns a tuple (books, next_offset),
+        where next_offset is None on the last page.
+        """
+        terms = tokenize_query(query)
+        if not terms:
+            return [], None
+
+        limit = clamp_page_size(limit)
+        offset = max(0, int(offset or 0))
+        backend = get_search_backend()
+        try:
+            results = backend.search(terms, limit + 1, offset)
+        except SQLAlchemyError as e:
+            # The full-text index may not exist yet (e.g. before the first
+            # migration); degrade to a LIKE scan rather than failing.
+            db.session.rollback()
+            print(f"Full-text search unavailable, falling back to LIKE: {e}")
+            results = LikeSearchBackend().search(terms, limit + 1, offset)
+
+        books = [dict(row) for row in results[:limit]]
+        next_offset = offset + limit if len(results) > limit else None
+        return books, next_offset
+
+    @staticmethod
+    def suggest_books(prefix, limit=10):
+        """Returns the top `limit` books whose title or author matches `prefix`."""
+        book_suggest_index.ensure_fresh()
+        return book_suggest_index.suggest(prefix, limit)
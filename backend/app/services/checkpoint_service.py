@@ -0,0 +1,30 @@
+# app/services/checkpoint_service.py
+
+from sqlalchemy import text, bindparam, DateTime
+from app.extensions import db
+from app.utils import upsert_sql
+
+
+class CheckpointService:
+    """Service class for background job progress markers (the job_checkpoints table)."""
+
+    @staticmethod
+    def get(name):
+        """Returns the last id recorded for a job, or 0 if it has none."""
+        last_id = db.session.execute(text("""
+            SELECT last_id FROM job_checkpoints WHERE name = :name
+        """), {'name': name}).scalar()
+        return last_id or 0
+
+    @staticmethod
+    def save(name, last_id, now):
+        """
+        Records a job's progress as one upsert, so two runs creating the row
+        cannot collide. Does not commit, so the checkpoint lands in the same
+        transaction as the batch it describes.
+        """
+        db.session.execute(text(
+            upsert_sql('job_checkpoints', ('name',), ('last_id', 'updated_at'))
+        ).bindparams(bindparam('updated_at', type_=DateTime)), {
+            'name': name, 'last_id': last_id, 'updated_at': now
+        })
@@ -0,0 +1,196 @@
+# app/services/email_outbox_service.py
+
+import random
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import text, bindparam, DateTime
+from app.extensions import db
+from app.utils import CircuitBreaker, dialect_name
+from .mailer import SmtpSender, build_message, MESSAGE_ERRORS
+
+# A claimed message goes back to the queue if its worker has not finished
+# with it in this many seconds (e.g. the process died mid-send)
+SEND_LEASE_SECONDS = 300
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# Consecutive server failures before the workers stop trying for a while
+BREAKER_FAILURES = 5
+BREAKER_RESET_SECONDS = 60
+# Pooled connections unused for this long are closed before the server drops them
+SMTP_IDLE_SECONDS = 30
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for the given number of failed attempts."""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * (0.5 + random.random() / 2)
+
+
+class EmailOutboxService:
+    """
+    Service class for the email outbox.
+
+    Requests only insert a row; OutboxWorkerPool threads (or `flask
+    send-emails`) claim due rows in batches and send each batch over one
+    reused SMTP connection.
+    """
+
+    @staticmethod
+    def enqueue(recipient, subject, body, sender=None):
+        """Adds an email to the outbox, commits, and wakes this process's workers."""
+        now = datetime.now()
+        db.session.execute(text("""
+            INSERT INTO email_outbox (sender, recipient, subject, body, status, attempts, next_attempt_at, created_at)
+            VALUES (:sender, :recipient, :subject, :body, 'Pending', 0, :now, :now)
+        """).bindparams(bindparam('now', type_=DateTime)), {
+            'sender': sender, 'recipient': recipient, 'subject': subject, 'body': body, 'now': now
+        })
+        db.session.commit()
+        pool = current_app.extensions.get('email_outbox')
+        if pool:
+            pool.wake()
+
+    @staticmethod
+    def claim_batch(batch_size, now=None):
+        """
+        Claims up to `batch_size` due messages for this worker and commits.
+
+        Claimed rows are marked Sending with a lease; workers on other
+        databases skip rows locked by each other's claims.
+        """
+        now = now or datetime.now()
+        lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE SKIP LOCKED"
+        rows = db.session.execute(text(f"""
+            SELECT id, sender, recipient, subject, body, attempts FROM email_outbox
+            WHERE status IN ('Pending', 'Sending') AND next_attempt_at <= :now
+            ORDER BY next_attempt_at, id
+            LIMIT :batch_size{lock}
+        """).bindparams(bindparam('now', type_=DateTime)), {'now': now, 'batch_size': batch_size}).mappings().fetchall()
+        if rows:
+            db.session.execute(text("""
+                UPDATE email_outbox SET status = 'Sending', next_attempt_at = :lease WHERE id IN :ids
+            """).bindparams(bindparam('ids', expanding=True), bindparam('lease', type_=DateTime)), {
+                'ids': [row['id'] for row in rows], 'lease': now + timedelta(seconds=SEND_LEASE_SECONDS)
+            })
+        db.session.commit()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def deliver_batch(sender, breaker, batch_size, now=None):
+        """
+        Claims one batch and sends it over `sender`'s connection.
+
+        Sent messages are marked in one UPDATE. A message the server
+        rejects fails permanently; a server or connection error is retried
+        with backoff, counts against the circuit breaker and ends the batch,
+        returning the unsent rest of the batch to the queue untouched.
+        Returns the number of messages claimed.
+        """
+        messages = EmailOutboxService.claim_batch(batch_size, now)
+        sent, retry, rejected = [], [], []
+        unsent = []
+        for i, message in enumerate(messages):
+            try:
+                sender.send(message['sender'], message['recipient'], build_message(
+                    message['sender'], message['recipient'], message['subject'], message['body']
+                ))
+                sent.append(message['id'])
+                breaker.record_success()
+            except MESSAGE_ERRORS as e:
+                rejected.append((message, str(e)))
+            except (smtplib.SMTPException, OSError) as e:
+                sender.close()
+                breaker.record_failure()
+                retry.append((message, str(e)))
+                unsent = messages[i + 1:]
+                break
+
+        now = now or datetime.now()
+        if sent:
+            db.session.execute(text("""
+                UPDATE email_outbox SET status = 'Sent', sent_at = :now, attempts = attempts + 1 WHERE id IN :ids
+            """).bindparams(bindparam('ids', expanding=True), bindparam('now', type_=DateTime)),
+                {'ids': sent, 'now': now})
+        failures = [
+            {'id': message['id'], 'status': 'Failed', 'next_attempt_at': now, 'error': error}
+            for message, error in rejected
+        ] + [
+            {'id': message['id'],
+             'status': 'Failed' if message['attempts'] + 1 >= MAX_ATTEMPTS else 'Pending',
+             'next_attempt_at': now + timedelta(seconds=retry_delay(message['attempts'] + 1)),
+             'error': error}
+            for message, error in retry
+        ]
+        if failures:
+            db.session.execute(text("""
+                UPDATE email_outbox SET status = :status, attempts = attempts + 1,
+                next_attempt_at = :next_attempt_at, last_error = :error
+                WHERE id = :id
+            """).bindparams(bindparam('next_attempt_at', type_=DateTime)), failures)
+        if unsent:
+            db.session.execute(text("""
+                UPDATE email_outbox SET status = 'Pending', next_attempt_at = :now WHERE id IN :ids
+            """).bindparams(bindparam('ids', expanding=True), bindparam('now', type_=DateTime)),
+                {'ids': [message['id'] for message in unsent], 'now': now})
+        db.session.commit()
+        return len(messages)
+
+
+class OutboxWorkerPool:
+    """
+    Daemon threads that drain the email outbox.
+
+    Each thread owns an SmtpSender, so a connection is reused for as long
+    as there is mail to send. All threads share one circuit breaker. A
+    thread sleeps until woken by `enqueue` in this process or until
+    `poll_interval` passes, which picks up mail queued by other processes
+    and retries that have come due.
+    """
+
+    def __init__(self, app, workers, batch_size, poll_interval):
+        self.app = app
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.breaker = CircuitBreaker('smtp', BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        sender = SmtpSender.from_config(self.app.config)
+        while not self._stop.is_set():
+            claimed = 0
+            if self.breaker.allow():
+                with self.app.app_context():
+                    try:
+                        claimed = EmailOutboxService.deliver_batch(sender, self.breaker, self.batch_size)
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"Email outbox worker failed: {e}")
+                    finally:
+                        db.session.remove()
+            if claimed:
+                continue
+            sender.close_if_idle(SMTP_IDLE_SECONDS)
+            self._wake.wait(max(self.poll_interval, self.breaker.retry_after()))
+            self._wake.clear()
+        sender.close()
@@ -0,0 +1,65 @@
+# app/services/entity_cache.py
+
+import threading
+from app.utils import TTLCache
+
+# Entity caches are per worker process. The TTL bounds how long a write made
+# by another worker can go unseen; writes in this worker invalidate at once.
+ENTITY_CACHE_MAX_ENTRIES = 10000
+ENTITY_CACHE_TTL_SECONDS = 30
+
+book_cache = TTLCache('book', ENTITY_CACHE_MAX_ENTRIES, ENTITY_CACHE_TTL_SECONDS)
+member_cache = TTLCache('member', ENTITY_CACHE_MAX_ENTRIES, ENTITY_CACHE_TTL_SECONDS)
+
+# Live available_stock per book id for circulation screens. Writes in this
+# worker store the exact value they committed; the short TTL bounds both
+# writes from other workers and out-of-order updates from concurrent ones.
+AVAILABILITY_CACHE_MAX_ENTRIES = 50000
+AVAILABILITY_CACHE_TTL_SECONDS = 5
+
+availability_cache = TTLCache('availability', AVAILABILITY_CACHE_MAX_ENTRIES, AVAILABILITY_CACHE_TTL_SECONDS)
+
+# Verified JWT payloads keyed by the token's sha256, so repeat requests with
+# the same token skip the signature check. Each entry expires with its token;
+# revocation is still checked on every request.
+VERIFIED_TOKEN_CACHE_MAX_ENTRIES = 10000
+
+verified_token_cache = TTLCache('verified_token', VERIFIED_TOKEN_CACHE_MAX_ENTRIES, 0)
+
+ENTITY_CACHES = (book_cache, member_cache, availability_cache, verified_token_cache)
+
+# Caches serving bodies under each resource's version-based ETag, and the
+# version this worker last synced them with
+VERSIONED_CACHES = {'books': (book_cache,), 'members': (member_cache,)}
+_synced_versions = {}
+_synced_lock = threading.Lock()
+
+
+def sync_with_versions(versions):
+    """
+    Clears the caches behind each resource whose version has changed since
+    this worker last looked.
+
+    Called with the counters a response is about to be tagged with, so its
+    body is never older than its ETag. Otherwise a write made by another
+    worker would leave this worker's cached entry under the new tag, and
+    every revalidation would get a 304 for it until the next write.
+    """
+    for resource, version in versions.items():
+        caches = VERSIONED_CACHES.get(resource)
+        if not caches:
+            continue
+        with _synced_lock:
+            if _synced_versions.get(resource) == version:
+                continue
+            _synced_versions[resource] = version
+        for cache in caches:
+            cache.clear()
+
+
+def record_availability(book_id, available_stock):
+    """Stores a committed available_stock, or drops the entry if it is unknown."""
+    if available_stock is None:
+        availability_cache.invalidate(book_id)
+    else:
+        availability_cache.set(book_id, available_stock)
@@ -0,0 +1,101 @@
+# app/services/export_service.py
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import text
+from app.extensions import db
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_YIELD_PER = 1000
+# Flush encoded output to the client once this many bytes are buffered
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+_TRANSACTION_COLUMNS = ['id', 'book_id', 'member_id', 'issue_date', 'return_date',
+                        'fee_charged', 'accrued_fee', 'is_returned', 'status']
+
+# resource -> (columns, queries); the queries run one after another
+EXPORTS = {
+    'books': (
+        ['id', 'title', 'author', 'isbn', 'total_stock', 'available_stock'],
+        ["SELECT id, title, author, isbn, total_stock, available_stock FROM books ORDER BY id"],
+    ),
+    'members': (
+        ['id', 'name', 'email', 'phone', 'outstanding_debt'],
+        ["SELECT id, name, email, phone, outstanding_debt FROM members ORDER BY id"],
+    ),
+    'transactions': (
+        _TRANSACTION_COLUMNS,
+        # Full history: archived transactions first (they are the oldest), then the hot table
+        [f"SELECT {', '.join(_TRANSACTION_COLUMNS)} FROM transactions_archive ORDER BY id",
+         f"SELECT {', '.join(_TRANSACTION_COLUMNS)} FROM transactions ORDER BY id"],
+    ),
+}
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class ExportService:
+    """Service class for streaming full-table exports in constant memory."""
+
+    @staticmethod
+    def iter_rows(resource):
+        """
+        Yields row tuples for a resource through a server-side cursor
+        (stream_results / yield_per), so only one batch is in memory at a time.
+        """
+        _, queries = EXPORTS[resource]
+        for sql in queries:
+            result = db.session.execute(text(sql).execution_options(yield_per=EXPORT_YIELD_PER))
+            try:
+                for partition in result.partitions():
+                    yield from partition
+            finally:
+                result.close()
+
+    @staticmethod
+    def iter_export(resource, fmt, compress=False):
+        """
+        Yields the encoded export of a resource as bytes chunks of roughly
+        EXPORT_FLUSH_BYTES, optionally gzip-compressed on the fly.
+        """
+        columns, _ = EXPORTS[resource]
+        compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == 'csv' else None
+
+        def drain():
+            data = buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            return compressor.compress(data) if compressor else data
+
+        if writer:
+            writer.writerow(columns)
+        for row in ExportService.iter_rows(resource):
+            if writer:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, row)), default=_json_value))
+                buffer.write('\n')
+            if buffer.tell() >= EXPORT_FLUSH_BYTES:
+                chunk = drain()
+                if chunk:
+                    yield chunk
+
+        chunk = drain()
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
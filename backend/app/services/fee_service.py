@@ -0,0 +1,94 @@
+# app/services/fee_service.py
+
+from datetime import datetime
+import numpy as np
+from sqlalchemy import text
+from app.extensions import db
+from app.utils import epoch_us_sql
+from .transaction_service import LOAN_PERIOD_MINUTES, FEE_PER_MINUTE
+
+# Raw fees (in cents) this close to a half cent are re-rounded with Python's
+# round(), whose correctly rounded result can differ from NumPy's there
+HALF_CENT_TOLERANCE = 1e-6
+
+
+def project_fees(issue_dates, now):
+    """
+    Vectorized TransactionService.calculate_fee for many loans returned at `now`.
+
+    `issue_dates` is a datetime64 array or a sequence of datetimes or ISO
+    8601 strings. Returns a float64 array equal, element for element, to
+    calculate_fee(issue, now).
+    """
+    issued = np.asarray(issue_dates, dtype='datetime64[us]')
+    elapsed_us = (np.datetime64(now, 'us') - issued).astype(np.int64)
+    # Same operation order as calculate_fee: seconds, then minutes
+    total_minutes = elapsed_us / 1e6 / 60
+    raw = (total_minutes - LOAN_PERIOD_MINUTES) * FEE_PER_MINUTE
+    fees = np.where(total_minutes > LOAN_PERIOD_MINUTES, np.round(raw, 2), 0.0)
+
+    scaled = raw * 100
+    near_half = (total_minutes > LOAN_PERIOD_MINUTES) & (np.abs(scaled - np.floor(scaled) - 0.5) < HALF_CENT_TOLERANCE)
+    for i in np.flatnonzero(near_half):
+        fees[i] = round(float(raw[i]), 2)
+    return fees
+
+
+def total_in_cents(fees):
+    """Sums fees exactly by adding whole cents, independent of summation order."""
+    return int(np.rint(np.asarray(fees) * 100).astype(np.int64).sum())
+
+
+class FeeService:
+    """Service class for projected fees on open loans."""
+
+    @staticmethod
+    def _open_issue_dates(member_id=None):
+        """
+        Loads the issue dates of open loans, optionally for one member, as a
+        datetime64[us] array. The database returns them as epoch microseconds,
+        so no datetime object is built per loan.
+        """
+        where = "AND member_id = :member_id" if member_id is not None else ""
+        sql = text(f"SELECT {epoch_us_sql('issue_date')} FROM transactions WHERE is_returned = FALSE {where}")
+        epochs = db.session.execute(sql, {'member_id': member_id}).scalars().all()
+        return np.array(epochs, dtype=np.int64).view('datetime64[us]')
+
+    @staticmethod
+    def get_projected_debt(member_id, now=None):
+        """
+        Returns what a member would owe if they returned every open loan now:
+        their outstanding debt plus the fee on each open loan. Returns None
+        if the member does not exist.
+        """
+        debt = db.session.execute(text("""
+            SELECT outstanding_debt FROM members WHERE id = :member_id
+        """), {'member_id': member_id}).scalar()
+        if debt is None:
+            return None
+        now = now or datetime.now()
+        fees = project_fees(FeeService._open_issue_dates(member_id), now)
+        fees_cents = total_in_cents(fees)
+        return {
+            'member_id': member_id,
+            'outstanding_debt': float(debt),
+            'open_loans': len(fees),
+            'projected_fees': fees_cents / 100,
+            'projected_debt': (round(float(debt) * 100) + fees_cents) / 100,
+            'as_of': now,
+        }
+
+    @staticmethod
+    def get_outstanding_liability(now=None):
+        """
+        Returns the library-wide fees owed if every open loan were returned
+        now, computed in one vectorized pass over all open loans.
+        """
+        now = now or datetime.now()
+        fees = project_fees(FeeService._open_issue_dates(), now)
+        return {
+            'open_loans': len(fees),
+            'overdue_loans': int(np.count_nonzero(fees)),
+            'projected_fees': total_in_cents(fees) / 100,
+            'as_of': now,
+        }
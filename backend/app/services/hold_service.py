@@ -0,0 +1,288 @@
+# app/services/hold_service.py
+
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam, DateTime
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.utils import Notifier, dialect_name
+from .entity_cache import book_cache, availability_cache
+from .version_service import VersionService
+from .outcomes import Outcome, WriteResult
+
+# How long a copy set aside for a Ready hold waits for pickup
+HOLD_PICKUP_HOURS = 48
+# Passes over a book's queue when allocating, in case holds change under us
+ALLOCATE_ATTEMPTS = 3
+ACTIVE_HOLD_STATUSES = ('Waiting', 'Ready')
+HOLD_COLUMNS = "id, book_id, member_id, status, created_at, ready_at, expires_at"
+HOLD_DATETIMES = {'created_at': DateTime, 'ready_at': DateTime, 'expires_at': DateTime}
+EXPIRE_BATCH_SIZE = 500
+
+# Woken with a book id whenever a hold on that book changes
+hold_notifier = Notifier()
+
+
+class HoldService:
+    """
+    Service class for the per-book hold queue.
+
+    A returned copy goes to the oldest Waiting hold on its book instead of
+    back on the shelf: the hold becomes Ready and the copy stays out of
+    available_stock until the member issues it, cancels, or the pickup
+    window passes. Callers notify `hold_notifier` after committing, so
+    clients waiting on /holds/<id>/events are woken without polling.
+    """
+
+    @staticmethod
+    def place_hold(book_id, member_id):
+        """
+        Adds a member to the back of a book's queue.
+
+        If a copy is on the shelf it is set aside at once, so the queue's
+        head becomes Ready. Returns a WriteResult with the hold row, or
+        NOT_FOUND / CONFLICT (member already holds the book) / ERROR.
+        """
+        now = datetime.now()
+        from_dual = " FROM DUAL" if dialect_name() == 'mysql' else ""
+        sql = f"""
+            INSERT INTO holds (book_id, member_id, status, created_at)
+            SELECT :book_id, :member_id, 'Waiting', :now{from_dual}
+            WHERE EXISTS (SELECT 1 FROM books WHERE id = :book_id)
+            AND EXISTS (SELECT 1 FROM members WHERE id = :member_id)
+            AND NOT EXISTS (
+                SELECT 1 FROM holds
+                WHERE book_id = :book_id AND member_id = :member_id AND status IN ('Waiting', 'Ready')
+            )
+        """
+        params = {'book_id': book_id, 'member_id': member_id, 'now': now}
+        try:
+            result = db.session.execute(text(sql).bindparams(bindparam('now', type_=DateTime)), params)
+            if result.rowcount == 0:
+                db.session.rollback()
+                return HoldService._place_failure(book_id, member_id)
+
+            shelved = db.session.execute(text("""
+                UPDATE books SET available_stock = available_stock - 1
+                WHERE id = :book_id AND available_stock > 0
+            """), {'book_id': book_id}).rowcount
+            if shelved:
+                HoldService.release_copies({book_id: 1}, now)
+                VersionService.bump('books')
+            hold = HoldService._active_hold(book_id, member_id)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Error placing hold on book {book_id}: {e}")
+            return WriteResult(Outcome.ERROR, message="Failed to place hold")
+
+        if shelved:
+            book_cache.invalidate(book_id)
+            availability_cache.invalidate(book_id)
+            hold_notifier.notify(book_id)
+        message = "Hold is ready for pickup." if hold['status'] == 'Ready' else "Hold placed."
+        return WriteResult(Outcome.OK, hold, message)
+
+    @staticmethod
+    def _place_failure(book_id, member_id):
+        """Works out why a conditional hold insert added no row."""
+        row = db.session.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM books WHERE id = :book_id) AS book,
+                (SELECT COUNT(*) FROM members WHERE id = :member_id) AS member
+        """), {'book_id': book_id, 'member_id': member_id}).mappings().fetchone()
+        if not row['book']:
+            return WriteResult(Outcome.NOT_FOUND, message="Book not found.")
+        if not row['member']:
+            return WriteResult(Outcome.NOT_FOUND, message="Member not found.")
+        return WriteResult(Outcome.CONFLICT, message="Member already has a hold on this book.")
+
+    @staticmethod
+    def _active_hold(book_id, member_id):
+        row = db.session.execute(text(f"""
+            SELECT {HOLD_COLUMNS} FROM holds
+            WHERE book_id = :book_id AND member_id = :member_id AND status IN ('Waiting', 'Ready')
+        """).columns(**HOLD_DATETIMES), {'book_id': book_id, 'member_id': member_id}).mappings().fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def get_hold(hold_id):
+        """
+        Retrieves a hold by id. Waiting holds include their 1-based
+        `position` in the book's queue.
+        """
+        row = db.session.execute(text(f"""
+            SELECT {HOLD_COLUMNS} FROM holds WHERE id = :hold_id
+        """).columns(**HOLD_DATETIMES), {'hold_id': hold_id}).mappings().fetchone()
+        if not row:
+            return None
+        hold = dict(row)
+        if hold['status'] == 'Waiting':
+            hold['position'] = db.session.execute(text("""
+                SELECT COUNT(*) FROM holds WHERE book_id = :book_id AND status = 'Waiting' AND id <= :hold_id
+            """), {'book_id': hold['book_id'], 'hold_id': hold_id}).scalar()
+        return hold
+
+    @staticmethod
+    def get_queue(book_id):
+        """Retrieves a book's active holds: Ready ones first, then the Waiting queue in order."""
+        rows = db.session.execute(text(f"""
+            SELECT {HOLD_COLUMNS} FROM holds
+            WHERE book_id = :book_id AND status IN ('Waiting', 'Ready')
+            ORDER BY CASE status WHEN 'Ready' THEN 0 ELSE 1 END, id
+        """).columns(**HOLD_DATETIMES), {'book_id': book_id}).mappings().fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def cancel_hold(hold_id):
+        """
+        Cancels an active hold. A copy set aside for it passes to the next
+        Waiting hold or goes back on the shelf.
+        Returns a WriteResult, or NOT_FOUND / INVALID (hold no longer active).
+        """
+        try:
+            hold = db.session.execute(text("""
+                SELECT book_id, status FROM holds WHERE id = :hold_id
+            """), {'hold_id': hold_id}).mappings().fetchone()
+            if not hold:
+                return WriteResult(Outcome.NOT_FOUND, message="Hold not found.")
+            # Checks the status that was read, so a hold issued or expired meanwhile stays as it is
+            cancelled = hold['status'] in ACTIVE_HOLD_STATUSES and db.session.execute(text("""
+                UPDATE holds SET status = 'Cancelled' WHERE id = :hold_id AND status = :status
+            """), {'hold_id': hold_id, 'status': hold['status']}).rowcount
+            if not cancelled:
+                db.session.rollback()
+                return WriteResult(Outcome.INVALID, message="Hold is no longer active.")
+            if hold['status'] == 'Ready':
+                HoldService.release_copies({hold['book_id']: 1}, datetime.now())
+                VersionService.bump('books')
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Error cancelling hold {hold_id}: {e}")
+            return WriteResult(Outcome.ERROR, message="Failed to cancel hold")
+
+        book_cache.invalidate(hold['book_id'])
+        availability_cache.invalidate(hold['book_id'])
+        hold_notifier.notify(hold['book_id'])
+        return WriteResult(Outcome.OK, {'id': hold_id}, "Hold cancelled.")
+
+    @staticmethod
+    def allocate(counts, now):
+        """
+        Sets aside counts[book_id] returned copies for the oldest Waiting
+        holds on each book. Does not commit.
+
+        The holds are locked as they are read, skipping any a concurrent
+        return has already locked, so two returns of the same book fill two
+        different holds instead of racing for the head of the queue. Holds
+        that still changed under us are made up from the rest of the queue.
+
+        Returns a Counter of copies actually allocated per book; the rest
+        have no one waiting and belong back on the shelf.
+        """
+        lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE SKIP LOCKED"
+        select_sql = text(f"""
+            SELECT id FROM holds WHERE book_id = :book_id AND status = 'Waiting' ORDER BY id LIMIT :n{lock}
+        """)
+        update_sql = text("""
+            UPDATE holds SET status = 'Ready', ready_at = :now, expires_at = :expires_at
+            WHERE id IN :ids AND status = 'Waiting'
+        """).bindparams(bindparam('ids', expanding=True), bindparam('now', type_=DateTime),
+                        bindparam('expires_at', type_=DateTime))
+        expires_at = now + timedelta(hours=HOLD_PICKUP_HOURS)
+        allocated = Counter()
+        for book_id, n in counts.items():
+            for _ in range(ALLOCATE_ATTEMPTS):
+                wanted = n - allocated[book_id]
+                ids = db.session.execute(select_sql, {'book_id': book_id, 'n': wanted}).scalars().all()
+                if not ids:
+                    break
+                allocated[book_id] += db.session.execute(
+                    update_sql, {'ids': ids, 'now': now, 'expires_at': expires_at}
+                ).rowcount
+                if allocated[book_id] >= n:
+                    break
+        return +allocated
+
+    @staticmethod
+    def release_copies(counts, now):
+        """
+        Hands counts[book_id] copies that were out of available_stock to the
+        queue, shelving whatever nobody is waiting for. Does not commit.
+        """
+        shelved = Counter(counts) - HoldService.allocate(counts, now)
+        if shelved:
+            db.session.execute(text("""
+                UPDATE books SET available_stock = CASE
+                    WHEN available_stock + :n > total_stock THEN total_stock
+                    ELSE available_stock + :n END
+                WHERE id = :book_id
+            """), [{'book_id': book_id, 'n': n} for book_id, n in shelved.items()])
+
+    @staticmethod
+    def consume(book_id, member_id, debt_limit):
+        """
+        Marks the member's Ready hold on a book Fulfilled if their debt is
+        under `debt_limit`, in one conditional UPDATE. Does not commit.
+        Returns True if the set-aside copy can be issued to them.
+        """
+        result = db.session.execute(text("""
+            UPDATE holds SET status = 'Fulfilled'
+            WHERE book_id = :book_id AND member_id = :member_id AND status = 'Ready'
+            AND EXISTS (SELECT 1 FROM members WHERE id = :member_id AND outstanding_debt < :debt_limit)
+        """), {'book_id': book_id, 'member_id': member_id, 'debt_limit': debt_limit})
+        return result.rowcount > 0
+
+    @staticmethod
+    def consume_many(member_id, book_ids):
+        """
+        Marks the member's Ready holds on any of `book_ids` Fulfilled. The
+        caller has already checked the member's debt. Does not commit.
+        Returns the set of book ids whose set-aside copy can be issued.
+        """
+        lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE"
+        rows = db.session.execute(text(f"""
+            SELECT id, book_id FROM holds
+            WHERE member_id = :member_id AND book_id IN :book_ids AND status = 'Ready'{lock}
+        """).bindparams(bindparam('book_ids', expanding=True)),
+            {'member_id': member_id, 'book_ids': list(set(book_ids))}).fetchall()
+        if not rows:
+            return set()
+        db.session.execute(text("""
+            UPDATE holds SET status = 'Fulfilled' WHERE id IN :ids
+        """).bindparams(bindparam('ids', expanding=True)), {'ids': [hold_id for hold_id, _ in rows]})
+        return {book_id for _, book_id in rows}
+
+    @staticmethod
+    def expire_ready(now=None, batch_size=EXPIRE_BATCH_SIZE):
+        """
+        Expires Ready holds whose pickup window has passed, passing each
+        set-aside copy to the next Waiting hold or back to the shelf.
+        Commits once per batch. Returns the number of holds expired.
+        """
+        now = now or datetime.now()
+        # Locked so an issue cannot consume a hold this batch is expiring
+        lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE"
+        select_sql = text(f"""
+            SELECT id, book_id FROM holds
+            WHERE status = 'Ready' AND expires_at <= :now
+            ORDER BY id LIMIT :batch_size{lock}
+        """).bindparams(bindparam('now', type_=DateTime))
+        update_sql = text("""
+            UPDATE holds SET status = 'Expired' WHERE id IN :ids
+        """).bindparams(bindparam('ids', expanding=True))
+        expired = 0
+        while True:
+            rows = db.session.execute(select_sql, {'now': now, 'batch_size': batch_size}).fetchall()
+            if not rows:
+                return expired
+            db.session.execute(update_sql, {'ids': [hold_id for hold_id, _ in rows]})
+            counts = Counter(book_id for _, book_id in rows)
+            HoldService.release_copies(counts, now)
+            VersionService.bump('books')
+            db.session.commit()
+            book_cache.invalidate(*counts)
+            availability_cache.invalidate(*counts)
+            hold_notifier.notify(*counts)
+            expired += len(rows)
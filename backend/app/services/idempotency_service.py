@@ -0,0 +1,105 @@
+# app/services/idempotency_service.py
+
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam, DateTime
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+
+PURGE_BATCH_SIZE = 1000
+
+# Default lease on a placeholder row; see IDEMPOTENCY_CLAIM_LEASE_SECONDS
+CLAIM_LEASE_SECONDS = 60
+
+
+class IdempotencyService:
+    """
+    Service class for the idempotency_keys response store.
+
+    A key is claimed with a placeholder row before the write runs and filled
+    in with the response afterwards, so a retry either replays the stored
+    response or finds the first attempt still in progress. A placeholder
+    is leased: if its request died before storing a response, the key can
+    be claimed again once the lease runs out.
+    """
+
+    @staticmethod
+    def get(key, now=None):
+        """Returns the unexpired row for `key` as a dict, or None. A stale placeholder counts as absent."""
+        now = now or datetime.now()
+        row = db.session.execute(text("""
+            SELECT idempotency_key, fingerprint, status_code, response_body, claimed_until, expires_at
+            FROM idempotency_keys WHERE idempotency_key = :key
+        """).columns(claimed_until=DateTime, expires_at=DateTime), {'key': key}).mappings().fetchone()
+        if not row or row['expires_at'] <= now:
+            return None
+        if row['status_code'] is None and row['claimed_until'] is not None and row['claimed_until'] <= now:
+            return None
+        return dict(row)
+
+    @staticmethod
+    def claim(key, fingerprint, ttl_seconds, lease_seconds=CLAIM_LEASE_SECONDS, now=None):
+        """
+        Inserts the placeholder row for `key`, leased for `lease_seconds`,
+        and commits it.
+
+        Returns None if the key was claimed, or the row that already holds
+        it (completed or still in progress). An expired row, or a
+        placeholder whose lease has run out, is replaced.
+        """
+        now = now or datetime.now()
+        params = {'key': key, 'fingerprint': fingerprint, 'now': now,
+                  'claimed_until': now + timedelta(seconds=lease_seconds),
+                  'expires_at': now + timedelta(seconds=ttl_seconds)}
+        db.session.execute(text("""
+            DELETE FROM idempotency_keys WHERE idempotency_key = :key
+            AND (expires_at <= :now OR (status_code IS NULL AND claimed_until <= :now))
+        """).bindparams(bindparam('now', type_=DateTime)), params)
+        try:
+            db.session.execute(text("""
+                INSERT INTO idempotency_keys (idempotency_key, fingerprint, created_at, claimed_until, expires_at)
+                VALUES (:key, :fingerprint, :now, :claimed_until, :expires_at)
+            """).bindparams(bindparam('now', type_=DateTime), bindparam('claimed_until', type_=DateTime),
+                            bindparam('expires_at', type_=DateTime)), params)
+            db.session.commit()
+            return None
+        except IntegrityError:
+            # Another request claimed the key between our read and insert
+            db.session.rollback()
+            return IdempotencyService.get(key, now)
+
+    @staticmethod
+    def complete(key, status_code, body):
+        """Stores the response for a claimed key."""
+        db.session.execute(text("""
+            UPDATE idempotency_keys SET status_code = :status_code, response_body = :body, claimed_until = NULL
+            WHERE idempotency_key = :key
+        """), {'key': key, 'status_code': status_code, 'body': body})
+        db.session.commit()
+
+    @staticmethod
+    def release(key):
+        """Drops a claim whose request failed without writing, so the client can retry."""
+        db.session.execute(text("DELETE FROM idempotency_keys WHERE idempotency_key = :key"), {'key': key})
+        db.session.commit()
+
+    @staticmethod
+    def purge_expired(batch_size=PURGE_BATCH_SIZE, now=None):
+        """
+        Deletes expired keys in batches of `batch_size`, committing each
+        batch. Returns the number of rows deleted.
+        """
+        now = now or datetime.now()
+        select_sql = text("""
+            SELECT idempotency_key FROM idempotency_keys WHERE expires_at <= :now LIMIT :batch_size
+        """).bindparams(bindparam('now', type_=DateTime))
+        delete_sql = text("""
+            DELETE FROM idempotency_keys WHERE idempotency_key IN :keys
+        """).bindparams(bindparam('keys', expanding=True))
+        deleted = 0
+        while True:
+            keys = db.session.execute(select_sql, {'now': now, 'batch_size': batch_size}).scalars().all()
+            if not keys:
+                return deleted
+            db.session.execute(delete_sql, {'keys': keys})
+            db.session.commit()
+            deleted += len(keys)
@@ -0,0 +1,236 @@
+# app/services/import_service.py
+
+import csv
+import io
+import json
+from itertools import groupby
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.utils import dialect_name
+from .book_service import stock_clamp_sql
+from .suggest_index import book_suggest_index
+from .entity_cache import book_cache, member_cache, availability_cache
+from .version_service import VersionService
+
+# Rows per executemany call; each batch is committed as one transaction
+BATCH_SIZE = 2000
+# Stop collecting per-row errors after this many to keep the report small
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(filename=None, mimetype=None):
+    """Guesses the upload format from a filename or content type."""
+    filename = (filename or '').lower()
+    mimetype = (mimetype or '').lower()
+    if filename.endswith('.csv') or mimetype in ('text/csv', 'application/csv'):
+        return 'csv'
+    if filename.endswith(('.ndjson', '.jsonl')) or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return None
+
+
+def iter_records(stream, fmt):
+    """
+    Lazily parses a binary upload stream.
+
+    Yields (row_number, record, error) tuples, where record is a dict or
+    None if the row could not be parsed. Row numbers are 1-based data rows
+    (the CSV header is not counted).
+    """
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for row_number, row in enumerate(csv.DictReader(text_stream), start=1):
+            yield row_number, {k.strip(): v for k, v in row.items() if k}, None
+    else:
+        row_number = 0
+        for line in text_stream:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Each line must be a JSON object"
+                continue
+            yield row_number, record, None
+
+
+def _clean(value):
+    """Strips strings and turns empty values into None."""
+    if isinstance(value, str):
+        value = value.strip()
+    return value if value not in ('', None) else None
+
+
+class ImportService:
+    """Service class for streaming bulk imports of books and members."""
+
+    @staticmethod
+    def _book_statements():
+        insert = """
+        INSERT INTO books (title, author, isbn, total_stock, available_stock)
+        VALUES (:title, :author, :isbn, :total_stock, :total_stock)
+        """
+        if dialect_name() == 'mysql':
+            # MySQL applies assignments left to right, so available_stock
+            # must be computed before total_stock is overwritten.
+            upsert = insert + f"""
+            ON DUPLICATE KEY UPDATE
+                title = VALUES(title), author = VALUES(author),
+                available_stock = {stock_clamp_sql('VALUES(total_stock)', 'available_stock', 'total_stock')},
+                total_stock = VALUES(total_stock)
+            """
+        else:
+            upsert = insert + f"""
+            ON CONFLICT (isbn) DO UPDATE SET
+                title = excluded.title, author = excluded.author,
+                available_stock = {stock_clamp_sql('excluded.total_stock', 'books.available_stock', 'books.total_stock')},
+                total_stock = excluded.total_stock
+            """
+        return text(insert), text(upsert)
+
+    @staticmethod
+    def _member_statements():
+        insert = """
+        INSERT INTO members (name, email, phone, outstanding_debt)
+        VALUES (:name, :email, :phone, 0)
+        """
+        if dialect_name() == 'mysql':
+            upsert = insert + "ON DUPLICATE KEY UPDATE name = VALUES(name), phone = VALUES(phone)"
+        else:
+            upsert = insert + "ON CONFLICT (email) DO UPDATE SET name = excluded.name, phone = excluded.phone"
+        return text(insert), text(upsert)
+
+    @staticmethod
+    def _validate_book(record):
+        title = _clean(record.get('title'))
+        author = _clean(record.get('author'))
+        total_stock = _clean(record.get('total_stock'))
+        if not title or not author or total_stock is None:
+            raise ValueError("Missing required fields: title, author, total_stock")
+        try:
+            total_stock = int(total_stock)
+        except (TypeError, ValueError):
+            raise ValueError("total_stock must be an integer")
+        if total_stock < 0:
+            raise ValueError("total_stock cannot be negative")
+        isbn = _clean(record.get('isbn'))
+        return {
+            'title': str(title),
+            'author': str(author),
+            'isbn': str(isbn) if isbn is not None else None,
+            'total_stock': total_stock,
+        }, isbn is not None
+
+    @staticmethod
+    def _validate_member(record):
+        name = _clean(record.get('name'))
+        if not name:
+            raise ValueError("Missing required field: name")
+        email = _clean(record.get('email'))
+        phone = _clean(record.get('phone'))
+        return {
+            'name': str(name),
+            'email': str(email) if email is not None else None,
+            'phone': str(phone) if phone is not None else None,
+        }, email is not None
+
+    @staticmethod
+    def _run_import(records, validate, statements, resource):
+        """
+        Validates records and writes them in executemany batches.
+
+        Rows with a unique key go through the upsert statement, the rest
+        through a plain insert. If a batch fails, it is rolled back and
+        replayed row by row so that only the offending rows are reported.
+        """
+        insert_sql, upsert_sql = statements
+        report = {'processed': 0, 'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+        def add_error(row_number, message):
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'row': row_number, 'error': message})
+            else:
+                report['errors_truncated'] = True
+
+        def flush(batch):
+            if not batch:
+                return
+            try:
+                # Consecutive rows of the same kind share one executemany
+                # call, so ids are assigned in upload order.
+                for keyed, rows in groupby(batch, key=lambda row: row[2]):
+                    db.session.execute(upsert_sql if keyed else insert_sql, [params for _, params, _ in rows])
+                VersionService.bump(resource)
+                db.session.commit()
+                report['imported'] += len(batch)
+                return
+            except SQLAlchemyError:
+                db.session.rollback()
+
+            for row_number, params, keyed in batch:
+                try:
+                    db.session.execute(upsert_sql if keyed else insert_sql, params)
+                    VersionService.bump(resource)
+                    db.session.commit()
+                    report['imported'] += 1
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    reason = str(getattr(e, 'orig', e)).splitlines()[0]
+                    add_error(row_number, f"Database error: {reason}")
+
+        batch = []
+        for row_number, record, error in records:
+            report['processed'] += 1
+            if error:
+                add_error(row_number, error)
+                continue
+            try:
+                params, keyed = validate(record)
+            except ValueError as e:
+                add_error(row_number, str(e))
+                continue
+            batch.append((row_number, params, keyed))
+            if len(batch) >= BATCH_SIZE:
+                flush(batch)
+                batch = []
+        flush(batch)
+        return report
+
+    @staticmethod
+    def import_books(stream, fmt):
+        """
+        Imports books from a CSV or NDJSON stream, upserting on ISBN.
+
+        Existing books keep their issued copies: available_stock is adjusted
+        by the change in total_stock, clamped to 0..total_stock.
+        Returns a report dict with counts and per-row errors.
+        """
+        report = ImportService._run_import(
+            iter_records(stream, fmt), ImportService._validate_book, ImportService._book_statements(), 'books'
+        )
+        if report['imported']:
+            book_cache.clear()
+            availability_cache.clear()
+            book_suggest_index.rebuild()
+        return report
+
+    @staticmethod
+    def import_members(stream, fmt):
+        """
+        Imports members from a CSV or NDJSON stream, upserting on email.
+        Returns a report dict with counts and per-row errors.
+        """
+        report = ImportService._run_import(
+            iter_records(stream, fmt), ImportService._validate_member, ImportService._member_statements(), 'members'
+        )
+        if report['imported']:
+            member_cache.clear()
+        return report
@@ -0,0 +1,93 @@
+# app/services/mailer.py
+
+import smtplib
+import time
+from email.mime.text import MIMEText
+
+# Errors where the server answered and rejected this one message; anything
+# else (connection, TLS, login, timeouts) is treated as the server's fault
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+def build_message(sender, recipient, subject, body):
+    """Builds the MIME text of a plain-text email."""
+    msg = MIMEText(body, 'plain', 'utf-8')
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    if sender:
+        msg['From'] = sender
+    return msg.as_string()
+
+
+class SmtpSender:
+    """
+    One SMTP session reused across messages.
+
+    The connection (with STARTTLS and login) is opened on the first send and
+    kept for the following ones. If a reused connection turns out to have
+    been dropped by the server, it is reopened once and the send retried.
+    Not thread-safe: each worker thread owns its sender.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True, timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._connection = None
+        self._last_used = 0.0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config['MAIL_SERVER'], config['MAIL_PORT'],
+            username=config.get('MAIL_USERNAME'), password=config.get('MAIL_PASSWORD'),
+            use_tls=config['MAIL_USE_TLS'], timeout=config['MAIL_TIMEOUT'],
+        )
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.ehlo()
+            if self.use_tls:
+                connection.starttls()
+                connection.ehlo()
+            if self.username:
+                connection.login(self.username, self.password)
+        except Exception:
+            connection.close()
+            raise
+        self.connections_opened += 1
+        return connection
+
+    def send(self, sender, recipient, message):
+        """Sends one message, opening or reopening the connection as needed."""
+        reused = self._connection is not None
+        if not reused:
+            self._connection = self._connect()
+        try:
+            self._connection.sendmail(sender or self.username, [recipient], message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            if not reused:
+                raise
+            self._connection = self._connect()
+            self._connection.sendmail(sender or self.username, [recipient], message)
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self, max_idle):
+        """Closes the connection if it has not been used for `max_idle` seconds."""
+        if self._connection is not None and time.monotonic() - self._last_used >= max_idle:
+            self.close()
+
+    def close(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except (smtplib.SMTPException, OSError):
+            self._connection.close()
+        self._connection = None
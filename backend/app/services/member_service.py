@@ -1,37 +1,71 @@
 # app/services/member_service.py
 
-from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.extensions import db
+from app.utils import clamp_page_size, supports_returning, chunks, DEFAULT_PAGE_SIZE
+from .entity_cache import member_cache
+from .version_service import VersionService
+from .outcomes import Outcome, WriteResult
+
+MEMBER_COLUMNS = "id, name, email, phone, outstanding_debt"
 
 class MemberService:
     """Service class for library member operations."""
 
     @staticmethod
     def create_member(name, email=None, phone=None):
-        """Creates a new member record."""
-        sql = text("""
+        """
+        Creates a new member record.
+
+        Returns a WriteResult whose data is the new member row (read back
+        with RETURNING where the dialect supports it), or CONFLICT if the
+        email already exists.
+        """
+        sql = """
         INSERT INTO members (name, email, phone, outstanding_debt)
         VALUES (:name, :email, :phone, :outstanding_debt)
-        """)
+        """
+        params = {
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'outstanding_debt': 0.00
+        }
         try:
-            db.session.execute(sql, {
-                'name': name,
-                'email': email,
-                'phone': phone,
-                'outstanding_debt': 0.00
-            })
+            if supports_returning('insert'):
+                row = db.session.execute(text(sql + f" RETURNING {MEMBER_COLUMNS}"), params).mappings().fetchone()
+                member = dict(row)
+            else:
+                result = db.session.execute(text(sql), params)
+                member = MemberService._load_member(result.lastrowid)
+            VersionService.bump('members')
             db.session.commit()
-            result = db.session.execute(text("SELECT LAST_INSERT_ID()")).fetchone()
-            return result[0] if result else None
+            MemberService._cache_member(member)
+            return WriteResult(Outcome.OK, member, "Member created successfully")
+        except IntegrityError:
+            db.session.rollback()
+            return WriteResult(Outcome.CONFLICT, message="A member with this email already exists.")
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Error creating member: {e}")
-            return None
+            return WriteResult(Outcome.ERROR, message="Failed to create member")
+
+    @staticmethod
+    def _cache_member(member):
+        """Replaces the cached copy of a member after a committed write."""
+        member_cache.invalidate(member['id'])
+        member_cache.set(member['id'], member)
 
     @staticmethod
     def get_member(member_id):
-        """Retrieves a member by their ID."""
+        """Retrieves a member by their ID, reading through the entity cache."""
+        member = member_cache.get_or_load(member_id, lambda: MemberService._load_member(member_id))
+        return dict(member) if member else None
+
+    @staticmethod
+    def _load_member(member_id):
+        """Reads a member row from the database."""
         sql = text("""
         SELECT id, name, email, phone, outstanding_debt
         FROM members WHERE id = :member_id
@@ -40,18 +74,63 @@ class MemberService:
         return dict(result) if result else None
 
     @staticmethod
-    def get_all_members():
-        """Retrieves all members."""
+    def get_members(member_ids):
+        """
+        Retrieves several members by id.
+
+        Cache hits are served first; the rest are read with one
+        `WHERE id IN (...)` query per chunk of ids. Returns a tuple
+        (members, missing_ids), with members in the order the ids were given.
+        """
+        found = member_cache.get_or_load_many(member_ids, MemberService._load_members)
+        members = [dict(found[member_id]) for member_id in member_ids if member_id in found]
+        missing = [member_id for member_id in member_ids if member_id not in found]
+        return members, missing
+
+    @staticmethod
+    def _load_members(member_ids):
+        """Reads member rows for the given ids, returning a dict keyed by id."""
         sql = text("""
         SELECT id, name, email, phone, outstanding_debt
+        FROM members WHERE id IN :member_ids
+        """).bindparams(bindparam('member_ids', expanding=True))
+        members = {}
+        for chunk in chunks(member_ids):
+            for row in db.session.execute(sql, {'member_ids': chunk}).mappings():
+                members[row['id']] = dict(row)
+        return members
+
+    @staticmethod
+    def get_all_members(after=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Retrieves one page of members ordered by id.
+
+        Uses keyset pagination: only members with an id greater than `after`
+        are returned. Returns a tuple (members, next_cursor), where
+        next_cursor is None on the last page.
+        """
+        limit = clamp_page_size(limit)
+        where = "WHERE id > :after" if after is not None else ""
+        sql = text(f"""
+        SELECT id, name, email, phone, outstanding_debt
         FROM members
+        {where}
+        ORDER BY id
+        LIMIT :limit
         """)
-        results = db.session.execute(sql).mappings().fetchall()
-        return [dict(row) for row in results]
+        results = db.session.execute(sql, {'after': after, 'limit': limit + 1}).mappings().fetchall()
+        members = [dict(row) for row in results[:limit]]
+        next_cursor = members[-1]['id'] if len(results) > limit else None
+        return members, next_cursor
 
     @staticmethod
     def update_member(member_id, data):
-        """Updates a member record."""
+        """
+        Updates a member record in a single statement.
+
+        Returns a WriteResult with the updated row, NOT_FOUND, CONFLICT
+        (duplicate email) or INVALID if there is nothing to update.
+        """
         updates = []
         params = {'member_id': member_id}
 
@@ -66,53 +145,94 @@ class MemberService:
             params['phone'] = data['phone']
 
         if not updates:
-            return False  # Nothing to update
+            return WriteResult(Outcome.INVALID, message="Nothing to update")
 
-        sql = text(f"""
+        sql = f"""
         UPDATE members
         SET {', '.join(updates)}
         WHERE id = :member_id
-        """)
+        """
         try:
-            db.session.execute(sql, params)
+            if supports_returning('update'):
+                row = db.session.execute(text(sql + f" RETURNING {MEMBER_COLUMNS}"), params).mappings().fetchone()
+                member = dict(row) if row else None
+            else:
+                result = db.session.execute(text(sql), params)
+                member = MemberService._load_member(member_id) if result.rowcount else None
+            if not member:
+                db.session.rollback()
+                return WriteResult(Outcome.NOT_FOUND, message="Member not found")
+            VersionService.bump('members')
             db.session.commit()
-            return True
+            MemberService._cache_member(member)
+            return WriteResult(Outcome.OK, member, "Member updated successfully")
+        except IntegrityError:
+            db.session.rollback()
+            return WriteResult(Outcome.CONFLICT, message="A member with this email already exists.")
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Error updating member {member_id}: {e}")
-            return False
+            return WriteResult(Outcome.ERROR, message="Failed to update member")
 
     @staticmethod
     def delete_member(member_id):
-        """Deletes a member record."""
-        member = MemberService.get_member(member_id)
-        if not member:
-            return False
-
-        if member['outstanding_debt'] > 0:
-            print(f"Cannot delete member {member_id}: Outstanding debt is KES {member['outstanding_debt']}.")
-            return False
-
-        open_tx_sql = text("""
-        SELECT COUNT(*) FROM transactions
-        WHERE member_id = :member_id AND is_returned = FALSE
-        """)
-        result = db.session.execute(open_tx_sql, {'member_id': member_id}).fetchone()
-        if result and result[0] > 0:
-            print(f"Cannot delete member {member_id}: Has {result[0]} open transactions.")
-            return False
+        """
+        Deletes a member record if they owe nothing and have no open loans.
 
-        sql = text("DELETE FROM members WHERE id = :member_id")
+        Both checks are part of the DELETE itself, and the open-loan check
+        is a primary-key read of member_stats; the reason is only looked up
+        when nothing was deleted. Returns a WriteResult with NOT_FOUND,
+        DEBT_OUTSTANDING or HAS_OPEN_LOANS on failure.
+        """
+        sql = text("""
+        DELETE FROM members
+        WHERE id = :member_id AND outstanding_debt <= 0
+        AND NOT EXISTS (
+            SELECT 1 FROM member_stats WHERE member_id = :member_id AND open_loans > 0
+        )
+        """)
         try:
-            db.session.execute(sql, {'member_id': member_id})
+            # The stats row references the member, so it goes first; the
+            # rollback below restores it if the member stays
+            db.session.execute(text("""
+            DELETE FROM member_stats WHERE member_id = :member_id AND open_loans = 0
+            """), {'member_id': member_id})
+            result = db.session.execute(sql, {'member_id': member_id})
+            if result.rowcount == 0:
+                db.session.rollback()
+                return MemberService._delete_failure(member_id)
+            VersionService.bump('members')
             db.session.commit()
-            return True
+            member_cache.invalidate(member_id)
+            return WriteResult(Outcome.OK, {'id': member_id}, "Member deleted successfully")
+        except IntegrityError:
+            db.session.rollback()
+            return WriteResult(Outcome.CONFLICT, message="Cannot delete member: They have transaction history.")
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Error deleting member {member_id}: {e}")
-            return False
-        
+            return WriteResult(Outcome.ERROR, message="Failed to delete member")
 
+    @staticmethod
+    def _delete_failure(member_id):
+        """Works out why a conditional member delete matched no row."""
+        row = db.session.execute(text("""
+        SELECT m.outstanding_debt, s.open_loans
+        FROM members m
+        LEFT JOIN member_stats s ON s.member_id = m.id
+        WHERE m.id = :member_id
+        """), {'member_id': member_id}).mappings().fetchone()
+        if not row:
+            return WriteResult(Outcome.NOT_FOUND, message="Member not found")
+        if row['outstanding_debt'] > 0:
+            return WriteResult(
+                Outcome.DEBT_OUTSTANDING,
+                message=f"Cannot delete member: Outstanding debt is KES {row['outstanding_debt']}."
+            )
+        return WriteResult(
+            Outcome.HAS_OPEN_LOANS,
+            message=f"Cannot delete member: Has {row['open_loans']} open transactions."
+        )
 
     @staticmethod
     def get_member_debt(member_id):
@@ -135,65 +255,54 @@ class MemberService:
             # Return None if no member with that ID is found
             return None
         
-    # Add other member service methods here if you have them (e.g., get_member, create_member, etc.)
     @staticmethod
     def record_payment(member_id: int, amount: float):
         """
         Records a payment for a member, reducing their outstanding debt.
 
+        The debt is decremented and read back in one statement (RETURNING
+        where supported), so there is no separate existence check.
+
         Args:
             member_id: The ID of the member making the payment.
             amount: The payment amount.
 
         Returns:
-            A tuple (success: bool, message: str).
+            A WriteResult whose data is the updated member row, or
+            INVALID / NOT_FOUND / ERROR.
         """
         if amount <= 0:
-            return False, "Payment amount must be positive."
+            return WriteResult(Outcome.INVALID, message="Payment amount must be positive.")
 
         # Ensure amount is a float and rounded to 2 decimal places for consistency
         payment_amount = round(float(amount), 2)
+        sql = """
+        UPDATE members
+        SET outstanding_debt = outstanding_debt - :payment_amount
+        WHERE id = :member_id
+        """
+        params = {'payment_amount': payment_amount, 'member_id': member_id}
 
         try:
-            # Check if the member exists
-            member_check_sql = text("SELECT id FROM members WHERE id = :member_id")
-            member_exists = db.session.execute(member_check_sql, {'member_id': member_id}).fetchone()
-            if not member_exists:
-                return False, f"Member with ID {member_id} not found."
-
-            # SQL query to update the member's outstanding debt
-            # We subtract the payment amount from the current debt
-            update_sql = text("""
-                UPDATE members
-                SET outstanding_debt = outstanding_debt - :payment_amount
-                WHERE id = :member_id
-            """)
-
-            # Execute the update query
-            result = db.session.execute(update_sql, {
-                'payment_amount': payment_amount,
-                'member_id': member_id
-            })
-
-            # Check if a row was actually updated (should be 1 if member exists)
-            if result.rowcount == 0:
-                 # This case should ideally be caught by the member_exists check, but good as a fallback
-                 db.session.rollback() # Rollback in case the member existed but something prevented update
-                 return False, f"Failed to update debt for member ID {member_id}. Member might not exist."
-
+            if supports_returning('update'):
+                row = db.session.execute(text(sql + f" RETURNING {MEMBER_COLUMNS}"), params).mappings().fetchone()
+                member = dict(row) if row else None
+            else:
+                result = db.session.execute(text(sql), params)
+                member = MemberService._load_member(member_id) if result.rowcount else None
+            if not member:
+                db.session.rollback()
+                return WriteResult(Outcome.NOT_FOUND, message=f"Member with ID {member_id} not found.")
 
-            # Commit the transaction
+            VersionService.bump('members')
             db.session.commit()
+            MemberService._cache_member(member)
 
-            return True, f"Payment of KES {payment_amount:.2f} recorded successfully for member ID {member_id}."
-
+            return WriteResult(
+                Outcome.OK, member,
+                f"Payment of KES {payment_amount:.2f} recorded successfully for member ID {member_id}."
+            )
         except SQLAlchemyError as e:
-            # Rollback the transaction in case of any database error
             db.session.rollback()
             print(f"Error recording payment for member ID {member_id}: {e}")
-            return False, f"An error occurred while recording the payment: {e}"
-        except Exception as e:
-             # Catch any other unexpected errors
-            db.session.rollback() # Ensure rollback even for non-SQLAlchemy errors
-            print(f"An unexpected error occurred recording payment for member ID {member_id}: {e}")
-            return False, f"An unexpected error occurred: {e}"
\ No newline at end of file
+            return WriteResult(Outcome.ERROR, message="An error occurred while recording the payment.")
@@ -0,0 +1,103 @@
+# app/services/member_stats_service.py
+
+from collections import defaultdict
+from sqlalchemy import text
+from app.extensions import db
+from app.utils import increment_sql
+
+
+class MemberStatsService:
+    """
+    Service class for the member_stats projection.
+
+    Holds open, overdue and lifetime loan counts per member. Every write that
+    changes them applies its delta in the same database transaction, so the
+    counts are read with a primary-key lookup instead of counting
+    transactions. `rebuild` recomputes them from scratch.
+    """
+
+    @staticmethod
+    def apply(deltas):
+        """
+        Adds counter deltas, given as {member_id: (open, overdue, lifetime)}.
+        A member's row is created by the first delta. Does not commit.
+        """
+        deltas = {member_id: delta for member_id, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+        # One upsert, so two first loans for a member cannot both try to create the row
+        db.session.execute(text(increment_sql(
+            'member_stats', ('member_id',), ('open_loans', 'overdue_loans', 'lifetime_loans')
+        )), [
+            {'member_id': member_id, 'open_loans': open_loans,
+             'overdue_loans': overdue_loans, 'lifetime_loans': lifetime_loans}
+            for member_id, (open_loans, overdue_loans, lifetime_loans) in deltas.items()
+        ])
+
+    @staticmethod
+    def loans_issued(member_ids):
+        """Records new loans; `member_ids` has one entry per loan. Does not commit."""
+        deltas = defaultdict(lambda: [0, 0, 0])
+        for member_id in member_ids:
+            deltas[member_id][0] += 1
+            deltas[member_id][2] += 1
+        MemberStatsService.apply(deltas)
+
+    @staticmethod
+    def loans_closed(loans):
+        """Records returned loans, given as (member_id, was_overdue) pairs. Does not commit."""
+        deltas = defaultdict(lambda: [0, 0, 0])
+        for member_id, was_overdue in loans:
+            deltas[member_id][0] -= 1
+            if was_overdue:
+                deltas[member_id][1] -= 1
+        MemberStatsService.apply(deltas)
+
+    @staticmethod
+    def loans_overdue(member_ids):
+        """Records loans that became overdue; one entry per loan. Does not commit."""
+        deltas = defaultdict(lambda: [0, 0, 0])
+        for member_id in member_ids:
+            deltas[member_id][1] += 1
+        MemberStatsService.apply(deltas)
+
+    @staticmethod
+    def get_summary(member_id):
+        """
+        Returns a member's loan counts and current debt, or None if the
+        member does not exist. Both tables are read by primary key.
+        """
+        row = db.session.execute(text("""
+            SELECT m.id AS member_id, m.name, m.outstanding_debt,
+                COALESCE(s.open_loans, 0) AS open_loans,
+                COALESCE(s.overdue_loans, 0) AS overdue_loans,
+                COALESCE(s.lifetime_loans, 0) AS lifetime_loans
+            FROM members m
+            LEFT JOIN member_stats s ON s.member_id = m.id
+            WHERE m.id = :member_id
+        """), {'member_id': member_id}).mappings().fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def rebuild():
+        """
+        Recomputes every member's counters from transactions and the archive
+        in one transaction. Returns the number of members with stats.
+        """
+        db.session.execute(text("DELETE FROM member_stats"))
+        db.session.execute(text("""
+            INSERT INTO member_stats (member_id, open_loans, overdue_loans, lifetime_loans)
+            SELECT member_id,
+                SUM(CASE WHEN is_returned = FALSE THEN 1 ELSE 0 END),
+                SUM(CASE WHEN is_returned = FALSE AND status = 'Overdue' THEN 1 ELSE 0 END),
+                COUNT(*)
+            FROM (
+                SELECT member_id, is_returned, status FROM transactions
+                UNION ALL
+                SELECT member_id, is_returned, status FROM transactions_archive
+            ) loans
+            GROUP BY member_id
+        """))
+        count = db.session.execute(text("SELECT COUNT(*) FROM member_stats")).scalar()
+        db.session.commit()
+        return count
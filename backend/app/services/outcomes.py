@@ -0,0 +1,27 @@
+# app/services/outcomes.py
+
+from enum import Enum
+from typing import Any, NamedTuple, Optional
+
+
+class Outcome(Enum):
+    """Why a service-layer write succeeded or failed."""
+    OK = 'ok'
+    NOT_FOUND = 'not_found'
+    CONFLICT = 'conflict'                  # unique constraint, e.g. ISBN or email
+    HAS_OPEN_LOANS = 'has_open_loans'
+    DEBT_OUTSTANDING = 'debt_outstanding'
+    UNAVAILABLE = 'unavailable'            # no copies left to issue
+    INVALID = 'invalid'                    # request cannot be applied to the current state
+    ERROR = 'error'                        # unexpected database error
+
+
+class WriteResult(NamedTuple):
+    """Result of a service-layer write: the outcome, the written row and a message."""
+    outcome: Outcome
+    data: Optional[Any] = None
+    message: str = ''
+
+    @property
+    def ok(self):
+        return self.outcome is Outcome.OK
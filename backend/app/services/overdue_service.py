@@ -0,0 +1,117 @@
+# app/services/overdue_service.py
+
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam, DateTime
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.utils import dialect_name, supports_returning
+from .transaction_service import TransactionService, LOAN_PERIOD_MINUTES, case_by_id
+from .version_service import VersionService
+from .checkpoint_service import CheckpointService
+from .member_stats_service import MemberStatsService
+
+SWEEP_JOB_NAME = 'overdue_sweep'
+# Open loans updated per batch; each batch is one short transaction
+SWEEP_BATCH_SIZE = 500
+
+
+class OverdueService:
+    """
+    Service class for the overdue sweeper.
+
+    Marks open loans past their loan period as 'Overdue' and keeps their
+    accrued_fee current, so overdue reports are a plain indexed read on
+    status instead of a fee calculation over every open loan.
+    """
+
+    @staticmethod
+    def sweep(batch_size=SWEEP_BATCH_SIZE, max_batches=None, now=None):
+        """
+        Runs one pass over overdue loans in id order.
+
+        Each batch is a SELECT of at most `batch_size` loans, one UPDATE
+        refreshing fees on loans already overdue and one UPDATE marking the
+        newly overdue ones, committed together with the job checkpoint and
+        one grouped update of the members' overdue counts. The loans the
+        mark actually flipped come from RETURNING; without it, the batch's
+        rows are locked by the SELECT, so every candidate is flipped. A
+        pass that stops early (max_batches or an error) resumes after the
+        last committed id next time; a finished pass resets the checkpoint.
+
+        Returns a dict with 'scanned', 'newly_overdue', 'batches' and
+        'completed'.
+        """
+        now = now or datetime.now()
+        cutoff = now - timedelta(minutes=LOAN_PERIOD_MINUTES)
+        stats = {'scanned': 0, 'newly_overdue': 0, 'batches': 0, 'completed': False}
+
+        # Row locks keep the batch from changing between SELECT and UPDATE;
+        # SQLite serializes writers instead
+        lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE"
+        returning = supports_returning('update')
+        select_sql = text(f"""
+            SELECT id, member_id, issue_date, status FROM transactions
+            WHERE is_returned = FALSE AND issue_date < :cutoff AND id > :last_id
+            ORDER BY id
+            LIMIT :batch_size{lock}
+        """).bindparams(bindparam('cutoff', type_=DateTime)).columns(issue_date=DateTime)
+
+        try:
+            last_id = OverdueService.get_checkpoint()
+            while max_batches is None or stats['batches'] < max_batches:
+                rows = db.session.execute(select_sql, {
+                    'cutoff': cutoff, 'last_id': last_id, 'batch_size': batch_size
+                }).mappings().fetchall()
+                if not rows:
+                    CheckpointService.save(SWEEP_JOB_NAME, 0, now)
+                    db.session.commit()
+                    stats['completed'] = True
+                    break
+
+                fees = {row['id']: TransactionService.calculate_fee(row['issue_date'], now) for row in rows}
+                overdue = [row['id'] for row in rows if row['status'] == 'Overdue']
+                if overdue:
+                    OverdueService._set_fees(overdue, fees, "status = 'Overdue'")
+                candidates = [row for row in rows if row['status'] != 'Overdue']
+                marked = []
+                if candidates:
+                    flipped = OverdueService._set_fees(
+                        [row['id'] for row in candidates], fees, "status <> 'Overdue'",
+                        mark=True, returning=returning,
+                    )
+                    marked = flipped if returning else [row['member_id'] for row in candidates]
+                MemberStatsService.loans_overdue(marked)
+                last_id = rows[-1]['id']
+                CheckpointService.save(SWEEP_JOB_NAME, last_id, now)
+                VersionService.bump('transactions')
+                db.session.commit()
+
+                stats['batches'] += 1
+                stats['scanned'] += len(rows)
+                stats['newly_overdue'] += len(marked)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Overdue sweep error: {e}")
+        return stats
+
+    @staticmethod
+    def get_checkpoint():
+        """Returns the last transaction id swept in the current pass (0 if none)."""
+        return CheckpointService.get(SWEEP_JOB_NAME)
+
+    @staticmethod
+    def _set_fees(ids, fees, condition, mark=False, returning=False):
+        """
+        Writes each loan's fee from `fees` in one UPDATE over `ids`, limited
+        to open loans matching `condition`; with mark=True also sets status
+        to 'Overdue'. With returning=True returns the updated rows' member ids.
+        """
+        case_sql, params = case_by_id({loan_id: fees[loan_id] for loan_id in ids}, 'fee')
+        status = "status = 'Overdue', " if mark else ""
+        sql = text(f"""
+            UPDATE transactions SET {status}accrued_fee = {case_sql}
+            WHERE id IN :ids AND is_returned = FALSE AND {condition}
+            {"RETURNING member_id" if returning else ""}
+        """).bindparams(bindparam('ids', expanding=True))
+        result = db.session.execute(sql, {'ids': ids, **params})
+        return result.scalars().all() if returning else None
@@ -0,0 +1,166 @@
+# app/services/report_service.py
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import text, bindparam, Date, DateTime
+from app.extensions import db
+from app.utils import date_sql, increment_sql
+
+# Rollup table -> (key columns, counter columns)
+ROLLUPS = {
+    'daily_circulation': (('day',), ('issues', 'returns', 'fees_charged')),
+    'daily_book_issues': (('day', 'book_id'), ('issues',)),
+    'daily_member_activity': (('day', 'member_id'), ('issues', 'returns')),
+}
+
+# Default reporting window for the /reports endpoints
+DEFAULT_REPORT_DAYS = 30
+
+
+def _increment_sql(table):
+    """INSERT that adds to the counters of an existing rollup row instead of failing."""
+    keys, counters = ROLLUPS[table]
+    return text(increment_sql(table, keys, counters)).bindparams(bindparam('day', type_=Date))
+
+
+class ReportService:
+    """
+    Service class for circulation analytics.
+
+    Issue and return events add to small daily rollup tables in the same
+    database transaction, and the /reports endpoints read only those, never
+    GROUP BY over transactions. `rebuild` recomputes a date range from
+    transactions and the archive, for backfills or after a failed event.
+    """
+
+    @staticmethod
+    def record_issues(day, loans):
+        """Adds issue events, given as (book_id, member_id) pairs. Does not commit."""
+        if not loans:
+            return
+        books = Counter(book_id for book_id, _ in loans)
+        members = Counter(member_id for _, member_id in loans)
+        db.session.execute(_increment_sql('daily_circulation'),
+                           {'day': day, 'issues': len(loans), 'returns': 0, 'fees_charged': 0})
+        db.session.execute(_increment_sql('daily_book_issues'), [
+            {'day': day, 'book_id': book_id, 'issues': n} for book_id, n in books.items()
+        ])
+        db.session.execute(_increment_sql('daily_member_activity'), [
+            {'day': day, 'member_id': member_id, 'issues': n, 'returns': 0} for member_id, n in members.items()
+        ])
+
+    @staticmethod
+    def record_returns(day, returns):
+        """Adds return events, given as (member_id, fee) pairs. Does not commit."""
+        if not returns:
+            return
+        members = Counter(member_id for member_id, _ in returns)
+        fees = round(sum(fee for _, fee in returns), 2)
+        db.session.execute(_increment_sql('daily_circulation'),
+                           {'day': day, 'issues': 0, 'returns': len(returns), 'fees_charged': fees})
+        db.session.execute(_increment_sql('daily_member_activity'), [
+            {'day': day, 'member_id': member_id, 'issues': 0, 'returns': n} for member_id, n in members.items()
+        ])
+
+    @staticmethod
+    def rebuild(since, until):
+        """
+        Recomputes every rollup for the days since..until (inclusive) from
+        transactions and the archive, in one database transaction.
+        """
+        start = datetime.combine(since, datetime.min.time())
+        end = datetime.combine(until + timedelta(days=1), datetime.min.time())
+        params = {'since': since, 'until': until, 'start': start, 'end': end}
+        issue_day = date_sql('issue_date')
+        return_day = date_sql('return_date')
+        loans = """(
+            SELECT book_id, member_id, issue_date, return_date, fee_charged, is_returned FROM transactions
+            UNION ALL
+            SELECT book_id, member_id, issue_date, return_date, fee_charged, is_returned FROM transactions_archive
+        )"""
+        events = f"""(
+            SELECT {issue_day} AS day, book_id, member_id, 1 AS issues, 0 AS returns, 0 AS fee
+            FROM {loans} issued WHERE issue_date >= :start AND issue_date < :end
+            UNION ALL
+            SELECT {return_day}, book_id, member_id, 0, 1, fee_charged
+            FROM {loans} returned WHERE is_returned = TRUE AND return_date >= :start AND return_date < :end
+        ) events"""
+
+        types = {'since': Date, 'until': Date, 'start': DateTime, 'end': DateTime}
+
+        def run(sql):
+            binds = [bindparam(name, type_=type_) for name, type_ in types.items() if f":{name}" in sql]
+            db.session.execute(text(sql).bindparams(*binds), params)
+
+        for table in ROLLUPS:
+            run(f"DELETE FROM {table} WHERE day >= :since AND day <= :until")
+        run(f"""
+            INSERT INTO daily_circulation (day, issues, returns, fees_charged)
+            SELECT day, SUM(issues), SUM(returns), SUM(fee) FROM {events} GROUP BY day
+        """)
+        run(f"""
+            INSERT INTO daily_book_issues (day, book_id, issues)
+            SELECT day, book_id, SUM(issues) FROM {events} WHERE issues = 1 GROUP BY day, book_id
+        """)
+        run(f"""
+            INSERT INTO daily_member_activity (day, member_id, issues, returns)
+            SELECT day, member_id, SUM(issues), SUM(returns) FROM {events} GROUP BY day, member_id
+        """)
+        db.session.commit()
+
+    @staticmethod
+    def _window_params(since, until):
+        until = until or date.today()
+        since = since or until - timedelta(days=DEFAULT_REPORT_DAYS - 1)
+        return {'since': since, 'until': until}
+
+    @staticmethod
+    def _query(sql, params, **columns):
+        sql = text(sql).bindparams(bindparam('since', type_=Date), bindparam('until', type_=Date)).columns(**columns)
+        return [dict(row) for row in db.session.execute(sql, params).mappings()]
+
+    @staticmethod
+    def get_daily(since=None, until=None):
+        """Returns issues, returns and fees charged per day in the window."""
+        rows = ReportService._query("""
+            SELECT day, issues, returns, fees_charged FROM daily_circulation
+            WHERE day >= :since AND day <= :until
+            ORDER BY day
+        """, ReportService._window_params(since, until), day=Date)
+        for row in rows:
+            row['fees_charged'] = float(row['fees_charged'])
+        return rows
+
+    @staticmethod
+    def get_top_books(since=None, until=None, limit=10):
+        """Returns the most issued books in the window."""
+        params = ReportService._window_params(since, until)
+        params['limit'] = limit
+        return ReportService._query("""
+            SELECT r.book_id, b.title, b.author, r.issues
+            FROM (
+                SELECT book_id, SUM(issues) AS issues FROM daily_book_issues
+                WHERE day >= :since AND day <= :until
+                GROUP BY book_id
+            ) r
+            JOIN books b ON b.id = r.book_id
+            ORDER BY r.issues DESC, r.book_id
+            LIMIT :limit
+        """, params)
+
+    @staticmethod
+    def get_busiest_members(since=None, until=None, limit=10):
+        """Returns the members with the most issues and returns in the window."""
+        params = ReportService._window_params(since, until)
+        params['limit'] = limit
+        return ReportService._query("""
+            SELECT r.member_id, m.name, r.issues, r.returns
+            FROM (
+                SELECT member_id, SUM(issues) AS issues, SUM(returns) AS returns FROM daily_member_activity
+                WHERE day >= :since AND day <= :until
+                GROUP BY member_id
+            ) r
+            JOIN members m ON m.id = r.member_id
+            ORDER BY r.issues + r.returns DESC, r.member_id
+            LIMIT :limit
+        """, params)
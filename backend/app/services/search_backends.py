@@ -0,0 +1,201 @@
+# app/services/search_backends.py
+
+import re
+from abc import ABC, abstractmethod
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models import Book
+from app.utils import dialect_name
+
+BOOK_COLUMNS = "b.id, b.title, b.author, b.isbn, b.total_stock, b.available_stock"
+
+
+def tokenize_query(query):
+    """Splits a free-text query into lowercase word tokens."""
+    return re.findall(r"\w+", (query or "").lower())
+
+
+class SearchBackend(ABC):
+    """
+    Base class for book full-text search backends.
+
+    A backend knows how to create the dialect's full-text index over
+    books.title and books.author, and how to run a ranked, paginated search
+    against it. The index is kept in sync by the database itself (triggers,
+    generated columns or native FULLTEXT maintenance), so create, update and
+    delete paths need no extra work.
+    """
+
+    def ensure_index(self, connection):
+        """Creates the full-text index if it does not exist yet."""
+
+    def drop_index(self, connection):
+        """Drops any objects that are not removed together with `books`."""
+
+    @abstractmethod
+    def search(self, terms, limit, offset):
+        """Returns one page of books matching every term, best matches first."""
+
+
+class LikeSearchBackend(SearchBackend):
+    """Fallback for dialects without a supported full-text index."""
+
+    def search(self, terms, limit, offset):
+        conditions = []
+        params = {'limit': limit, 'offset': offset}
+        for i, term in enumerate(terms):
+            conditions.append(f"(b.title LIKE :term{i} OR b.author LIKE :term{i})")
+            params[f'term{i}'] = f"%{term}%"
+        sql = text(f"""
+        SELECT {BOOK_COLUMNS}
+        FROM books b
+        WHERE {' AND '.join(conditions)}
+        ORDER BY b.title, b.id
+        LIMIT :limit OFFSET :offset
+        """)
+        return db.session.execute(sql, params).mappings().fetchall()
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 external-content table kept in sync with triggers."""
+
+    DDL = [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+            title, author, content='books', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+            INSERT INTO books_fts(books_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author ON books BEGIN
+            INSERT INTO books_fts(books_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+            INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+        END
+        """,
+    ]
+
+    def ensure_index(self, connection):
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+        )).fetchone()
+        for statement in self.DDL:
+            connection.execute(text(statement))
+        if not exists:
+            # Index any books that were inserted before the index existed
+            connection.execute(text("INSERT INTO books_fts(books_fts) VALUES ('rebuild')"))
+
+    def drop_index(self, connection):
+        connection.execute(text("DROP TABLE IF EXISTS books_fts"))
+
+    def search(self, terms, limit, offset):
+        # Quote every token and treat the last one as a prefix so results
+        # update while the user is still typing.
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        sql = text(f"""
+        SELECT {BOOK_COLUMNS}
+        FROM books_fts
+        JOIN books b ON b.id = books_fts.rowid
+        WHERE books_fts MATCH :match
+        ORDER BY books_fts.rank, b.id
+        LIMIT :limit OFFSET :offset
+        """)
+        return db.session.execute(sql, {'match': match, 'limit': limit, 'offset': offset}).mappings().fetchall()
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Stored tsvector column with a GIN index."""
+
+    DDL = [
+        """
+        ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, ''))
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_books_search_vector ON books USING GIN (search_vector)",
+    ]
+
+    def ensure_index(self, connection):
+        for statement in self.DDL:
+            connection.execute(text(statement))
+
+    def search(self, terms, limit, offset):
+        tsquery = " & ".join(terms) + ":*"
+        sql = text(f"""
+        SELECT {BOOK_COLUMNS}
+        FROM books b
+        WHERE b.search_vector @@ to_tsquery('simple', :tsquery)
+        ORDER BY ts_rank(b.search_vector, to_tsquery('simple', :tsquery)) DESC, b.id
+        LIMIT :limit OFFSET :offset
+        """)
+        return db.session.execute(sql, {'tsquery': tsquery, 'limit': limit, 'offset': offset}).mappings().fetchall()
+
+
+class MySQLSearchBackend(SearchBackend):
+    """InnoDB FULLTEXT index searched in boolean mode."""
+
+    INDEX_NAME = "ft_books_title_author"
+
+    def ensure_index(self, connection):
+        exists = connection.execute(text("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'books' AND index_name = :name
+        """), {'name': self.INDEX_NAME}).scalar()
+        if not exists:
+            connection.execute(text(f"ALTER TABLE books ADD FULLTEXT INDEX {self.INDEX_NAME} (title, author)"))
+
+    def search(self, terms, limit, offset):
+        against = " ".join(f"+{term}" for term in terms) + "*"
+        sql = text(f"""
+        SELECT {BOOK_COLUMNS}
+        FROM books b
+        WHERE MATCH(b.title, b.author) AGAINST (:against IN BOOLEAN MODE)
+        ORDER BY MATCH(b.title, b.author) AGAINST (:against IN BOOLEAN MODE) DESC, b.id
+        LIMIT :limit OFFSET :offset
+        """)
+        return db.session.execute(sql, {'against': against, 'limit': limit, 'offset': offset}).mappings().fetchall()
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+    'mysql': MySQLSearchBackend,
+}
+
+
+def get_search_backend(name=None):
+    """Returns the search backend for the given (or current) dialect."""
+    name = name or dialect_name()
+    return BACKENDS.get(name, LikeSearchBackend)()
+
+
+def ensure_search_index():
+    """Creates the full-text index for the current database if needed."""
+    try:
+        with db.engine.begin() as connection:
+            get_search_backend(connection.dialect.name).ensure_index(connection)
+    except SQLAlchemyError as e:
+        print(f"Error creating book search index: {e}")
+
+
+@event.listens_for(Book.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    get_search_backend(connection.dialect.name).ensure_index(connection)
+
+
+@event.listens_for(Book.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    get_search_backend(connection.dialect.name).drop_index(connection)
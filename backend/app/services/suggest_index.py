@@ -0,0 +1,262 @@
+# app/services/suggest_index.py
+
+import re
+import threading
+import time
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+from collections import namedtuple
+from itertools import chain
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+
+# Multi-term queries whose exact terms leave at most this many books rank
+# those books directly instead of walking the last term's postings
+DIRECT_RANK_LIMIT = 2000
+# Rebuild from the database in the background after this many seconds, so
+# writes made by other worker processes show up eventually
+REFRESH_SECONDS = 300
+
+
+def normalize_tokens(value):
+    """Lowercases, strips diacritics and splits a string into word tokens."""
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return re.findall(r"\w+", value.lower())
+
+
+# Books containing a token, each list sorted by rank within its score:
+# `first` have it as their first title token, `title` anywhere in the title,
+# `author` only in the author. Entries are (len(title), title_key, book_id,
+# title, author, title_tokens, author_tokens); lists are tuples that
+# updates replace, so a reader can use them after releasing the lock.
+Posting = namedtuple('Posting', 'ids first title author')
+EMPTY_POSTING = Posting(frozenset(), (), (), ())
+
+
+def make_entry(book_id, title, author):
+    """Builds the posting entry for a book."""
+    title_words = normalize_tokens(title)
+    title_tokens = tuple(dict.fromkeys(title_words))
+    author_tokens = tuple(t for t in dict.fromkeys(normalize_tokens(author)) if t not in title_tokens)
+    return (len(title or ""), " ".join(title_words), book_id, title, author, title_tokens, author_tokens)
+
+
+def entry_roles(entry):
+    """Yields (token, posting field) for every list an entry belongs in."""
+    title_tokens, author_tokens = entry[5], entry[6]
+    if title_tokens:
+        yield title_tokens[0], 'first'
+    for token in title_tokens:
+        yield token, 'title'
+    for token in author_tokens:
+        yield token, 'author'
+
+
+def prefix_end(prefix):
+    """The smallest string greater than every string starting with `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class PrefixIndex:
+    """
+    Compact in-memory prefix index over book title and author tokens.
+
+    Tokens are kept in a sorted list so that all tokens starting with a
+    prefix form one contiguous run found with a binary search. Each token
+    has a Posting of the books containing it, presorted by rank, so a
+    suggestion is a best-first merge over the run that stops after `limit`
+    books instead of ranking every match. Lookups never touch the database,
+    and ranking runs outside the lock on immutable postings.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._reset()
+
+    def _reset(self):
+        self._tokens = []
+        self._postings = {}
+        self._entries = {}
+        self.built_at = None
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def add(self, book_id, title, author):
+        """Adds or replaces a book in the index."""
+        entry = make_entry(book_id, title, author)
+        with self._lock:
+            self._remove(book_id)
+            self._entries[book_id] = entry
+            self._update(entry, insert=True)
+
+    def remove(self, book_id):
+        """Removes a book from the index."""
+        with self._lock:
+            self._remove(book_id)
+
+    def _remove(self, book_id):
+        entry = self._entries.pop(book_id, None)
+        if entry:
+            self._update(entry, insert=False)
+
+    def _update(self, entry, insert):
+        """Adds or drops an entry in each of its postings, replacing the changed lists."""
+        book_id = entry[2]
+        fields = {}
+        for token, field in entry_roles(entry):
+            fields.setdefault(token, []).append(field)
+        for token, names in fields.items():
+            posting = self._postings.get(token, EMPTY_POSTING)
+            changes = {}
+            for name in names:
+                entries = list(getattr(posting, name))
+                if insert:
+                    insort(entries, entry)
+                else:
+                    entries.remove(entry)
+                changes[name] = tuple(entries)
+            ids = posting.ids | {book_id} if insert else posting.ids - {book_id}
+            if ids:
+                if token not in self._postings:
+                    insort(self._tokens, token)
+                self._postings[token] = posting._replace(ids=ids, **changes)
+            else:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+
+    def rebuild(self):
+        """Reloads the whole index from the books table."""
+        sql = text("SELECT id, title, author FROM books")
+        entries = {}
+        lists = {}
+        try:
+            rows = db.session.execute(sql.execution_options(stream_results=True, yield_per=5000))
+            for book_id, title, author in rows:
+                entry = entries[book_id] = make_entry(book_id, title, author)
+                for token, field in entry_roles(entry):
+                    lists.setdefault(token, {'first': [], 'title': [], 'author': []})[field].append(entry)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Error building book suggestion index: {e}")
+            return False
+        postings = {
+            token: Posting(
+                frozenset(entry[2] for entry in chain(fields['title'], fields['author'])),
+                tuple(sorted(fields['first'])), tuple(sorted(fields['title'])), tuple(sorted(fields['author']))
+            )
+            for token, fields in lists.items()
+        }
+        with self._lock:
+            self._tokens, self._postings, self._entries = sorted(postings), postings, entries
+            self.built_at = time.monotonic()
+        return True
+
+    def ensure_fresh(self):
+        """Builds the index on first use and refreshes it when stale."""
+        if not self.is_built:
+            self.rebuild()
+        else:
+            self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        """Starts a single background rebuild if the index is stale."""
+        with self._lock:
+            if self._refreshing or time.monotonic() - self.built_at < REFRESH_SECONDS:
+                return
+            self._refreshing = True
+        app = current_app._get_current_object()
+
+        def run():
+            try:
+                with app.app_context():
+                    self.rebuild()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="book-suggest-refresh", daemon=True).start()
+
+    def suggest(self, prefix, limit=10):
+        """
+        Returns up to `limit` books matching `prefix`.
+
+        Every term but the last must match a title or author token exactly;
+        the last term is matched as a prefix. Titles that start with the
+        query rank first, then title matches, then author-only matches;
+        ties go to the shorter title.
+        """
+        terms = normalize_tokens(prefix)
+        if not terms:
+            return []
+
+        *complete, last = terms
+        with self._lock:
+            exact = [self._postings.get(term) for term in complete]
+            run = [self._postings[token] for token in
+                   self._tokens[bisect_left(self._tokens, last):bisect_left(self._tokens, prefix_end(last))]]
+        if not run or None in exact:
+            return []
+
+        query = " ".join(terms)
+        required = None
+        if exact:
+            first_term = exact[0]
+            exact.sort(key=lambda posting: len(posting.ids))
+            required = exact[0].ids.intersection(*[posting.ids for posting in exact[1:]])
+            if not required:
+                return []
+            if len(required) <= DIRECT_RANK_LIMIT:
+                return self._rank_directly(exact[0], required, query, last, limit)
+            # A title starting with the query starts with the first exact term
+            starts = (entry for entry in first_term.first if entry[1].startswith(query))
+        else:
+            starts = heapq.merge(*[posting.first for posting in run])
+
+        streams = (
+            starts,
+            heapq.merge(*[posting.title for posting in run]),
+            heapq.merge(*[posting.author for posting in run]),
+        )
+        results = []
+        seen = set()
+        for entry in chain.from_iterable(streams):
+            book_id = entry[2]
+            if book_id in seen or (required is not None and book_id not in required):
+                continue
+            seen.add(book_id)
+            results.append({"id": book_id, "title": entry[3], "author": entry[4]})
+            if len(results) == limit:
+                break
+        return results
+
+    @staticmethod
+    def _rank_directly(posting, required, query, last, limit):
+        """Ranks the few books left by the exact terms, taken from one of their postings."""
+        candidates = {
+            entry[2]: entry for entry in chain(posting.title, posting.author)
+            if entry[2] in required and any(token.startswith(last) for token in entry[5] + entry[6])
+        }
+
+        def rank(entry):
+            if entry[1].startswith(query):
+                score = 0
+            elif any(token.startswith(last) for token in entry[5]):
+                score = 1
+            else:
+                score = 2
+            return score, entry[:3]
+
+        return [
+            {"id": entry[2], "title": entry[3], "author": entry[4]}
+            for entry in heapq.nsmallest(limit, candidates.values(), key=rank)
+        ]
+
+
+# Process-wide index, built at worker start and updated by BookService
+book_suggest_index = PrefixIndex()
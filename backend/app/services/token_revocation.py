@@ -0,0 +1,99 @@
+# app/services/token_revocation.py
+
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import text, DateTime
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+
+# Ids below the newest seen that were missing from a poll are re-read for
+# this long, in case their transaction commits after a higher id's did
+GAP_SECONDS = 60
+# Most missing ids tracked below the newest seen one
+GAP_SPAN = 1000
+
+
+class RevokedTokenSet:
+    """
+    In-memory copy of the unexpired JTIs in token_blocklist.
+
+    Lookups are a dict membership test. The set catches up with revocations
+    made by other workers through a since-id poll (`WHERE id > last seen`),
+    run by at most one thread and at most once per `poll_interval` seconds,
+    so a token revoked elsewhere may still be accepted for that long.
+    Ids can commit out of order, so ids skipped by a poll are remembered as
+    gaps and re-read by later polls for GAP_SECONDS; rows are keyed by jti,
+    so re-reading is harmless. Revocations made in this process are added
+    at once. Entries are dropped once the token they block has expired anyway.
+    """
+
+    def __init__(self, poll_interval):
+        self.poll_interval = poll_interval
+        self._revoked = {}  # jti -> expires_at
+        self._last_id = 0
+        self._gaps = {}  # missing id -> monotonic deadline
+        self._loaded = False
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        """Returns True if `jti` has been revoked."""
+        if time.monotonic() >= self._next_poll:
+            self.refresh(wait=not self._loaded)
+        return jti in self._revoked
+
+    def add(self, jti, expires_at):
+        """Records a revocation committed by this process."""
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def refresh(self, wait=True):
+        """
+        Reads blocklist rows added since the last poll, plus any that fill
+        earlier gaps. With wait=False it returns at once if another thread
+        is already polling.
+        """
+        if not self._lock.acquire(blocking=wait):
+            return
+        try:
+            if not wait and time.monotonic() < self._next_poll:
+                return
+            # Re-scan from the oldest open gap; ids already seen just refresh their jti
+            low = min(self._gaps) - 1 if self._gaps else self._last_id
+            rows = db.session.execute(text("""
+                SELECT id, jti, expires_at FROM token_blocklist WHERE id > :low ORDER BY id
+            """).columns(expires_at=DateTime), {'low': low}).fetchall()
+            now = datetime.now()
+            deadline = time.monotonic() + GAP_SECONDS
+            revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+            for row_id, jti, expires_at in rows:
+                if expires_at > now:
+                    revoked[jti] = expires_at
+                self._gaps.pop(row_id, None)
+                if row_id > self._last_id:
+                    for missing in range(max(self._last_id + 1, row_id - GAP_SPAN), row_id):
+                        self._gaps[missing] = deadline
+                    self._last_id = row_id
+            current = time.monotonic()
+            self._gaps = {
+                gap: until for gap, until in self._gaps.items()
+                if until > current and gap > self._last_id - GAP_SPAN
+            }
+            self._revoked = revoked
+            self._loaded = True
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Revoked token refresh failed: {e}")
+        finally:
+            self._next_poll = time.monotonic() + self.poll_interval
+            self._lock.release()
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+def revoked_tokens():
+    """Returns the current app's revoked-token set."""
+    return current_app.extensions['revoked_tokens']
@@ -1,9 +1,18 @@
 # app/services/transaction_service.py
 
-from datetime import datetime
-from sqlalchemy import text
+from collections import Counter
+from datetime import datetime, time, timedelta
+from sqlalchemy import text, bindparam, DateTime
 from sqlalchemy.exc import SQLAlchemyError
 from app.extensions import db
+from app.utils import clamp_page_size, dialect_name, supports_returning, DEFAULT_PAGE_SIZE
+from .entity_cache import book_cache, member_cache, record_availability
+from .version_service import VersionService
+from .outcomes import Outcome, WriteResult
+from .archive_service import ArchiveService
+from .member_stats_service import MemberStatsService
+from .report_service import ReportService
+from .hold_service import HoldService, hold_notifier
 
 # Constants - MODIFIED FOR MINUTES
 # Let's set the loan period to, say, 1 minute for easy testing
@@ -16,13 +25,66 @@ FEE_PER_MINUTE = 1.00
 FIXED_RETURN_FEE = 10.00 # Keep if still relevant for fixed fees
 DEBT_LIMIT = 500.00 # Keep as the overall limit
 
+# A return retries when the sweeper changes the loan's status under it
+RETURN_ATTEMPTS = 3
+
+TRANSACTION_STATUSES = ('Issued', 'Returned', 'Overdue')
+# Date range filters accepted by get_all_transactions, as (column, operator);
+# bounds are inclusive, and a bare date covers that whole day
+DATE_FILTERS = {
+    'issued_from': ("t.issue_date", ">="),
+    'issued_to': ("t.issue_date", "<="),
+    'returned_from': ("t.return_date", ">="),
+    'returned_to': ("t.return_date", "<="),
+}
+
+TRANSACTION_COLUMNS = "id, book_id, member_id, issue_date, return_date, fee_charged, accrued_fee, is_returned, status"
+
+def case_by_id(values, prefix):
+    """
+    Builds `CASE id WHEN :p0_id THEN :p0 ... END` for a dict {id: value}.
+    Returns (sql, params) so one statement can apply a different value per row.
+    """
+    whens = []
+    params = {}
+    for i, (row_id, value) in enumerate(values.items()):
+        whens.append(f"WHEN :{prefix}{i}_id THEN :{prefix}{i}")
+        params[f"{prefix}{i}_id"] = row_id
+        params[f"{prefix}{i}"] = value
+    return f"CASE id {' '.join(whens)} END", params
+
+
 class TransactionService:
     """Service class for managing book transactions."""
 
     @staticmethod
-    def get_all_transactions():
-        """Retrieves all transactions."""
-        sql = text("""
+    def get_all_transactions(after=None, limit=DEFAULT_PAGE_SIZE, filters=None, order='desc'):
+        """
+        Retrieves one filtered page of transactions.
+
+        Transactions are ordered by id (ids are assigned in issue order),
+        newest first unless `order` is 'asc', and `after` is the id of the
+        last transaction on the previous page. `filters` may contain:
+
+            status, is_returned, member_id, book_id,
+            issued_from, issued_to, returned_from, returned_to (datetimes,
+                or dates meaning the whole day),
+            overdue (True: open loans past the loan period)
+
+        All filters are applied in SQL. Returns a tuple
+        (transactions, next_cursor), where next_cursor is None on the last
+        page.
+        """
+        limit = clamp_page_size(limit)
+        descending = order != 'asc'
+        conditions, params = TransactionService._filter_conditions(filters or {})
+        if after is not None:
+            conditions.append("t.id < :after" if descending else "t.id > :after")
+            params['after'] = after
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params['limit'] = limit + 1
+
+        sql = text(f"""
         SELECT
             t.id,
             t.book_id,
@@ -32,20 +94,53 @@ class TransactionService:
             t.issue_date,
             t.return_date,
             t.fee_charged,
+            t.accrued_fee,
             t.is_returned,
             t.status
         FROM transactions t
         JOIN books b ON t.book_id = b.id
         JOIN members m ON t.member_id = m.id
-        ORDER BY t.issue_date DESC
-        """)
+        {where}
+        ORDER BY t.id {'DESC' if descending else 'ASC'}
+        LIMIT :limit
+        """).bindparams(*[
+            # Bind datetimes with the column type so SQLite compares like-formatted strings
+            bindparam(name, type_=DateTime) for name, value in params.items() if isinstance(value, datetime)
+        ])
         try:
-            results = db.session.execute(sql).mappings().fetchall()
-            return [dict(row) for row in results]
+            results = db.session.execute(sql, params).mappings().fetchall()
+            transactions = [dict(row) for row in results[:limit]]
+            next_cursor = transactions[-1]['id'] if len(results) > limit else None
+            return transactions, next_cursor
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Error retrieving all transactions: {e}")
-            return []
+            return [], None
+
+    @staticmethod
+    def _filter_conditions(filters):
+        """Builds WHERE conditions and bind parameters for get_all_transactions."""
+        conditions = []
+        params = {}
+        for column in ('status', 'is_returned', 'member_id', 'book_id'):
+            if filters.get(column) is not None:
+                conditions.append(f"t.{column} = :{column}")
+                params[column] = filters[column]
+        for name, (column, operator) in DATE_FILTERS.items():
+            value = filters.get(name)
+            if value is None:
+                continue
+            if not isinstance(value, datetime):
+                # A date-only upper bound includes the whole day: before the next midnight
+                value = datetime.combine(value, time.min)
+                if operator == "<=":
+                    operator, value = "<", value + timedelta(days=1)
+            conditions.append(f"{column} {operator} :{name}")
+            params[name] = value
+        if filters.get('overdue'):
+            conditions.append("t.is_returned = FALSE AND t.issue_date < :overdue_before")
+            params['overdue_before'] = datetime.now() - timedelta(minutes=LOAN_PERIOD_MINUTES)
+        return conditions, params
 
     # @staticmethod
     # def calculate_fee(issue_date, return_date):
@@ -89,80 +184,149 @@ class TransactionService:
 
     @staticmethod
     def issue_book(book_id, member_id):
-        """Issues a book to a member."""
-        try:
-            # Check book stock
-            book_sql = text("SELECT available_stock FROM books WHERE id = :book_id")
-            book_result = db.session.execute(book_sql, {'book_id': book_id}).fetchone()
-            if not book_result or book_result[0] <= 0:
-                return False, "Book not available."
-
-            # Check member debt
-            debt = TransactionService.get_member_debt(member_id)
-            if debt is None:
-                return False, "Member not found."
-            if debt >= DEBT_LIMIT:
-                return False, f"Member has outstanding debt (KES {debt}) exceeding limit."
+        """
+        Issues a book to a member.
 
-            # Decrement stock and create transaction
-            db.session.execute(text(
-                "UPDATE books SET available_stock = available_stock - 1 WHERE id = :book_id"
-            ), {'book_id': book_id})
+        The stock check, the member's debt check and the stock decrement
+        happen in one conditional UPDATE, so concurrent checkouts of the last
+        copy can never oversell. The failure reason is only looked up when
+        the update matched no row.
 
-            db.session.execute(text("""
-                INSERT INTO transactions (book_id, member_id, issue_date, is_returned, status)
-                VALUES (:book_id, :member_id, :issue_date, :is_returned, :status)
-            """), {
-                'book_id': book_id,
-                'member_id': member_id,
-                'issue_date': datetime.now(),
-                'is_returned': False,
-                'status': 'Issued'
-            })
+        A member with a Ready hold on the book gets the copy set aside for
+        them, which is already out of available_stock.
 
+        Returns a WriteResult whose data is the new transaction row, or
+        UNAVAILABLE / NOT_FOUND / DEBT_OUTSTANDING / ERROR.
+        """
+        try:
+            reserved = HoldService.consume(book_id, member_id, DEBT_LIMIT)
+            if reserved:
+                stock, matched = None, True
+            else:
+                stock, matched = TransactionService._adjust_stock("""
+                    UPDATE books SET available_stock = available_stock - 1
+                    WHERE id = :book_id AND available_stock > 0
+                    AND EXISTS (
+                        SELECT 1 FROM members
+                        WHERE id = :member_id AND outstanding_debt < :debt_limit
+                    )
+                """, {'book_id': book_id, 'member_id': member_id, 'debt_limit': DEBT_LIMIT})
+            if not matched:
+                db.session.rollback()
+                return TransactionService._issue_failure(book_id, member_id)
+
+            now = datetime.now()
+            transaction = TransactionService._insert_transaction(book_id, member_id, now)
+            MemberStatsService.loans_issued([member_id])
+            ReportService.record_issues(now.date(), [(book_id, member_id)])
+
+            VersionService.bump('books', 'transactions')
             db.session.commit()
-            return True, "Book issued successfully."
+            if reserved:
+                hold_notifier.notify(book_id)
+            else:
+                book_cache.invalidate(book_id)
+                record_availability(book_id, stock)
+            return WriteResult(Outcome.OK, transaction, "Book issued successfully.")
 
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Issue Error: {e}")
-            return False, "Error issuing book."
+            return WriteResult(Outcome.ERROR, message="Error issuing book.")
+
+    @staticmethod
+    def _adjust_stock(sql, params):
+        """
+        Runs a single-row stock UPDATE on books.
+
+        Returns (available_stock, matched). available_stock is read back
+        with RETURNING where supported and is None otherwise.
+        """
+        if supports_returning('update'):
+            row = db.session.execute(text(sql + " RETURNING available_stock"), params).fetchone()
+            return (row[0], True) if row else (None, False)
+        result = db.session.execute(text(sql), params)
+        return None, result.rowcount > 0
+
+    @staticmethod
+    def _issue_failure(book_id, member_id):
+        """Works out why a conditional issue matched no row, in one query."""
+        row = db.session.execute(text("""
+            SELECT
+                (SELECT available_stock FROM books WHERE id = :book_id) AS available_stock,
+                (SELECT outstanding_debt FROM members WHERE id = :member_id) AS debt
+        """), {'book_id': book_id, 'member_id': member_id}).mappings().fetchone()
+        if row['available_stock'] is None or row['available_stock'] <= 0:
+            return WriteResult(Outcome.UNAVAILABLE, message="Book not available.")
+        if row['debt'] is None:
+            return WriteResult(Outcome.NOT_FOUND, message="Member not found.")
+        if float(row['debt']) >= DEBT_LIMIT:
+            return WriteResult(
+                Outcome.DEBT_OUTSTANDING,
+                message=f"Member has outstanding debt (KES {float(row['debt'])}) exceeding limit."
+            )
+        # A concurrent return restocked the book after our update missed it
+        return WriteResult(Outcome.UNAVAILABLE, message="Book not available.")
 
     @staticmethod
     def return_book(transaction_id):
-        """Processes a return."""
+        """
+        Processes a return.
+
+        The transaction is closed with a conditional UPDATE on is_returned,
+        so two concurrent returns of the same loan cannot both restock the
+        book or charge the fee twice. The UPDATE also checks the status that
+        was read, so the member's overdue count stays right if the sweeper
+        marks the loan Overdue in between; the return is then retried.
+        If the book has waiting holds, the copy is set aside for the oldest
+        one instead of going back into available_stock.
+
+        Returns a WriteResult whose data holds the transaction id and the
+        fee charged, or NOT_FOUND / INVALID (already returned) / ERROR.
+        """
         try:
             transaction_sql = text("""
-                SELECT id, book_id, member_id, issue_date, return_date, is_returned
+                SELECT id, book_id, member_id, issue_date, is_returned, status
                 FROM transactions WHERE id = :transaction_id
-            """)
-            result = db.session.execute(transaction_sql, {'transaction_id': transaction_id}).mappings().fetchone()
-            if not result:
-                return False, "Transaction not found."
+            """).columns(issue_date=DateTime)
+            for _ in range(RETURN_ATTEMPTS):
+                result = db.session.execute(transaction_sql, {'transaction_id': transaction_id}).mappings().fetchone()
+                if not result:
+                    return WriteResult(Outcome.NOT_FOUND, message="Transaction not found.")
 
-            txn = dict(result)
-            if txn['is_returned']:
-                return False, "Book already returned."
+                txn = dict(result)
+                if txn['is_returned']:
+                    return WriteResult(Outcome.INVALID, message="Book already returned.")
 
-            now = datetime.now()
-            # This line now calls the modified calculate_fee method that uses minutes
-            fee = TransactionService.calculate_fee(txn['issue_date'], now)
+                now = datetime.now()
+                # This line now calls the modified calculate_fee method that uses minutes
+                fee = TransactionService.calculate_fee(txn['issue_date'], now)
 
-            # Update transaction
-            db.session.execute(text("""
-                UPDATE transactions SET return_date = :return_date,
-                fee_charged = :fee_charged, is_returned = TRUE, status = 'Returned'
-                WHERE id = :transaction_id
-            """), {
-                'return_date': now,
-                'fee_charged': fee,
-                'transaction_id': transaction_id
-            })
+                # Close the transaction, unless another request already did
+                closed = db.session.execute(text("""
+                    UPDATE transactions SET return_date = :return_date,
+                    fee_charged = :fee_charged, accrued_fee = :fee_charged, is_returned = TRUE, status = 'Returned'
+                    WHERE id = :transaction_id AND is_returned = FALSE AND status = :status
+                """), {
+                    'return_date': now,
+                    'fee_charged': fee,
+                    'transaction_id': transaction_id,
+                    'status': txn['status']
+                })
+                if closed.rowcount:
+                    break
+                db.session.rollback()
+            else:
+                return WriteResult(Outcome.ERROR, message="Error returning book.")
 
-            # Increment stock
-            db.session.execute(text("""
-                UPDATE books SET available_stock = available_stock + 1 WHERE id = :book_id
-            """), {'book_id': txn['book_id']})
+            # The copy goes to the oldest waiting hold, or back on the shelf
+            # (never above the total)
+            reserved = HoldService.allocate({txn['book_id']: 1}, now)
+            if not reserved:
+                stock, _ = TransactionService._adjust_stock("""
+                    UPDATE books SET available_stock = available_stock + 1
+                    WHERE id = :book_id AND available_stock < total_stock
+                """, {'book_id': txn['book_id']})
 
             # Add fee to member debt
             db.session.execute(text("""
@@ -171,34 +335,375 @@ class TransactionService:
                 'fee': fee,
                 'member_id': txn['member_id']
             })
+            MemberStatsService.loans_closed([(txn['member_id'], txn['status'] == 'Overdue')])
+            ReportService.record_returns(now.date(), [(txn['member_id'], fee)])
 
+            VersionService.bump('books', 'members', 'transactions')
             db.session.commit()
+            if reserved:
+                hold_notifier.notify(txn['book_id'])
+            else:
+                book_cache.invalidate(txn['book_id'])
+                record_availability(txn['book_id'], stock)
+            member_cache.invalidate(txn['member_id'])
             # The success message will still show the calculated fee
-            return True, f"Book returned successfully. Fee charged: KES {fee:.2f}."
+            return WriteResult(
+                Outcome.OK,
+                {'id': transaction_id, 'book_id': txn['book_id'], 'member_id': txn['member_id'],
+                 'return_date': now, 'fee_charged': fee},
+                f"Book returned successfully. Fee charged: KES {fee:.2f}."
+            )
 
         except SQLAlchemyError as e:
             db.session.rollback()
             print(f"Return Error: {e}")
-            return False, "Error returning book."
+            return WriteResult(Outcome.ERROR, message="Error returning book.")
 
     @staticmethod
-    def get_transactions_by_member(member_id):
-        sql = text("""
-            SELECT t.id, t.book_id, b.title AS book_title, t.member_id, t.issue_date,
-            t.return_date, t.fee_charged, t.is_returned, t.status
+    def issue_books(member_id, book_ids):
+        """
+        Issues several books to one member in a single database transaction.
+
+        The member's debt is checked once, copies set aside for the member's
+        Ready holds are used first, stock for the rest is taken by one
+        set-based UPDATE (a title requested n times needs n copies), and
+        the transaction rows are inserted with one executemany. Titles that
+        cannot be issued do not block the others.
+
+        Returns a WriteResult whose data is a list of per-book results
+        ({'book_id', 'outcome', 'message', 'transaction'}), or NOT_FOUND /
+        DEBT_OUTSTANDING / ERROR for the whole batch.
+        """
+        try:
+            # Locked so a concurrent return's fee cannot slip in after the check
+            lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE"
+            debt = db.session.execute(text(f"""
+                SELECT outstanding_debt FROM members WHERE id = :member_id{lock}
+            """), {'member_id': member_id}).scalar()
+            if debt is None:
+                db.session.rollback()
+                return WriteResult(Outcome.NOT_FOUND, message="Member not found.")
+            if float(debt) >= DEBT_LIMIT:
+                db.session.rollback()
+                return WriteResult(
+                    Outcome.DEBT_OUTSTANDING,
+                    message=f"Member has outstanding debt (KES {float(debt)}) exceeding limit."
+                )
+
+            # Copies set aside for the member's Ready holds come first
+            reserved = HoldService.consume_many(member_id, book_ids)
+            wanted = Counter(book_ids) - Counter(reserved)
+            taken, existing = TransactionService._take_stock(wanted) if wanted else ({}, set())
+            existing |= reserved
+            granted = Counter(reserved) + Counter({book_id: wanted[book_id] for book_id in taken})
+            remaining = granted.copy()
+            issued = []
+            for book_id in book_ids:
+                if remaining[book_id]:
+                    remaining[book_id] -= 1
+                    issued.append(book_id)
+            new_rows = []
+            if issued:
+                now = datetime.now()
+                # One row at a time so each id comes from its own insert; reading
+                # back by issue_date misses on MySQL, which drops microseconds
+                new_rows = [TransactionService._insert_transaction(book_id, member_id, now) for book_id in issued]
+                MemberStatsService.loans_issued([member_id] * len(issued))
+                ReportService.record_issues(now.date(), [(book_id, member_id) for book_id in issued])
+                VersionService.bump('books', 'transactions')
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Batch Issue Error: {e}")
+            return WriteResult(Outcome.ERROR, message="Error issuing books.")
+
+        for book_id, stock in taken.items():
+            book_cache.invalidate(book_id)
+            record_availability(book_id, stock)
+        hold_notifier.notify(*reserved)
+
+        new_rows = iter(new_rows)
+        results = []
+        for book_id in book_ids:
+            if granted[book_id]:
+                granted[book_id] -= 1
+                results.append({'book_id': book_id, 'outcome': Outcome.OK.value,
+                                'message': "Book issued successfully.", 'transaction': next(new_rows)})
+            elif book_id in existing:
+                results.append({'book_id': book_id, 'outcome': Outcome.UNAVAILABLE.value,
+                                'message': "Book not available."})
+            else:
+                results.append({'book_id': book_id, 'outcome': Outcome.NOT_FOUND.value,
+                                'message': "Book not found."})
+        return WriteResult(Outcome.OK, results, f"{len(issued)} of {len(book_ids)} books issued.")
+
+    @staticmethod
+    def _insert_transaction(book_id, member_id, issue_date):
+        """Inserts an open loan and returns its row, read back with RETURNING or built from lastrowid."""
+        params = {
+            'book_id': book_id,
+            'member_id': member_id,
+            'issue_date': issue_date,
+            'is_returned': False,
+            'status': 'Issued'
+        }
+        insert_sql = """
+            INSERT INTO transactions (book_id, member_id, issue_date, is_returned, status)
+            VALUES (:book_id, :member_id, :issue_date, :is_returned, :status)
+        """
+        if supports_returning('insert'):
+            row = db.session.execute(text(insert_sql + f" RETURNING {TRANSACTION_COLUMNS}")
+                                     .columns(issue_date=DateTime), params).mappings().fetchone()
+            return dict(row)
+        inserted = db.session.execute(text(insert_sql), params)
+        return dict(params, id=inserted.lastrowid, return_date=None, fee_charged=0.00, accrued_fee=0.00)
+
+    @staticmethod
+    def _take_stock(wanted):
+        """
+        Takes wanted[book_id] copies of every title that has enough stock,
+        all-or-nothing per title, in one UPDATE.
+
+        Returns (taken, existing): taken maps each title that was taken to
+        its new available_stock (None if it could not be read back), and
+        existing is the set of requested ids that exist.
+        """
+        ids = list(wanted)
+        amount_sql, params = case_by_id(wanted, 'n')
+        params['ids'] = ids
+        update_sql = f"""
+            UPDATE books SET available_stock = available_stock - {amount_sql}
+            WHERE id IN :ids AND available_stock >= {amount_sql}
+        """
+        if supports_returning('update'):
+            rows = db.session.execute(
+                text(update_sql + " RETURNING id, available_stock").bindparams(bindparam('ids', expanding=True)),
+                params
+            ).fetchall()
+            taken = dict(rows)
+            untaken = [book_id for book_id in ids if book_id not in taken]
+            existing = set(taken) | TransactionService._existing_book_ids(untaken)
+            return taken, existing
+
+        # No RETURNING (MySQL): lock the rows, decide in Python, then update
+        # only the titles with enough stock
+        lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE"
+        rows = db.session.execute(text(
+            f"SELECT id, available_stock FROM books WHERE id IN :ids{lock}"
+        ).bindparams(bindparam('ids', expanding=True)), {'ids': ids}).fetchall()
+        existing = {book_id for book_id, _ in rows}
+        taken = {book_id: stock - wanted[book_id] for book_id, stock in rows if stock >= wanted[book_id]}
+        if taken:
+            amount_sql, params = case_by_id({book_id: wanted[book_id] for book_id in taken}, 'n')
+            params['ids'] = list(taken)
+            db.session.execute(text(f"""
+                UPDATE books SET available_stock = available_stock - {amount_sql} WHERE id IN :ids
+            """).bindparams(bindparam('ids', expanding=True)), params)
+        return taken, existing
+
+    @staticmethod
+    def _existing_book_ids(book_ids):
+        """Returns the subset of book_ids that exist."""
+        if not book_ids:
+            return set()
+        rows = db.session.execute(text(
+            "SELECT id FROM books WHERE id IN :ids"
+        ).bindparams(bindparam('ids', expanding=True)), {'ids': book_ids}).scalars()
+        return set(rows)
+
+    @staticmethod
+    def return_books(transaction_ids):
+        """
+        Processes several returns in a single database transaction.
+
+        Open loans are closed by one UPDATE (guarded by is_returned and the
+        status that was read, as in return_book), returned copies go to
+        waiting holds first, stock for the rest is restored by one UPDATE
+        and fees are added to each member's debt by one UPDATE.
+
+        Returns a WriteResult whose data is a list of per-transaction results
+        ({'transaction_id', 'outcome', 'message', 'fee_charged'}), or ERROR.
+        """
+        transaction_ids = list(dict.fromkeys(transaction_ids))
+        try:
+            lock = "" if dialect_name() == 'sqlite' else " FOR UPDATE"
+            select_sql = text(f"""
+                SELECT id, book_id, member_id, issue_date, is_returned, status
+                FROM transactions WHERE id IN :ids{lock}
+            """).bindparams(bindparam('ids', expanding=True)).columns(issue_date=DateTime)
+            found = db.session.execute(select_sql, {'ids': transaction_ids}).mappings().fetchall()
+            found = {row['id']: dict(row) for row in found}
+
+            now = datetime.now()
+            fees = {
+                txn_id: TransactionService.calculate_fee(txn['issue_date'], now)
+                for txn_id, txn in found.items() if not txn['is_returned']
+            }
+            closed = set()
+            pending = list(fees)
+            for _ in range(RETURN_ATTEMPTS):
+                if not pending:
+                    break
+                closed |= TransactionService._close_loans(
+                    {txn_id: (fees[txn_id], found[txn_id]['status']) for txn_id in pending}, now
+                )
+                pending = [txn_id for txn_id in pending if txn_id not in closed]
+                if pending:
+                    # Re-read loans whose status changed under us and retry the open ones
+                    for row in db.session.execute(select_sql, {'ids': pending}).mappings():
+                        found[row['id']] = dict(row)
+                    pending = [txn_id for txn_id in pending if not found[txn_id]['is_returned']]
+
+            returned = Counter(found[txn_id]['book_id'] for txn_id in closed)
+            restock = Counter()
+            reserved = Counter()
+            member_fees = Counter()
+            for txn_id in closed:
+                member_fees[found[txn_id]['member_id']] += fees[txn_id]
+            stocks = {}
+            if closed:
+                MemberStatsService.loans_closed(
+                    (found[txn_id]['member_id'], found[txn_id]['status'] == 'Overdue') for txn_id in closed
+                )
+                ReportService.record_returns(now.date(), [(found[txn_id]['member_id'], fees[txn_id]) for txn_id in closed])
+                # Copies go to waiting holds first, the rest back on the shelf
+                reserved = HoldService.allocate(returned, now)
+                restock = returned - reserved
+                if restock:
+                    stocks = TransactionService._restock(restock)
+                amount_sql, params = case_by_id({m: round(fee, 2) for m, fee in member_fees.items()}, 'fee')
+                params['ids'] = list(member_fees)
+                db.session.execute(text(f"""
+                    UPDATE members SET outstanding_debt = outstanding_debt + {amount_sql} WHERE id IN :ids
+                """).bindparams(bindparam('ids', expanding=True)), params)
+                VersionService.bump('books', 'members', 'transactions')
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Batch Return Error: {e}")
+            return WriteResult(Outcome.ERROR, message="Error returning books.")
+
+        for book_id in restock:
+            book_cache.invalidate(book_id)
+            record_availability(book_id, stocks.get(book_id))
+        member_cache.invalidate(*member_fees)
+        hold_notifier.notify(*reserved)
+
+        results = []
+        for txn_id in transaction_ids:
+            if txn_id not in found:
+                results.append({'transaction_id': txn_id, 'outcome': Outcome.NOT_FOUND.value,
+                                'message': "Transaction not found."})
+            elif txn_id not in closed:
+                results.append({'transaction_id': txn_id, 'outcome': Outcome.INVALID.value,
+                                'message': "Book already returned."})
+            else:
+                results.append({'transaction_id': txn_id, 'outcome': Outcome.OK.value,
+                                'message': f"Book returned successfully. Fee charged: KES {fees[txn_id]:.2f}.",
+                                'fee_charged': fees[txn_id]})
+        return WriteResult(Outcome.OK, results, f"{len(closed)} of {len(transaction_ids)} books returned.")
+
+    @staticmethod
+    def _close_loans(loans, now):
+        """
+        Closes open loans, given as {id: (fee, expected status)}, in one
+        UPDATE. Loans whose status no longer matches are left open.
+        Returns the set of ids actually closed by this call.
+        """
+        fee_sql, params = case_by_id({txn_id: fee for txn_id, (fee, _) in loans.items()}, 'fee')
+        status_sql, status_params = case_by_id({txn_id: status for txn_id, (_, status) in loans.items()}, 'st')
+        params.update(status_params)
+        params.update({'ids': list(loans), 'return_date': now})
+        sql = f"""
+            UPDATE transactions SET return_date = :return_date, fee_charged = {fee_sql},
+            accrued_fee = {fee_sql}, is_returned = TRUE, status = 'Returned'
+            WHERE id IN :ids AND is_returned = FALSE AND status = {status_sql}
+        """
+        if supports_returning('update'):
+            rows = db.session.execute(text(sql + " RETURNING id").bindparams(
+                bindparam('ids', expanding=True), bindparam('return_date', type_=DateTime)
+            ), params).scalars()
+            return set(rows)
+        # Without RETURNING the rows were locked by the caller's SELECT ... FOR UPDATE
+        db.session.execute(text(sql).bindparams(
+            bindparam('ids', expanding=True), bindparam('return_date', type_=DateTime)
+        ), params)
+        return set(loans)
+
+    @staticmethod
+    def _restock(counts):
+        """
+        Returns counts[book_id] copies of each title in one UPDATE, never
+        above total_stock. Returns {book_id: new available_stock} where it
+        can be read back.
+        """
+        amount_sql, params = case_by_id(counts, 'n')
+        params['ids'] = list(counts)
+        sql = f"""
+            UPDATE books SET available_stock = CASE
+                WHEN available_stock + {amount_sql} > total_stock THEN total_stock
+                ELSE available_stock + {amount_sql} END
+            WHERE id IN :ids
+        """
+        if supports_returning('update'):
+            rows = db.session.execute(
+                text(sql + " RETURNING id, available_stock").bindparams(bindparam('ids', expanding=True)), params
+            ).fetchall()
+            return dict(rows)
+        db.session.execute(text(sql).bindparams(bindparam('ids', expanding=True)), params)
+        return {}
+
+    @staticmethod
+    def get_transactions_by_member(member_id, after=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Retrieves one page of a member's transactions, newest first.
+
+        Reads the hot table first. The archive is only queried when the page
+        reaches ids at or below the archive watermark, so recent pages never
+        touch it; archived rows are merged in by id. Returns a tuple
+        (transactions, next_cursor), where next_cursor is None on the last
+        page.
+        """
+        limit = clamp_page_size(limit)
+        params = {'member_id': member_id, 'after': after, 'limit': limit + 1}
+        where = "AND t.id < :after" if after is not None else ""
+        columns = "t.id, t.book_id, b.title AS book_title, t.member_id, t.issue_date, " \
+                  "t.return_date, t.fee_charged, t.accrued_fee, t.is_returned, t.status"
+
+        rows = db.session.execute(text(f"""
+            SELECT {columns}
             FROM transactions t
             JOIN books b ON t.book_id = b.id
-            WHERE t.member_id = :member_id
-            ORDER BY t.issue_date DESC
-        """)
-        results = db.session.execute(sql, {'member_id': member_id}).mappings().fetchall()
-        return [dict(row) for row in results]
+            WHERE t.member_id = :member_id {where}
+            ORDER BY t.id DESC
+            LIMIT :limit
+        """), params).mappings().fetchall()
+        rows = [dict(row) for row in rows]
+
+        # Archived ids are all <= the watermark, so they can only land on
+        # this page if the hot rows ran out or reach below it
+        watermark = ArchiveService.get_watermark()
+        if watermark and (len(rows) <= limit or rows[-1]['id'] < watermark):
+            archived = db.session.execute(text(f"""
+                SELECT {columns}
+                FROM transactions_archive t
+                JOIN books b ON t.book_id = b.id
+                WHERE t.member_id = :member_id {where}
+                ORDER BY t.id DESC
+                LIMIT :limit
+            """), params).mappings().fetchall()
+            if archived:
+                rows = sorted(rows + [dict(row) for row in archived], key=lambda row: row['id'], reverse=True)
+
+        transactions = rows[:limit]
+        next_cursor = transactions[-1]['id'] if len(rows) > limit else None
+        return transactions, next_cursor
 
     @staticmethod
     def get_open_transactions_by_member(member_id):
         sql = text("""
             SELECT t.id, t.book_id, b.title AS book_title, t.member_id, t.issue_date,
-            t.return_date, t.fee_charged, t.is_returned, t.status
+            t.return_date, t.fee_charged, t.accrued_fee, t.is_returned, t.status
             FROM transactions t
             JOIN books b ON t.book_id = b.id
             WHERE t.member_id = :member_id AND t.is_returned = FALSE
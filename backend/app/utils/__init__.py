@@ -1,3 +1,36 @@
 from .helpers import (
-    fix_postgres_url
-)
\ No newline at end of file
+    fix_postgres_url,
+    clamp_page_size,
+    parse_page_args,
+    parse_id_list,
+    chunks,
+    get_upload_stream,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    MAX_IDS_PER_REQUEST,
+)
+from .dialect import (
+    dialect_name,
+    supports_returning,
+    date_sql,
+    epoch_us_sql,
+    increment_sql,
+    upsert_sql,
+)
+from .cache import (
+    TTLCache,
+)
+from .scheduler import (
+    PeriodicTask,
+)
+from .notifier import (
+    Notifier,
+)
+from .circuit_breaker import (
+    CircuitBreaker,
+)
+from .rate_limit import (
+    MemoryRateLimitStore,
+    SQLiteRateLimitStore,
+    rate_limit_store,
+)
@@ -0,0 +1,77 @@
+from app.extensions import db
+
+
+def dialect_name(bind=None):
+    """
+    Returns the name of the SQL dialect in use ('sqlite', 'postgresql',
+    'mysql', ...). Works inside and outside of a request context.
+    """
+    bind = bind if bind is not None else db.session.get_bind()
+    return bind.dialect.name
+
+
+def supports_returning(kind, bind=None):
+    """
+    Returns True if the dialect supports RETURNING for `kind` statements
+    ('insert', 'update' or 'delete'), e.g. PostgreSQL and SQLite >= 3.35.
+    """
+    bind = bind if bind is not None else db.session.get_bind()
+    return bool(getattr(bind.dialect, f"{kind}_returning", False))
+
+
+def date_sql(column, bind=None):
+    """
+    Returns a SQL expression truncating a DATETIME column to its date.
+    SQLite and MySQL have DATE(); PostgreSQL uses a cast.
+    """
+    if dialect_name(bind) == 'postgresql':
+        return f"CAST({column} AS DATE)"
+    return f"DATE({column})"
+
+
+
+def epoch_us_sql(column, bind=None):
+    """
+    Returns a SQL expression giving a naive DATETIME column as whole
+    microseconds since 1970-01-01, read as UTC like numpy's datetime64.
+    """
+    name = dialect_name(bind)
+    if name == 'postgresql':
+        return f"CAST(EXTRACT(EPOCH FROM {column}) * 1000000 AS BIGINT)"
+    if name == 'mysql':
+        # UNIX_TIMESTAMP() would apply the session time zone
+        return f"TIMESTAMPDIFF(MICROSECOND, '1970-01-01 00:00:00', {column})"
+    # SQLite stores 'YYYY-MM-DD HH:MM:SS[.ffffff]'; strftime('%s') would round
+    # the fraction, so whole seconds and microseconds are read separately
+    return (
+        f"CAST(strftime('%s', substr({column}, 1, 19)) AS INTEGER) * 1000000"
+        f" + CAST(substr({column} || '000000', 21, 6) AS INTEGER)"
+    )
+
+def increment_sql(table, keys, counters, bind=None):
+    """
+    Returns an INSERT that adds its counter values to an existing row with
+    the same key instead of failing, as one statement so concurrent writers
+    of a new key cannot collide on the primary key.
+    """
+    columns = tuple(keys) + tuple(counters)
+    insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"
+    if dialect_name(bind) == 'mysql':
+        updates = ', '.join(f"{c} = {c} + VALUES({c})" for c in counters)
+        return f"{insert} ON DUPLICATE KEY UPDATE {updates}"
+    updates = ', '.join(f"{c} = {table}.{c} + excluded.{c}" for c in counters)
+    return f"{insert} ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+
+
+def upsert_sql(table, keys, columns, bind=None):
+    """
+    Returns an INSERT that overwrites `columns` on an existing row with the
+    same key instead of failing; the set-value counterpart of increment_sql.
+    """
+    names = tuple(keys) + tuple(columns)
+    insert = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(':' + c for c in names)})"
+    if dialect_name(bind) == 'mysql':
+        updates = ', '.join(f"{c} = VALUES({c})" for c in columns)
+        return f"{insert} ON DUPLICATE KEY UPDATE {updates}"
+    updates = ', '.join(f"{c} = excluded.{c}" for c in columns)
+    return f"{insert} ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
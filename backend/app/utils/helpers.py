@@ -1,4 +1,77 @@
+# Default and hard maximum page sizes for keyset-paginated list endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Most ids accepted by one multi-get request
+MAX_IDS_PER_REQUEST = 1000
+# Most values bound into one IN (...) list, well under SQLite's parameter limit
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
 def fix_postgres_url(url):
     if url and url.startswith("postgres://"):
         return url.replace("postgres://", "postgresql+psycopg2://", 1)
     return url
+
+
+def clamp_page_size(limit):
+    """Clamps a requested page size to the range 1..MAX_PAGE_SIZE."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def parse_page_args(args):
+    """
+    Parses keyset pagination arguments (?after=<id>&limit=<n>) from a request.
+
+    Returns a tuple (after, limit). Raises ValueError if either value is not
+    a valid integer.
+    """
+    after = args.get('after')
+    limit = args.get('limit')
+    try:
+        after = int(after) if after not in (None, '') else None
+        limit = int(limit) if limit not in (None, '') else None
+    except ValueError:
+        raise ValueError("'after' and 'limit' must be integers")
+    return after, clamp_page_size(limit)
+
+
+def parse_id_list(value):
+    """
+    Parses a list of ids from a comma-separated string or a JSON list.
+
+    Duplicates are dropped, first occurrence wins, so the result keeps the
+    caller's order. Raises ValueError if an id is not an integer or there
+    are more than MAX_IDS_PER_REQUEST.
+    """
+    if isinstance(value, str):
+        value = [part for part in value.split(',') if part.strip()]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError("'ids' must be a list of integers")
+    try:
+        ids = list(dict.fromkeys(int(item) for item in value))
+    except (TypeError, ValueError):
+        raise ValueError("'ids' must be a list of integers")
+    if len(ids) > MAX_IDS_PER_REQUEST:
+        raise ValueError(f"At most {MAX_IDS_PER_REQUEST} ids per request")
+    return ids
+
+
+def chunks(items, size=IN_CLAUSE_CHUNK_SIZE):
+    """Yields successive slices of `items` of at most `size` elements."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def get_upload_stream(req):
+    """
+    Returns (stream, filename, mimetype) for an uploaded file.
+
+    Accepts either a multipart upload in the 'file' field or a raw request
+    body. The stream is read lazily; nothing is buffered here.
+    """
+    upload = req.files.get('file')
+    if upload:
+        return upload.stream, upload.filename, upload.mimetype
+    return req.stream, None, req.mimetype
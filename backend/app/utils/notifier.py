@@ -0,0 +1,38 @@
+import threading
+
+
+class Notifier:
+    """
+    Lets threads wait for a change to a key without polling.
+
+    Each key has a version counter. A waiter reads the version before
+    checking the state it cares about and then waits for the version to
+    move, so a notification sent in between is never missed. Only threads
+    in the same process are woken.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._versions = {}
+
+    def version(self, key):
+        """Returns the current version of `key`."""
+        with self._condition:
+            return self._versions.get(key, 0)
+
+    def notify(self, *keys):
+        """Bumps the given keys and wakes every waiter."""
+        if not keys:
+            return
+        with self._condition:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._condition.notify_all()
+
+    def wait(self, key, seen, timeout):
+        """
+        Blocks until the version of `key` differs from `seen`, or `timeout`
+        seconds pass. Returns True if it changed.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._versions.get(key, 0) != seen, timeout)
@@ -0,0 +1,123 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+
+def sliding_window(previous, current, elapsed, window, limit):
+    """
+    Sliding-window counter check.
+
+    `previous` and `current` are the hits in the last and the current fixed
+    window, and `elapsed` is how far into the current window we are. The
+    previous window is weighted by how much of it still overlaps the
+    sliding window. Returns (allowed, retry_after_seconds).
+    """
+    weight = 1 - elapsed / window
+    if previous * weight + current + 1 <= limit:
+        return True, 0
+    if current + 1 > limit:
+        # Wait for the next window, then for enough of this one to slide out
+        wait = window - elapsed + max(0.0, window * (1 - (limit - 1) / current))
+    else:
+        wait = window * (1 - (limit - 1 - current) / previous) - elapsed
+    return False, max(1, math.ceil(wait))
+
+
+class MemoryRateLimitStore:
+    """Sliding-window counters in this process's memory."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._counters = {}  # key -> [window_start, previous, current]
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, now=None):
+        """Counts a hit for `key` if it is under `limit` per `window` seconds. Returns (allowed, retry_after)."""
+        now = time.time() if now is None else now
+        start = now - now % window
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[0] < start - window:
+                counter = [start, 0, 0]
+            elif counter[0] < start:
+                counter = [start, counter[2], 0]
+            allowed, retry_after = sliding_window(counter[1], counter[2], now - start, window, limit)
+            if allowed:
+                counter[2] += 1
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._prune(now, window)
+            return allowed, retry_after
+
+    def _prune(self, now, window):
+        cutoff = now - 2 * window
+        self._counters = {key: c for key, c in self._counters.items() if c[0] >= cutoff}
+
+
+class SQLiteRateLimitStore:
+    """
+    Sliding-window counters in a local SQLite file, shared by every worker
+    process on the host. Each hit is one short write transaction.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT NOT NULL, window_start INTEGER NOT NULL, count INTEGER NOT NULL,
+                expires_at REAL NOT NULL, PRIMARY KEY (key, window_start)
+            )
+        """)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def hit(self, key, limit, window, now=None):
+        """Counts a hit for `key` if it is under `limit` per `window` seconds. Returns (allowed, retry_after)."""
+        now = time.time() if now is None else now
+        start = int(now - now % window)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            counts = dict(connection.execute(
+                "SELECT window_start, count FROM rate_limits WHERE key = ? AND window_start IN (?, ?)",
+                (key, start - window, start)
+            ).fetchall())
+            allowed, retry_after = sliding_window(
+                counts.get(start - window, 0), counts.get(start, 0), now - start, window, limit
+            )
+            if allowed:
+                connection.execute("""
+                    INSERT INTO rate_limits (key, window_start, count, expires_at) VALUES (?, ?, 1, ?)
+                    ON CONFLICT (key, window_start) DO UPDATE SET count = count + 1
+                """, (key, start, start + 2 * window))
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                connection.execute("DELETE FROM rate_limits WHERE expires_at < ?", (now,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+
+def rate_limit_store(url):
+    """Builds a store from RATELIMIT_STORAGE_URL: 'memory://' or 'sqlite:///path/to/file.db'."""
+    if not url or url == 'memory://':
+        return MemoryRateLimitStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteRateLimitStore(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported RATELIMIT_STORAGE_URL: {url}")
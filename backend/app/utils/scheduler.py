@@ -0,0 +1,39 @@
+import threading
+
+
+class PeriodicTask:
+    """
+    Runs a function every `interval` seconds on a daemon thread.
+
+    Meant for light in-process housekeeping. Each worker process that starts
+    one runs its own copy, so enable it on a single process (or use the
+    matching CLI command from cron) when running several workers.
+    """
+
+    def __init__(self, name, interval, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts the background thread if it is not already running."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Signals the thread to stop and waits for the current run to finish."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as e:
+                print(f"Periodic task {self.name} failed: {e}")
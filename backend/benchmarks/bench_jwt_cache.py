@@ -0,0 +1,92 @@
+"""
+Microbenchmark for the verified-JWT cache behind token_required.
+
+Times AuthService.validate_token for one access token, as every request
+of a session does, with the cache warm and with it cleared before each
+call (a signature check every time, the previous behaviour). Also times a
+full GET /auth/me through the test client both ways, to show the saving
+per request.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_jwt_cache --iterations 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.services.entity_cache import verified_token_cache
+from config import config, TestingConfig
+from werkzeug.security import generate_password_hash
+
+
+def build_app(database_url):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    config["benchmark"] = BenchmarkConfig
+    return create_app("benchmark")
+
+
+def compare(fn, iterations):
+    """
+    Returns mean microseconds per call of fn (uncached, cached). Cold and
+    warm calls alternate so drift over the run affects both equally.
+    """
+    cold = warm = 0.0
+    for _ in range(iterations):
+        verified_token_cache.clear()
+        started = time.perf_counter()
+        fn()
+        cold += time.perf_counter() - started
+        started = time.perf_counter()
+        fn()
+        warm += time.perf_counter() - started
+    return cold / iterations * 1e6, warm / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    app = build_app(f"sqlite:///{path}")
+    try:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            user = User(username="bench", email="bench@example.com", password_hash=generate_password_hash("pw"))
+            db.session.add(user)
+            db.session.commit()
+            token = AuthService.generate_access_token(user.id)
+            headers = {"Authorization": f"Bearer {token}"}
+            client = app.test_client()
+
+            validate = lambda: AuthService.validate_token(token)
+            request = lambda: client.get("/api/v1/auth/me", headers=headers)
+            request()  # load the revoked-token set before timing
+
+            requests = max(1, args.iterations // 10)
+            rows = [
+                ("validate_token", *compare(validate, args.iterations)),
+                ("GET /auth/me", *compare(request, requests)),
+            ]
+            print(f"{'':16}{'uncached us':>14}{'cached us':>12}{'saved us':>12}")
+            for name, cold, warm in rows:
+                print(f"{name:16}{cold:14.1f}{warm:12.1f}{cold - warm:12.1f}")
+            db.session.remove()
+            db.drop_all()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Multi-threaded stress benchmark for TransactionService.issue_book and
+return_book.
+
+Many threads hammer a handful of popular titles with random checkouts and
+returns. At the end the script checks the stock invariants:
+
+    0 <= available_stock <= total_stock
+    available_stock == total_stock - open loans - copies set aside for Ready holds
+
+and reports issues/sec and returns/sec.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.stress_issue_return --threads 8 --seconds 10
+    python -m benchmarks.stress_issue_return --database-url postgresql+psycopg2://...
+
+By default a throwaway SQLite file is used. Point --database-url at a real
+PostgreSQL or MySQL database to measure row-level locking; the benchmark
+drops and recreates all tables there.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from app import create_app
+from app.extensions import db
+from config import config, TestingConfig
+from sqlalchemy import text
+
+
+def build_app(database_url):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = (
+            {"connect_args": {"timeout": 30}} if database_url.startswith("sqlite") else {}
+        )
+
+    config["benchmark"] = BenchmarkConfig
+    return create_app("benchmark")
+
+
+def seed(books, copies, members):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES (:title, 'Bench Author', :copies, :copies)
+    """), [{"title": f"Popular {i}", "copies": copies} for i in range(books)])
+    db.session.execute(text("""
+        INSERT INTO members (name, outstanding_debt) VALUES (:name, 0)
+    """), [{"name": f"Member {i}"} for i in range(members)])
+    db.session.commit()
+
+
+def worker(app, deadline, book_ids, member_ids, counts, lock, seed_value):
+    from app.services import TransactionService
+
+    rng = random.Random(seed_value)
+    local = Counter()
+    open_loans = []
+    with app.app_context():
+        while time.monotonic() < deadline:
+            if open_loans and rng.random() < 0.45:
+                transaction_id = open_loans.pop(rng.randrange(len(open_loans)))
+                result = TransactionService.return_book(transaction_id)
+                local["returns" if result.ok else f"return failed: {result.message}"] += 1
+                continue
+
+            book_id = rng.choice(book_ids)
+            member_id = rng.choice(member_ids)
+            result = TransactionService.issue_book(book_id, member_id)
+            if result.ok:
+                local["issues"] += 1
+                open_loans.append(result.data["id"])
+            else:
+                local[f"issue failed: {result.message}"] += 1
+        db.session.remove()
+    with lock:
+        counts.update(local)
+
+
+def check_invariants():
+    rows = db.session.execute(text("""
+        SELECT b.id, b.total_stock, b.available_stock,
+            (SELECT COUNT(*) FROM transactions t WHERE t.book_id = b.id AND t.is_returned = FALSE) AS open_loans,
+            (SELECT COUNT(*) FROM holds h WHERE h.book_id = b.id AND h.status = 'Ready') AS ready_holds
+        FROM books b
+    """)).mappings().fetchall()
+    violations = []
+    for row in rows:
+        if not 0 <= row["available_stock"] <= row["total_stock"]:
+            violations.append(f"book {row['id']}: available {row['available_stock']} outside 0..{row['total_stock']}")
+        if row["available_stock"] != row["total_stock"] - row["open_loans"] - row["ready_holds"]:
+            violations.append(
+                f"book {row['id']}: available {row['available_stock']} != "
+                f"total {row['total_stock']} - open {row['open_loans']} - ready holds {row['ready_holds']}"
+            )
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--books", type=int, default=3)
+    parser.add_argument("--copies", type=int, default=5)
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "stress.db")
+
+    app = build_app(database_url)
+    with app.app_context():
+        seed(args.books, args.copies, args.members)
+        book_ids = [row[0] for row in db.session.execute(text("SELECT id FROM books"))]
+        member_ids = [row[0] for row in db.session.execute(text("SELECT id FROM members"))]
+
+    counts = Counter()
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        # Each thread gets its own members, so debt checks don't interfere
+        threading.Thread(target=worker, args=(app, deadline, book_ids, member_ids[i::args.threads], counts, lock, i))
+        for i in range(args.threads)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    with app.app_context():
+        violations = check_invariants()
+
+    print(f"database: {database_url}")
+    print(f"threads={args.threads} books={args.books} copies={args.copies} elapsed={elapsed:.1f}s")
+    print(f"issues/sec:  {counts['issues'] / elapsed:.1f}")
+    print(f"returns/sec: {counts['returns'] / elapsed:.1f}")
+    for key, value in sorted(counts.items()):
+        print(f"  {key}: {value}")
+    if violations:
+        print("STOCK INVARIANT VIOLATED:")
+        for violation in violations:
+            print(f"  {violation}")
+        raise SystemExit(1)
+    print("stock invariants hold")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,42 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-key-please-change")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JSON_SORT_KEYS = False
+    # Seconds between in-process housekeeping sweeps (overdue loans, hold
+    # expiry, token blocklist purge); 0 disables the scheduler (run
+    # `flask sweep-overdue`, `flask expire-holds` and
+    # `flask purge-token-blocklist` from cron instead)
+    OVERDUE_SWEEP_INTERVAL_SECONDS = int(os.environ.get("OVERDUE_SWEEP_INTERVAL_SECONDS", 0))
+    # Returned transactions older than this many days move to transactions_archive
+    ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 365))
+    # How long a stored Idempotency-Key response is replayed for
+    IDEMPOTENCY_KEY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_KEY_TTL_SECONDS", 24 * 60 * 60))
+    # How long an unfinished request holds its key before a retry may take it over
+    IDEMPOTENCY_CLAIM_LEASE_SECONDS = int(os.environ.get("IDEMPOTENCY_CLAIM_LEASE_SECONDS", 60))
+    # Longest a token revoked by another worker can still be accepted here
+    REVOKED_TOKEN_POLL_SECONDS = float(os.environ.get("REVOKED_TOKEN_POLL_SECONDS", 1))
+    # Outgoing mail. Messages are queued in email_outbox and sent by a
+    # separate `flask email-worker` process running EMAIL_WORKERS threads,
+    # or by `flask send-emails` from cron
+    MAIL_SERVER = os.environ.get("MAIL_SERVER", "smtp.gmail.com")
+    MAIL_PORT = int(os.environ.get("MAIL_PORT", 587))
+    MAIL_USE_TLS = os.environ.get("MAIL_USE_TLS", "true").lower() in ("true", "1", "yes")
+    MAIL_USERNAME = os.environ.get("EMAIL_USER")
+    MAIL_PASSWORD = os.environ.get("EMAIL_PASSWORD")
+    MAIL_TIMEOUT = float(os.environ.get("MAIL_TIMEOUT", 10))
+    EMAIL_WORKERS = int(os.environ.get("EMAIL_WORKERS", 2))
+    EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", 20))
+    EMAIL_POLL_SECONDS = float(os.environ.get("EMAIL_POLL_SECONDS", 5))
+    # Auth rate limits as "count/seconds", per client IP and per account
+    # email. Use a sqlite:/// file so all workers on a host share counters.
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "true").lower() in ("true", "1", "yes")
+    RATELIMIT_STORAGE_URL = os.environ.get("RATELIMIT_STORAGE_URL", "memory://")
+    RATELIMIT_LOGIN_IP = os.environ.get("RATELIMIT_LOGIN_IP", "20/60")
+    RATELIMIT_LOGIN_ACCOUNT = os.environ.get("RATELIMIT_LOGIN_ACCOUNT", "5/300")
+    RATELIMIT_REGISTER_IP = os.environ.get("RATELIMIT_REGISTER_IP", "10/3600")
+    RATELIMIT_FORGOT_PASSWORD_IP = os.environ.get("RATELIMIT_FORGOT_PASSWORD_IP", "5/600")
+    RATELIMIT_FORGOT_PASSWORD_ACCOUNT = os.environ.get("RATELIMIT_FORGOT_PASSWORD_ACCOUNT", "3/3600")
+    RATELIMIT_RESET_PASSWORD_IP = os.environ.get("RATELIMIT_RESET_PASSWORD_IP", "10/600")
+    RATELIMIT_REFRESH_IP = os.environ.get("RATELIMIT_REFRESH_IP", "60/60")
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -21,6 +57,8 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
+    OVERDUE_SWEEP_INTERVAL_SECONDS = 0
+    EMAIL_WORKERS = 0
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "TEST_DATABASE_URL", "sqlite:///test.db"
     )
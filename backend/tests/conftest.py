@@ -2,6 +2,7 @@ import pytest
 from app import create_app
 from app.extensions import db
 from app.models.user import User
+from app.services.entity_cache import ENTITY_CACHES
 
 @pytest.fixture
 def app():
@@ -15,6 +16,10 @@ def app():
         db.session.remove()
         db.drop_all()
 
+    # In-process caches outlive the app; don't leak entries between tests
+    for cache in ENTITY_CACHES:
+        cache.clear()
+
 @pytest.fixture
 def client(app):
     """Create a test client for the app."""
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.services import ArchiveService
+
+
+def seed(loans):
+    """One book and member; `loans` lists the return age in days of each loan (None = still open)."""
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 10, 10)
+    """))
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+    now = datetime.now()
+    db.session.execute(text("""
+        INSERT INTO transactions (book_id, member_id, issue_date, return_date, is_returned, status)
+        VALUES (1, 1, :issue_date, :return_date, :is_returned, :status)
+    """), [{
+        "issue_date": now - timedelta(days=(age or 0) + 1),
+        "return_date": now - timedelta(days=age) if age is not None else None,
+        "is_returned": age is not None,
+        "status": "Returned" if age is not None else "Issued",
+    } for age in loans])
+    db.session.commit()
+
+
+def count(table):
+    return db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+class TestTransactionArchive:
+    """Tests for moving old returned transactions to the archive."""
+
+    def test_archives_only_old_returned(self, app):
+        """Test open loans and recent returns stay in the hot table."""
+        seed([400, None, 10, 500])
+
+        stats = ArchiveService.archive_returned(older_than_days=365, batch_size=1)
+
+        assert (stats["archived"], stats["batches"], stats["completed"]) == (2, 2, True)
+        assert count("transactions") == 2
+        assert count("transactions_archive") == 2
+        assert ArchiveService.get_watermark() == 4
+
+    def test_member_history_pages_through_archive(self, client, app):
+        """Test history merges archived rows by id once the page reaches them."""
+        seed([400, None, 10, 500, None])
+        ArchiveService.archive_returned(older_than_days=365)
+
+        first = json.loads(client.get("/api/v1/transactions/member/1?limit=2").data)
+        second = json.loads(client.get(f"/api/v1/transactions/member/1?limit=2&after={first['next_cursor']}").data)
+        third = json.loads(client.get(f"/api/v1/transactions/member/1?limit=2&after={second['next_cursor']}").data)
+
+        pages = [[row["id"] for row in page["data"]] for page in (first, second, third)]
+        assert pages == [[5, 4], [3, 2], [1]]
+        assert third["next_cursor"] is None
+
+    def test_ids_not_reused_after_archiving(self, client, app):
+        """Test a new loan never takes an archived id."""
+        seed([400])
+        ArchiveService.archive_returned(older_than_days=365)
+
+        response = client.post("/api/v1/transactions/issue", data=json.dumps({"book_id": 1, "member_id": 1}),
+                               content_type="application/json")
+
+        assert json.loads(response.data)["data"]["id"] == 2
+
+    def test_cli(self, app):
+        """Test the archive command reports how much it moved."""
+        seed([400])
+
+        result = app.test_cli_runner().invoke(args=["archive-transactions", "--older-than-days", "30"])
+
+        assert "1 transactions moved" in result.output
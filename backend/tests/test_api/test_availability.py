@@ -0,0 +1,54 @@
+import json
+from unittest.mock import patch
+from sqlalchemy import text
+from app.extensions import db
+from app.services import BookService, TransactionService
+from app.services.entity_cache import availability_cache
+
+
+def seed(stock=2):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES ('Dune', 'Frank Herbert', :stock, :stock), ('Emma', 'Jane Austen', 1, 1)
+    """), {"stock": stock})
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+    db.session.commit()
+
+
+class TestAvailabilityAPI:
+    """Tests for the batched availability lookup."""
+
+    def test_availability_map(self, client, app):
+        """Test the endpoint returns only id -> available_stock and reports missing ids."""
+        seed()
+
+        response = client.get("/api/v1/books/availability?ids=1,2,99")
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["data"] == {"1": 2, "2": 1}
+        assert data["missing"] == [99]
+
+    def test_issue_and_return_keep_map_current(self, app):
+        """Test issue and return store the committed stock without a re-read."""
+        seed()
+        BookService.get_availability([1])
+
+        transaction = TransactionService.issue_book(1, 1).data
+        assert availability_cache.get(1) == 1
+
+        TransactionService.return_book(transaction["id"])
+        with patch.object(BookService, "_load_availability") as load:
+            availability, _ = BookService.get_availability([1])
+
+        load.assert_not_called()
+        assert availability == {1: 2}
+
+    def test_update_book_refreshes_map(self, app):
+        """Test changing total_stock updates the cached availability."""
+        seed()
+        BookService.get_availability([1])
+
+        BookService.update_book(1, {"total_stock": 5})
+
+        assert availability_cache.get(1) == 5
@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+
+
+def seed(debt=0):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES ('Dune', 'Frank Herbert', 2, 2), ('Emma', 'Jane Austen', 1, 1), ('Ulysses', 'James Joyce', 1, 0)
+    """))
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', :debt)"), {"debt": debt})
+    db.session.commit()
+
+
+def post(client, url, body):
+    return client.post(url, data=json.dumps(body), content_type="application/json")
+
+
+def stock():
+    return [row[0] for row in db.session.execute(text("SELECT available_stock FROM books ORDER BY id"))]
+
+
+class TestBatchCirculationAPI:
+    """Tests for cart-style bulk issue and return."""
+
+    def test_issue_batch_reports_per_item(self, client, app):
+        """Test available titles are issued together and the rest are reported."""
+        seed()
+
+        response = post(client, "/api/v1/transactions/issue/batch", {"member_id": 1, "book_ids": [1, 2, 3, 99]})
+
+        data = json.loads(response.data)["data"]
+        assert response.status_code == 200
+        assert [item["outcome"] for item in data] == ["ok", "ok", "unavailable", "not_found"]
+        assert [item["transaction"]["book_id"] for item in data[:2]] == [1, 2]
+        assert stock() == [1, 0, 0]
+
+    def test_issue_batch_repeated_title_needs_enough_copies(self, client, app):
+        """Test asking for a title twice takes two copies, or none."""
+        seed()
+
+        data = json.loads(post(client, "/api/v1/transactions/issue/batch",
+                               {"member_id": 1, "book_ids": [1, 1, 2, 2]}).data)["data"]
+
+        assert [item["outcome"] for item in data] == ["ok", "ok", "unavailable", "unavailable"]
+        assert stock() == [0, 1, 0]
+
+    @pytest.mark.parametrize("returning", [True, False])
+    def test_issue_batches_in_same_instant(self, client, app, monkeypatch, returning):
+        """Test each batch reports its own loans when issue dates collide."""
+        seed()
+        instant = datetime(2026, 10, 17, 12, 0, 0, 123456)
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return instant
+
+        monkeypatch.setattr("app.services.transaction_service.datetime", FrozenDatetime)
+        monkeypatch.setattr("app.services.transaction_service.supports_returning", lambda kind: returning)
+        post(client, "/api/v1/transactions/issue/batch", {"member_id": 1, "book_ids": [1]})
+
+        data = json.loads(post(client, "/api/v1/transactions/issue/batch",
+                               {"member_id": 1, "book_ids": [2, 1]}).data)["data"]
+
+        assert [(item["transaction"]["id"], item["transaction"]["book_id"]) for item in data] == [(2, 2), (3, 1)]
+
+    def test_issue_batch_debt_checked_once(self, client, app):
+        """Test a member over the debt limit gets one batch-level refusal."""
+        seed(debt=600)
+
+        response = post(client, "/api/v1/transactions/issue/batch", {"member_id": 1, "book_ids": [1, 2]})
+
+        assert response.status_code == 400
+        assert stock() == [2, 1, 0]
+
+    def test_return_batch(self, client, app):
+        """Test returns close loans, restock and report already returned ones."""
+        seed()
+        post(client, "/api/v1/transactions/issue/batch", {"member_id": 1, "book_ids": [1, 2]})
+        post(client, "/api/v1/transactions/return/1", {})
+
+        response = post(client, "/api/v1/transactions/return/batch", {"transaction_ids": [1, 2, 42]})
+
+        data = json.loads(response.data)["data"]
+        assert [item["outcome"] for item in data] == ["invalid", "ok", "not_found"]
+        assert stock() == [2, 1, 0]
+        open_loans = db.session.execute(text("SELECT COUNT(*) FROM transactions WHERE is_returned = FALSE")).scalar()
+        assert open_loans == 0
+
+    def test_batch_size_limit(self, client, app):
+        """Test oversized batches are rejected."""
+        response = post(client, "/api/v1/transactions/issue/batch", {"member_id": 1, "book_ids": list(range(51))})
+
+        assert response.status_code == 400
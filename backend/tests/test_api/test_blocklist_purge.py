@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.models.user import User
+from app.services import BlocklistService
+
+
+def seed(expired, valid):
+    db.session.add(User(username="reader", email="reader@example.com", password_hash="x"))
+    db.session.flush()
+    now = datetime.now()
+    db.session.execute(text("""
+        INSERT INTO token_blocklist (jti, token_type, user_id, revoked_at, expires_at)
+        VALUES (:jti, 'refresh', 1, :now, :expires_at)
+    """), [{"jti": str(uuid.uuid4()), "now": now, "expires_at": now - timedelta(days=i + 1)} for i in range(expired)]
+        + [{"jti": str(uuid.uuid4()), "now": now, "expires_at": now + timedelta(days=i + 1)} for i in range(valid)])
+    db.session.commit()
+
+
+def remaining():
+    return db.session.execute(text("SELECT COUNT(*) FROM token_blocklist")).scalar()
+
+
+class TestBlocklistPurge:
+    """Tests for purging expired token blocklist rows."""
+
+    def test_purge_deletes_only_expired_rows(self, app):
+        """Test expired rows are deleted in batches and unexpired ones kept."""
+        seed(expired=5, valid=2)
+
+        stats = BlocklistService.purge_expired(batch_size=2)
+
+        assert stats == {"purged": 5, "batches": 3, "completed": True}
+        assert remaining() == 2
+
+    def test_purge_stops_after_max_batches(self, app):
+        """Test a bounded run leaves the rest for the next one."""
+        seed(expired=5, valid=0)
+
+        stats = BlocklistService.purge_expired(batch_size=2, max_batches=1)
+
+        assert stats == {"purged": 2, "batches": 1, "completed": False}
+        assert remaining() == 3
+
+    def test_purge_command(self, app, runner):
+        """Test the CLI command purges expired rows."""
+        seed(expired=3, valid=1)
+
+        result = runner.invoke(args=["purge-token-blocklist", "--batch-size", "2"])
+
+        assert "3 rows deleted in 2 batches" in result.output
+        assert remaining() == 1
+
+    def test_metrics_report_table_size(self, client, app):
+        """Test the metrics endpoint exposes blocklist row counts."""
+        seed(expired=3, valid=1)
+
+        body = client.get("/api/v1/metrics").data.decode()
+
+        assert "library_token_blocklist_rows 4" in body
+        assert "library_token_blocklist_expired_rows 3" in body
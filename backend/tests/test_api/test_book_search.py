@@ -0,0 +1,75 @@
+import json
+from sqlalchemy import text
+from app.extensions import db
+from app.services import BookService
+
+
+def seed_books(books):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, isbn, total_stock, available_stock)
+        VALUES (:title, :author, NULL, 1, 1)
+    """), books)
+    db.session.commit()
+
+
+class TestBookSearch:
+    """Tests for full-text book search."""
+
+    def test_search_by_title_and_author(self, client, app):
+        """Test every query term must match either the title or the author."""
+        seed_books([
+            {"title": "The Hobbit", "author": "J. R. R. Tolkien"},
+            {"title": "The Silmarillion", "author": "J. R. R. Tolkien"},
+            {"title": "Dune", "author": "Frank Herbert"},
+        ])
+
+        response = client.get("/api/v1/books/search?q=hobbit tolkien")
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert [book["title"] for book in data["data"]] == ["The Hobbit"]
+
+    def test_search_matches_prefix_of_last_term(self, client, app):
+        """Test the last term is matched as a prefix for search-as-you-type."""
+        seed_books([
+            {"title": "Dune Messiah", "author": "Frank Herbert"},
+            {"title": "Emma", "author": "Jane Austen"},
+        ])
+
+        response = client.get("/api/v1/books/search?q=mess")
+
+        data = json.loads(response.data)
+        assert [book["title"] for book in data["data"]] == ["Dune Messiah"]
+
+    def test_search_index_follows_updates_and_deletes(self, app):
+        """Test the index stays in sync when books change."""
+        seed_books([{"title": "Old Title", "author": "Someone"}])
+        book_id = db.session.execute(text("SELECT id FROM books")).scalar()
+
+        db.session.execute(text("UPDATE books SET title = 'New Title' WHERE id = :id"), {"id": book_id})
+        db.session.commit()
+        assert BookService.search_books("old")[0] == []
+        assert len(BookService.search_books("new")[0]) == 1
+
+        db.session.execute(text("DELETE FROM books WHERE id = :id"), {"id": book_id})
+        db.session.commit()
+        assert BookService.search_books("new")[0] == []
+
+    def test_search_pagination(self, client, app):
+        """Test search results are paginated with next_offset."""
+        seed_books([{"title": f"Python Volume {i}", "author": "Guido"} for i in range(5)])
+
+        first = json.loads(client.get("/api/v1/books/search?q=python&limit=3").data)
+        second = json.loads(client.get(f"/api/v1/books/search?q=python&limit=3&offset={first['next_offset']}").data)
+
+        assert len(first["data"]) == 3
+        assert len(second["data"]) == 2
+        assert second["next_offset"] is None
+        ids = [book["id"] for book in first["data"] + second["data"]]
+        assert len(set(ids)) == 5
+
+    def test_search_missing_query(self, client):
+        """Test a missing query parameter is rejected."""
+        response = client.get("/api/v1/books/search")
+
+        assert response.status_code == 400
@@ -0,0 +1,128 @@
+import json
+import random
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+from app.services import suggest_index
+from app.services.suggest_index import PrefixIndex, book_suggest_index, normalize_tokens
+
+
+class TestPrefixIndex:
+    """Tests for the in-memory book prefix index."""
+
+    def test_prefix_match_on_title_and_author(self):
+        """Test a prefix matches tokens in both titles and authors."""
+        index = PrefixIndex()
+        index.add(1, "Dune", "Frank Herbert")
+        index.add(2, "Heretics of Dune", "Frank Herbert")
+        index.add(3, "Emma", "Jane Austen")
+
+        assert [book["id"] for book in index.suggest("du")] == [1, 2]
+        assert [book["id"] for book in index.suggest("herb")] == [1, 2]
+        assert index.suggest("zzz") == []
+
+    def test_multiple_terms_narrow_results(self):
+        """Test earlier terms must match exactly and the last as a prefix."""
+        index = PrefixIndex()
+        index.add(1, "Harry Potter and the Goblet of Fire", "J. K. Rowling")
+        index.add(2, "Harry Potter and the Chamber of Secrets", "J. K. Rowling")
+        index.add(3, "Dirty Harry", "Phillip Rock")
+
+        assert [book["id"] for book in index.suggest("harry potter gob")] == [1]
+
+    def test_normalizes_case_and_diacritics(self):
+        """Test matching ignores case and accents."""
+        index = PrefixIndex()
+        index.add(1, "Les Misérables", "Victor Hugo")
+
+        assert [book["id"] for book in index.suggest("MISER")] == [1]
+
+    def test_update_and_remove(self):
+        """Test replacing and removing a book updates the index."""
+        index = PrefixIndex()
+        index.add(1, "Old Title", "Someone")
+        index.add(1, "New Title", "Someone")
+
+        assert index.suggest("old") == []
+        assert [book["id"] for book in index.suggest("new")] == [1]
+
+        index.remove(1)
+        assert index.suggest("new") == []
+        assert index._tokens == []
+
+    def test_limit(self):
+        """Test only the top `limit` matches are returned."""
+        index = PrefixIndex()
+        for i in range(20):
+            index.add(i, f"Python {i}", "Author")
+
+        assert len(index.suggest("py", limit=5)) == 5
+
+    def test_repeated_title_word_keeps_author_rank(self):
+        """Test a title repeating a word does not make author tokens rank as title matches."""
+        index = PrefixIndex()
+        index.add(1, "New York New York", "Nora Smith")
+        index.add(2, "The Smithsonian Collection", "Ann Lee")
+
+        assert [book["id"] for book in index.suggest("smi")] == [2, 1]
+
+    def test_best_match_ranked_among_many(self):
+        """Test the best match is found even when a short prefix matches hundreds of books."""
+        index = PrefixIndex()
+        for i in range(250):
+            index.add(i, f"Volume {i}", "Howard Pyle")
+        index.add(999, "Pyramids", "Terry Pratchett")
+
+        assert index.suggest("py", limit=3)[0]["id"] == 999
+
+    @pytest.mark.parametrize("direct_limit", [2000, 0])
+    def test_matches_full_ranking(self, monkeypatch, direct_limit):
+        """Test the bounded merge returns exactly the top of a full ranking over every match."""
+        monkeypatch.setattr(suggest_index, "DIRECT_RANK_LIMIT", direct_limit)
+        words = ["dune", "duel", "dust", "harry", "harbor", "potter", "pot", "new", "york", "the", "da"]
+        rng = random.Random(7)
+        books = {}
+        index = PrefixIndex()
+        for book_id in range(300):
+            title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4))).title()
+            author = " ".join(rng.choice(words) for _ in range(2)).title()
+            books[book_id] = (title, author)
+            index.add(book_id, title, author)
+        for book_id in range(0, 300, 7):
+            index.remove(book_id)
+            del books[book_id]
+
+        def expected(prefix, limit):
+            *complete, last = normalize_tokens(prefix)
+            query = " ".join(complete + [last])
+            ranked = []
+            for book_id, (title, author) in books.items():
+                title_tokens, tokens = normalize_tokens(title), normalize_tokens(title) + normalize_tokens(author)
+                if not all(term in tokens for term in complete) or not any(t.startswith(last) for t in tokens):
+                    continue
+                title_key = " ".join(title_tokens)
+                score = 0 if title_key.startswith(query) else 1 if any(t.startswith(last) for t in title_tokens) else 2
+                ranked.append((score, len(title), title_key, book_id))
+            return [book_id for *_, book_id in sorted(ranked)[:limit]]
+
+        for prefix in ["d", "du", "h", "har", "p", "the d", "harry p", "new york n", "dust dune d", "zz"]:
+            assert [book["id"] for book in index.suggest(prefix, limit=8)] == expected(prefix, 8), prefix
+
+
+class TestSuggestAPI:
+    """Tests for the book suggestion endpoint."""
+
+    def test_suggest_endpoint(self, client, app):
+        """Test the endpoint serves matches from the index built from the database."""
+        db.session.execute(text("""
+            INSERT INTO books (title, author, total_stock, available_stock)
+            VALUES ('The Hobbit', 'J. R. R. Tolkien', 1, 1), ('Dune', 'Frank Herbert', 1, 1)
+        """))
+        db.session.commit()
+        book_suggest_index.rebuild()
+
+        response = client.get("/api/v1/books/suggest?prefix=hob")
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert [book["title"] for book in data["data"]] == ["The Hobbit"]
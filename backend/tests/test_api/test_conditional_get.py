@@ -0,0 +1,102 @@
+import json
+from sqlalchemy import text
+from app.extensions import db
+from app.services import BookService, MemberService
+from app.services.version_service import VersionService
+from app.utils import TTLCache
+
+
+class TestConditionalGet:
+    """Tests for ETag support on read endpoints."""
+
+    def seed(self):
+        db.session.execute(text("INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 1, 1)"))
+        db.session.commit()
+
+    def test_matching_etag_returns_304(self, client, app):
+        """Test a repeated request with If-None-Match gets an empty 304."""
+        self.seed()
+        first = client.get("/api/v1/books")
+        etag = first.headers["ETag"]
+
+        second = client.get("/api/v1/books", headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers["ETag"] == etag
+
+    def test_write_changes_etag(self, client, app):
+        """Test a write through the service layer invalidates the ETag."""
+        self.seed()
+        etag = client.get("/api/v1/books/1").headers["ETag"]
+
+        BookService.update_book(1, {"title": "Dune Messiah"})
+        response = client.get("/api/v1/books/1", headers={"If-None-Match": etag})
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["data"]["title"] == "Dune Messiah"
+        assert response.headers["ETag"] != etag
+
+    def test_unrelated_write_keeps_etag(self, client, app):
+        """Test a write to another resource does not invalidate the ETag."""
+        self.seed()
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+        db.session.commit()
+        etag = client.get("/api/v1/books").headers["ETag"]
+
+        MemberService.update_member(1, {"name": "Ada Lovelace"})
+        response = client.get("/api/v1/books", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_query_string_is_part_of_etag(self, client, app):
+        """Test different pages get different ETags."""
+        self.seed()
+
+        first = client.get("/api/v1/books?limit=1")
+        second = client.get("/api/v1/books?limit=2")
+
+        assert first.headers["ETag"] != second.headers["ETag"]
+
+    def test_not_found_has_no_etag(self, client):
+        """Test error responses are not tagged."""
+        response = client.get("/api/v1/books/999")
+
+        assert response.status_code == 404
+        assert "ETag" not in response.headers
+
+    def test_version_counts_every_bump(self, app):
+        """Test bumps create their shard rows and the version counts each one."""
+        for _ in range(20):
+            VersionService.bump('books', 'transactions', 'books')
+        db.session.commit()
+
+        assert VersionService.get_versions(['books', 'transactions', 'members']) == {
+            'books': 20, 'transactions': 20, 'members': 0
+        }
+
+    def test_write_in_other_worker_never_tags_stale_cache(self, client, app, monkeypatch):
+        """Test a cached body from before another worker's write is not served under the new ETag."""
+        self.seed()
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+        db.session.commit()
+        # This worker (B) caches both entities and their tags
+        book_etag = client.get("/api/v1/books/1").headers["ETag"]
+        member_etag = client.get("/api/v1/members/1").headers["ETag"]
+
+        # Worker A writes through its own caches; B's keep the old rows
+        with monkeypatch.context() as worker_a:
+            worker_a.setattr("app.services.book_service.book_cache", TTLCache('book', 10, 30))
+            worker_a.setattr("app.services.member_service.member_cache", TTLCache('member', 10, 30))
+            BookService.update_book(1, {"title": "Dune Messiah"})
+            MemberService.update_member(1, {"name": "Ada Lovelace"})
+
+        book = client.get("/api/v1/books/1", headers={"If-None-Match": book_etag})
+        members = client.get("/api/v1/members?ids=1", headers={"If-None-Match": member_etag})
+
+        assert book.status_code == members.status_code == 200
+        assert json.loads(book.data)["data"]["title"] == "Dune Messiah"
+        assert json.loads(members.data)["data"][0]["name"] == "Ada Lovelace"
+        assert client.get("/api/v1/books/1", headers={"If-None-Match": book.headers["ETag"]}).status_code == 304
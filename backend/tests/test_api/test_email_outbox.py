@@ -0,0 +1,131 @@
+import smtplib
+import socket
+from datetime import datetime
+from unittest.mock import patch
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.mailer import SmtpSender
+from app.utils import CircuitBreaker
+
+
+def enqueue(*recipients):
+    for recipient in recipients:
+        EmailOutboxService.enqueue(recipient, "Hello", "Body text", sender="library@example.com")
+
+
+def statuses():
+    rows = db.session.execute(text("SELECT recipient, status, attempts FROM email_outbox ORDER BY id")).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def deliver(breaker=None):
+    sender = SmtpSender("smtp.example.com", 587, "library@example.com", "secret")
+    return EmailOutboxService.deliver_batch(sender, breaker or CircuitBreaker("smtp", 5, 60), 10)
+
+
+class TestEmailOutbox:
+    """Tests for the email outbox and its SMTP delivery."""
+
+    @patch("smtplib.SMTP")
+    def test_batch_shares_one_connection(self, mock_smtp, app):
+        """Test a batch is sent over a single SMTP session and marked sent."""
+        enqueue("a@example.com", "b@example.com", "c@example.com")
+
+        assert deliver() == 3
+
+        mock_smtp.assert_called_once()
+        assert mock_smtp.return_value.login.call_count == 1
+        assert mock_smtp.return_value.sendmail.call_count == 3
+        assert [status for _, status, _ in statuses()] == ["Sent"] * 3
+
+    @patch("smtplib.SMTP")
+    def test_server_error_retries_with_backoff(self, mock_smtp, app):
+        """Test a server error schedules a retry and returns the rest of the batch untouched."""
+        mock_smtp.return_value.sendmail.side_effect = smtplib.SMTPServerDisconnected("gone")
+        enqueue("a@example.com", "b@example.com")
+
+        deliver()
+
+        assert statuses() == [("a@example.com", "Pending", 1), ("b@example.com", "Pending", 0)]
+        next_attempt = db.session.execute(text("""
+            SELECT next_attempt_at FROM email_outbox WHERE id = 1
+        """).columns(next_attempt_at=db.DateTime)).scalar()
+        assert next_attempt > datetime.now()
+
+    @patch("smtplib.SMTP")
+    def test_rejected_recipient_fails_permanently(self, mock_smtp, app):
+        """Test a refused recipient fails its message without stopping the batch."""
+        refused = smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"no such user")})
+        mock_smtp.return_value.sendmail.side_effect = [refused, {}]
+        enqueue("bad@example.com", "good@example.com")
+
+        deliver()
+
+        assert statuses() == [("bad@example.com", "Failed", 1), ("good@example.com", "Sent", 1)]
+
+    @patch("smtplib.SMTP")
+    def test_circuit_breaker_stops_delivery(self, mock_smtp, app):
+        """Test repeated server failures open the breaker until its timeout passes."""
+        breaker = CircuitBreaker("smtp", failure_threshold=2, reset_timeout=60)
+        mock_smtp.side_effect = OSError("connection refused")
+        enqueue("a@example.com", "b@example.com", "c@example.com")
+
+        deliver(breaker)
+        assert breaker.allow()
+        deliver(breaker)
+
+        assert not breaker.allow()
+        assert breaker.retry_after() > 0
+        breaker.reset_timeout = 0
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_send_emails_against_local_smtp_server(self, app, runner):
+        """Test the outbox delivers to a real SMTP server over one connection."""
+        controller_module = pytest.importorskip("aiosmtpd.controller")
+
+        class Collector:
+            def __init__(self):
+                self.messages = []
+
+            async def handle_DATA(self, server, session, envelope):
+                self.messages.append((envelope.rcpt_tos, envelope.content))
+                return "250 OK"
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        handler = Collector()
+        controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        try:
+            app.config.update(MAIL_SERVER="127.0.0.1", MAIL_PORT=port, MAIL_USE_TLS=False, MAIL_USERNAME=None)
+            enqueue("a@example.com", "b@example.com", "c@example.com")
+
+            result = runner.invoke(args=["send-emails"])
+        finally:
+            controller.stop()
+
+        assert "Processed 3 outbox messages over 1 SMTP connections" in result.output
+        assert [rcpt for rcpt, _ in handler.messages] == [["a@example.com"], ["b@example.com"], ["c@example.com"]]
+        assert [status for _, status, _ in statuses()] == ["Sent"] * 3
+
+    def test_create_app_starts_no_workers(self, monkeypatch):
+        """Test building the app, as every CLI command and web worker does, starts no email threads."""
+        from app import create_app
+        from config import TestingConfig
+        monkeypatch.setattr(TestingConfig, "EMAIL_WORKERS", 2)
+
+        app = create_app("testing")
+
+        assert "email_outbox" not in app.extensions
+
+    def test_email_worker_needs_workers(self, runner):
+        """Test the email-worker command refuses to run with no threads."""
+        result = runner.invoke(args=["email-worker", "--workers", "0"])
+
+        assert result.exit_code != 0
+        assert "No email workers to run" in result.output
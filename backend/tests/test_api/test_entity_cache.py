@@ -0,0 +1,85 @@
+import json
+from sqlalchemy import text
+from app.extensions import db
+from app.services import BookService, MemberService
+from app.services.entity_cache import book_cache, member_cache
+from app.utils import TTLCache
+
+
+class TestTTLCache:
+    """Tests for the LRU + TTL cache."""
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = TTLCache('test', max_entries=2, ttl=60)
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        cache.get(1)
+        cache.set(3, 'c')
+
+        assert cache.get(2) is None
+        assert cache.get(1) == 'a'
+        assert cache.stats()['evictions'] == 1
+
+    def test_expiry(self):
+        """Test entries are not served after their TTL."""
+        cache = TTLCache('test', max_entries=10, ttl=0)
+        cache.set(1, 'a')
+
+        assert cache.get(1) is None
+
+    def test_invalidation_during_load_is_not_overwritten(self):
+        """Test a value loaded before an invalidation is not cached after it."""
+        cache = TTLCache('test', max_entries=10, ttl=60)
+
+        def loader():
+            cache.invalidate(1)
+            return 'stale'
+
+        assert cache.get_or_load(1, loader) == 'stale'
+        assert cache.get(1) is None
+
+
+class TestEntityCache:
+    """Tests for read-through caching in the book and member services."""
+
+    def test_get_book_reads_through(self, app):
+        """Test repeated lookups are served from the cache."""
+        db.session.execute(text("INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 1, 1)"))
+        db.session.commit()
+
+        BookService.get_book(1)
+        book = BookService.get_book(1)
+
+        assert book["title"] == "Dune"
+        assert book_cache.stats()["hits"] >= 1
+
+    def test_update_invalidates(self, app):
+        """Test a service write is visible on the next lookup."""
+        db.session.execute(text("INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 1, 1)"))
+        db.session.commit()
+        BookService.get_book(1)
+
+        BookService.update_book(1, {"title": "Dune Messiah"})
+
+        assert BookService.get_book(1)["title"] == "Dune Messiah"
+
+    def test_payment_invalidates_member(self, app):
+        """Test recording a payment refreshes the cached member."""
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 50)"))
+        db.session.commit()
+        MemberService.get_member(1)
+
+        MemberService.record_payment(1, 20)
+
+        assert float(MemberService.get_member(1)["outstanding_debt"]) == 30.0
+
+    def test_metrics_endpoint(self, client, app):
+        """Test cache counters are exposed for scraping."""
+        member_cache.get(12345)
+
+        response = client.get("/api/v1/metrics")
+
+        body = response.data.decode()
+        assert response.status_code == 200
+        assert 'library_entity_cache_misses_total{cache="member"}' in body
@@ -0,0 +1,65 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from sqlalchemy import text
+from app.extensions import db
+from app.services import ArchiveService
+
+
+def seed_books(count):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock) VALUES (:title, 'Author', 1, 1)
+    """), [{"title": f"Book, {i}"} for i in range(count)])
+    db.session.commit()
+
+
+class TestExportAPI:
+    """Tests for streaming exports."""
+
+    def test_books_csv(self, client, app):
+        """Test a CSV export has a header and every row, streamed in chunks."""
+        seed_books(3000)
+
+        response = client.get("/api/v1/export/books.csv")
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.headers["Content-Disposition"] == 'attachment; filename="books.csv"'
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert rows[0] == ["id", "title", "author", "isbn", "total_stock", "available_stock"]
+        assert len(rows) == 3001
+        assert rows[1][1] == "Book, 0"
+
+    def test_members_ndjson_gzip(self, client, app):
+        """Test an NDJSON export can be gzip-compressed on the fly."""
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 1.5)"))
+        db.session.commit()
+
+        response = client.get("/api/v1/export/members.ndjson.gz")
+
+        assert response.mimetype == "application/gzip"
+        lines = gzip.decompress(response.get_data()).decode().splitlines()
+        assert json.loads(lines[0])["name"] == "Ada"
+
+    def test_transactions_include_archive(self, client, app):
+        """Test the transactions export covers archived and hot rows."""
+        seed_books(1)
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+        db.session.execute(text("""
+            INSERT INTO transactions (book_id, member_id, issue_date, return_date, is_returned, status)
+            VALUES (1, 1, :old, :old, TRUE, 'Returned'), (1, 1, :now, NULL, FALSE, 'Issued')
+        """), {"old": datetime(2020, 1, 1), "now": datetime.now()})
+        db.session.commit()
+        ArchiveService.archive_returned(older_than_days=365)
+
+        response = client.get("/api/v1/export/transactions.ndjson")
+
+        ids = [json.loads(line)["id"] for line in response.get_data(as_text=True).splitlines()]
+        assert ids == [1, 2]
+
+    def test_unknown_export(self, client, app):
+        """Test unknown resources and formats are rejected."""
+        assert client.get("/api/v1/export/users.csv").status_code == 404
+        assert client.get("/api/v1/export/books.xml").status_code == 415
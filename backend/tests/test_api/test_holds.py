@@ -0,0 +1,156 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from app.extensions import db
+from app.services import TransactionService, HoldService
+
+
+def seed(copies=1):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', :n, :n)
+    """), {"n": copies})
+    db.session.execute(text("""
+        INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0), ('Grace', 0), ('Alan', 0)
+    """))
+    db.session.commit()
+
+
+def place(client, member_id, book_id=1):
+    return client.post(f"/api/v1/books/{book_id}/holds", json={"member_id": member_id})
+
+
+def hold_status(hold_id):
+    return db.session.execute(text("SELECT status FROM holds WHERE id = :id"), {"id": hold_id}).scalar()
+
+
+def available():
+    return db.session.execute(text("SELECT available_stock FROM books WHERE id = 1")).scalar()
+
+
+class TestHolds:
+    """Tests for the hold queue and its allocation on return."""
+
+    def test_return_goes_to_oldest_hold(self, client, app):
+        """Test a returned copy is set aside for the first hold in the queue."""
+        seed()
+        loan = TransactionService.issue_book(1, 1).data
+        first = json.loads(place(client, 2).data)["data"]
+        second = json.loads(place(client, 3).data)["data"]
+        assert (first["status"], second["status"]) == ("Waiting", "Waiting")
+
+        TransactionService.return_book(loan["id"])
+
+        assert hold_status(first["id"]) == "Ready"
+        assert hold_status(second["id"]) == "Waiting"
+        assert available() == 0
+        # Nobody else can take the set-aside copy
+        assert not TransactionService.issue_book(1, 3).ok
+        assert TransactionService.issue_book(1, 2).ok
+        assert hold_status(first["id"]) == "Fulfilled"
+
+    def test_allocation_skips_hold_taken_concurrently(self, client, app):
+        """Test a copy still goes to a waiting hold when a concurrent return takes the head of the queue."""
+        seed()
+        TransactionService.issue_book(1, 1)
+        place(client, 2)
+        place(client, 3)
+        taken = []
+
+        def concurrent_return(conn, cursor, statement, *args):
+            # Another return readies the head hold right after our SELECT
+            if not taken and statement.lstrip().startswith("SELECT id FROM holds"):
+                taken.append(True)
+                cursor.connection.cursor().execute("UPDATE holds SET status = 'Ready' WHERE id = 1")
+
+        event.listen(db.engine, "after_cursor_execute", concurrent_return)
+        try:
+            allocated = HoldService.allocate({1: 1}, datetime.now())
+        finally:
+            event.remove(db.engine, "after_cursor_execute", concurrent_return)
+
+        assert allocated == {1: 1}
+        assert (hold_status(1), hold_status(2)) == ("Ready", "Ready")
+
+    def test_hold_on_available_book_is_ready(self, client, app):
+        """Test a hold placed while a copy is on the shelf reserves it at once."""
+        seed()
+
+        response = place(client, 1)
+
+        assert response.status_code == 201
+        assert json.loads(response.data)["data"]["status"] == "Ready"
+        assert available() == 0
+
+    def test_duplicate_and_unknown_holds(self, client, app):
+        """Test a member cannot queue twice and unknown books or members are rejected."""
+        seed(copies=0)
+        place(client, 1)
+
+        assert place(client, 1).status_code == 409
+        assert place(client, 1, book_id=99).status_code == 404
+        assert place(client, 99).status_code == 404
+
+    def test_queue_position(self, client, app):
+        """Test waiting holds report their place in the queue."""
+        seed(copies=0)
+        place(client, 1)
+        second = json.loads(place(client, 2).data)["data"]
+
+        response = client.get(f"/api/v1/holds/{second['id']}")
+
+        assert json.loads(response.data)["data"]["position"] == 2
+        assert len(json.loads(client.get("/api/v1/books/1/holds").data)["data"]) == 2
+
+    def test_cancel_ready_hold_passes_copy_on(self, client, app):
+        """Test cancelling a Ready hold gives the copy to the next in line."""
+        seed()
+        first = json.loads(place(client, 1).data)["data"]
+        second = json.loads(place(client, 2).data)["data"]
+
+        response = client.delete(f"/api/v1/holds/{first['id']}")
+
+        assert response.status_code == 200
+        assert hold_status(second["id"]) == "Ready"
+        assert client.delete(f"/api/v1/holds/{first['id']}").status_code == 400
+
+    def test_expired_hold_goes_back_on_shelf(self, client, app):
+        """Test an uncollected Ready hold expires and its copy is shelved."""
+        seed()
+        hold = json.loads(place(client, 1).data)["data"]
+
+        expired = HoldService.expire_ready(now=datetime.now() + timedelta(days=3))
+
+        assert expired == 1
+        assert hold_status(hold["id"]) == "Expired"
+        assert available() == 1
+
+    def test_batch_paths_use_holds(self, client, app):
+        """Test batch returns allocate to holds and batch issues consume them."""
+        seed()
+        loan = TransactionService.issue_book(1, 1).data
+        hold = json.loads(place(client, 2).data)["data"]
+
+        TransactionService.return_books([loan["id"]])
+        assert hold_status(hold["id"]) == "Ready"
+
+        result = TransactionService.issue_books(2, [1])
+        assert result.data[0]["outcome"] == "ok"
+        assert hold_status(hold["id"]) == "Fulfilled"
+        assert available() == 0
+
+    def test_event_stream_reports_ready(self, client, app):
+        """Test the event stream sends the waiting state, then ready after a return."""
+        seed()
+        loan = TransactionService.issue_book(1, 1).data
+        hold = json.loads(place(client, 2).data)["data"]
+
+        response = client.get(f"/api/v1/holds/{hold['id']}/events", buffered=False)
+        events = iter(response.response)
+        assert response.mimetype == "text/event-stream"
+        assert '"status":"Waiting"' in next(events).decode().replace(" ", "")
+
+        TransactionService.return_book(loan["id"])
+
+        assert '"status":"Ready"' in next(events).decode().replace(" ", "")
+        assert list(events) == []
+        response.close()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.services import IdempotencyService
+
+
+def seed():
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 5, 5)
+    """))
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 20)"))
+    db.session.commit()
+
+
+def issue(client, key, book_id=1):
+    return client.post("/api/v1/transactions/issue", json={"book_id": book_id, "member_id": 1},
+                       headers={"Idempotency-Key": key})
+
+
+class TestIdempotency:
+    """Tests for Idempotency-Key support on write endpoints."""
+
+    def test_retry_replays_stored_response(self, client, app):
+        """Test a retried issue returns the first response and issues only once."""
+        seed()
+        first = issue(client, "abc")
+        retry = issue(client, "abc")
+
+        assert first.status_code == retry.status_code == 201
+        assert json.loads(retry.data) == json.loads(first.data)
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert db.session.execute(text("SELECT COUNT(*) FROM transactions")).scalar() == 1
+        assert db.session.execute(text("SELECT available_stock FROM books")).scalar() == 4
+
+    def test_replay_skips_the_view(self, client, app):
+        """Test a replayed payment does not call the service again."""
+        seed()
+        headers = {"Idempotency-Key": "pay-1"}
+        client.post("/api/v1/members/1/payment", json={"amount": 5}, headers=headers)
+
+        with patch("app.services.MemberService.record_payment") as record_payment:
+            response = client.post("/api/v1/members/1/payment", json={"amount": 5}, headers=headers)
+
+        assert response.status_code == 200
+        record_payment.assert_not_called()
+        assert db.session.execute(text("SELECT outstanding_debt FROM members")).scalar() == 15
+
+    def test_key_reused_for_different_request(self, client, app):
+        """Test reusing a key with a different body is rejected."""
+        seed()
+        issue(client, "abc")
+
+        response = issue(client, "abc", book_id=2)
+
+        assert response.status_code == 422
+
+    def test_key_in_progress(self, client, app):
+        """Test a retry while the first attempt is still running gets 409."""
+        seed()
+        body = json.dumps({"book_id": 1, "member_id": 1})
+        first = client.post("/api/v1/transactions/issue", data=body, content_type="application/json")
+        fingerprint = hashlib.sha256(b"POST /api/v1/transactions/issue\n" + body.encode()).hexdigest()
+        IdempotencyService.claim("abc", fingerprint, 60)
+
+        response = client.post("/api/v1/transactions/issue", data=body, content_type="application/json",
+                               headers={"Idempotency-Key": "abc"})
+
+        assert first.status_code == 201
+        assert response.status_code == 409
+
+    def test_stale_claim_is_taken_over(self, client, app):
+        """Test a claim whose request died is taken over once its lease runs out."""
+        seed()
+        body = json.dumps({"book_id": 1, "member_id": 1})
+        fingerprint = hashlib.sha256(b"POST /api/v1/transactions/issue\n" + body.encode()).hexdigest()
+        IdempotencyService.claim("abc", fingerprint, 3600, lease_seconds=30,
+                                 now=datetime.now() - timedelta(minutes=1))
+
+        response = client.post("/api/v1/transactions/issue", data=body, content_type="application/json",
+                               headers={"Idempotency-Key": "abc"})
+        retry = issue(client, "abc")
+
+        assert response.status_code == 201
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert db.session.execute(text("SELECT COUNT(*) FROM transactions")).scalar() == 1
+
+    def test_store_failure_keeps_real_response(self, client, app):
+        """Test a failure storing the response still returns the committed write's response."""
+        seed()
+        error = OperationalError("UPDATE idempotency_keys", {}, Exception("connection lost"))
+
+        with patch("app.services.IdempotencyService.complete", side_effect=error):
+            response = issue(client, "abc")
+
+        assert response.status_code == 201
+        assert json.loads(response.data)["status"] == "success"
+        assert db.session.execute(text("SELECT COUNT(*) FROM transactions")).scalar() == 1
+
+    def test_expired_keys_are_purged_and_reusable(self, client, app):
+        """Test expired keys are purged in batches and an expired key runs again."""
+        seed()
+        issue(client, "abc")
+        later = datetime.now() + timedelta(days=2)
+
+        assert IdempotencyService.get("abc", now=later) is None
+        assert IdempotencyService.purge_expired(batch_size=1, now=later) == 1
+
+        response = issue(client, "abc")
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response.headers
+        assert db.session.execute(text("SELECT COUNT(*) FROM transactions")).scalar() == 2
+
+    def test_without_header(self, client, app):
+        """Test requests without the header are not deduplicated."""
+        seed()
+        client.post("/api/v1/transactions/issue", json={"book_id": 1, "member_id": 1})
+        client.post("/api/v1/transactions/issue", json={"book_id": 1, "member_id": 1})
+
+        assert db.session.execute(text("SELECT COUNT(*) FROM transactions")).scalar() == 2
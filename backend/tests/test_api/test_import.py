@@ -0,0 +1,78 @@
+import io
+import json
+from sqlalchemy import text
+from app.extensions import db
+
+
+class TestImportAPI:
+    """Tests for bulk book and member imports."""
+
+    def test_import_books_csv(self, client, app):
+        """Test importing books from a multipart CSV upload."""
+        csv_data = (
+            "title,author,isbn,total_stock\n"
+            "Dune,Frank Herbert,111,3\n"
+            "Emma,Jane Austen,,2\n"
+        )
+
+        response = client.post(
+            "/api/v1/books/import",
+            data={"file": (io.BytesIO(csv_data.encode()), "books.csv")},
+            content_type="multipart/form-data"
+        )
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["data"]["imported"] == 2
+        assert data["data"]["failed"] == 0
+        rows = db.session.execute(text("SELECT title, available_stock FROM books ORDER BY id")).fetchall()
+        assert [tuple(row) for row in rows] == [("Dune", 3), ("Emma", 2)]
+
+    def test_import_books_upserts_on_isbn(self, client, app):
+        """Test re-importing an ISBN updates the book and keeps issued copies out."""
+        db.session.execute(text("""
+            INSERT INTO books (title, author, isbn, total_stock, available_stock)
+            VALUES ('Dune', 'Frank Herbert', '111', 3, 1)
+        """))
+        db.session.commit()
+
+        body = json.dumps({"title": "Dune (Deluxe)", "author": "Frank Herbert", "isbn": "111", "total_stock": 5})
+        response = client.post(
+            "/api/v1/books/import?format=ndjson",
+            data=body + "\n",
+            content_type="application/x-ndjson"
+        )
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["data"]["imported"] == 1
+        row = db.session.execute(text("SELECT title, total_stock, available_stock FROM books")).fetchall()
+        assert [tuple(r) for r in row] == [("Dune (Deluxe)", 5, 3)]
+
+    def test_import_reports_row_errors(self, client, app):
+        """Test invalid rows are reported by row number and valid rows still load."""
+        ndjson = "\n".join([
+            json.dumps({"name": "Ada", "email": "ada@example.com"}),
+            "not json",
+            json.dumps({"email": "nameless@example.com"}),
+            json.dumps({"name": "Ada Lovelace", "email": "ada@example.com", "phone": "123"}),
+        ])
+
+        response = client.post(
+            "/api/v1/members/import",
+            data=ndjson,
+            content_type="application/x-ndjson"
+        )
+
+        data = json.loads(response.data)["data"]
+        assert data["processed"] == 4
+        assert data["imported"] == 2
+        assert [error["row"] for error in data["errors"]] == [2, 3]
+        rows = db.session.execute(text("SELECT name, phone FROM members")).fetchall()
+        assert [tuple(row) for row in rows] == [("Ada Lovelace", "123")]
+
+    def test_import_unknown_format(self, client):
+        """Test an upload whose format cannot be determined is rejected."""
+        response = client.post("/api/v1/books/import", data="x", content_type="text/plain")
+
+        assert response.status_code == 415
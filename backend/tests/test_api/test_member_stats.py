@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.services import TransactionService, OverdueService, MemberStatsService
+
+
+def seed():
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES ('Dune', 'Frank Herbert', 5, 5), ('Emma', 'Jane Austen', 5, 5)
+    """))
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+    db.session.commit()
+
+
+def summary(client, member_id=1):
+    return json.loads(client.get(f"/api/v1/members/{member_id}/summary").data)["data"]
+
+
+def counts(data):
+    return data["open_loans"], data["overdue_loans"], data["lifetime_loans"]
+
+
+class TestMemberStats:
+    """Tests for the incrementally maintained member_stats projection."""
+
+    def test_issue_and_return_update_counts(self, client, app):
+        """Test issues and returns keep open and lifetime counts current."""
+        seed()
+        first = TransactionService.issue_book(1, 1).data
+        TransactionService.issue_books(1, [1, 2])
+
+        assert counts(summary(client)) == (3, 0, 3)
+
+        TransactionService.return_book(first["id"])
+        TransactionService.return_books([2])
+
+        assert counts(summary(client)) == (1, 0, 3)
+
+    def test_overdue_counts_follow_sweeper_and_return(self, client, app):
+        """Test the sweeper raises the overdue count and a return lowers it."""
+        seed()
+        transaction = TransactionService.issue_book(1, 1).data
+
+        OverdueService.sweep(now=datetime.now() + timedelta(minutes=5))
+        assert counts(summary(client)) == (1, 1, 1)
+
+        TransactionService.return_book(transaction["id"])
+        assert counts(summary(client)) == (0, 0, 1)
+
+    def test_delete_member_with_open_loan(self, client, app):
+        """Test the open-loan check on delete reads member_stats."""
+        seed()
+        TransactionService.issue_book(1, 1)
+
+        response = client.delete("/api/v1/members/1")
+
+        assert response.status_code == 400
+        assert "1 open transactions" in json.loads(response.data)["message"]
+
+    def test_rebuild_matches_incremental(self, client, app):
+        """Test a rebuild from transactions gives the same counts."""
+        seed()
+        TransactionService.issue_books(1, [1, 2])
+        TransactionService.return_book(1)
+        before = counts(summary(client))
+
+        assert MemberStatsService.rebuild() == 1
+        assert counts(summary(client)) == before
+
+    def test_summary_unknown_member(self, client, app):
+        """Test an unknown member is a 404."""
+        assert client.get("/api/v1/members/99/summary").status_code == 404
@@ -0,0 +1,73 @@
+import json
+from functools import partial
+from unittest.mock import patch
+from sqlalchemy import text
+from app.extensions import db
+from app.services import BookService
+from app.services.entity_cache import book_cache
+from app.utils import chunks
+
+
+def seed_books(count):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES (:title, 'Author', 1, 1)
+    """), [{"title": f"Book {i}"} for i in range(count)])
+    db.session.commit()
+
+
+class TestMultiGetAPI:
+    """Tests for fetching many books and members by id in one request."""
+
+    def test_books_by_ids_keeps_order(self, client, app):
+        """Test ?ids= returns books in the requested order and reports missing ids."""
+        seed_books(3)
+
+        response = client.get("/api/v1/books?ids=3,1,99,3")
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert [book["id"] for book in data["data"]] == [3, 1]
+        assert data["missing"] == [99]
+
+    def test_members_batch_post(self, client, app):
+        """Test the POST variant accepts a JSON id list."""
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0), ('Grace', 0)"))
+        db.session.commit()
+
+        response = client.post(
+            "/api/v1/members/batch",
+            data=json.dumps({"ids": [2, 1]}),
+            content_type="application/json"
+        )
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert [member["name"] for member in data["data"]] == ["Grace", "Ada"]
+
+    def test_invalid_ids(self, client, app):
+        """Test non-integer ids are rejected."""
+        response = client.get("/api/v1/books?ids=1,abc")
+
+        assert response.status_code == 400
+
+    def test_large_list_is_chunked(self, app):
+        """Test long id lists are split across several IN queries."""
+        seed_books(5)
+
+        with patch("app.services.book_service.chunks", partial(chunks, size=2)):
+            books, missing = BookService.get_books([5, 4, 3, 2, 1])
+
+        assert [book["id"] for book in books] == [5, 4, 3, 2, 1]
+        assert missing == []
+
+    def test_cache_hits_skip_the_database(self, app):
+        """Test ids already cached are not re-read."""
+        seed_books(2)
+        BookService.get_book(1)
+
+        with patch.object(BookService, "_load_books", wraps=BookService._load_books) as load:
+            BookService.get_books([1, 2])
+
+        load.assert_called_once_with([2])
+        assert book_cache.get(2) is not None
@@ -0,0 +1,96 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text, event
+from app.extensions import db
+from app.services import OverdueService, TransactionService
+
+
+def seed_loans(ages_in_minutes):
+    """One book and member, with an open loan issued `age` minutes ago for each age."""
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 100, 100)
+    """))
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+    now = datetime.now()
+    db.session.execute(text("""
+        INSERT INTO transactions (book_id, member_id, issue_date, is_returned, status)
+        VALUES (1, 1, :issue_date, FALSE, 'Issued')
+    """), [{"issue_date": now - timedelta(minutes=age)} for age in ages_in_minutes])
+    db.session.commit()
+    return now
+
+
+def loans():
+    return db.session.execute(text("SELECT id, status, accrued_fee FROM transactions ORDER BY id")).fetchall()
+
+
+class TestOverdueSweep:
+    """Tests for the batched overdue sweeper."""
+
+    def test_marks_overdue_and_accrues_fee(self, app):
+        """Test loans past the loan period become Overdue with the return-time fee."""
+        now = seed_loans([11, 0])
+
+        stats = OverdueService.sweep(now=now)
+
+        rows = loans()
+        assert stats["completed"] and stats["newly_overdue"] == 1
+        assert (rows[0].status, float(rows[0].accrued_fee)) == ("Overdue", 10.0)
+        assert rows[1].status == "Issued"
+        assert float(rows[0].accrued_fee) == TransactionService.calculate_fee(now - timedelta(minutes=11), now)
+
+    def test_resumes_from_checkpoint(self, app):
+        """Test a paused sweep continues after the last committed batch."""
+        now = seed_loans([10, 10, 10])
+
+        first = OverdueService.sweep(batch_size=2, max_batches=1, now=now)
+        assert (first["scanned"], first["completed"]) == (2, False)
+        assert OverdueService.get_checkpoint() == 2
+
+        second = OverdueService.sweep(batch_size=2, now=now)
+        assert (second["scanned"], second["completed"]) == (1, True)
+        assert OverdueService.get_checkpoint() == 0
+        assert [row.status for row in loans()] == ["Overdue"] * 3
+
+    @pytest.mark.parametrize("returning", [True, False])
+    def test_batch_is_marked_set_based(self, app, monkeypatch, returning):
+        """Test a batch is swept with one UPDATE per status group and counts each flip once."""
+        now = seed_loans([30, 20, 15, 0])
+        db.session.execute(text("UPDATE transactions SET status = 'Overdue' WHERE id = 1"))
+        db.session.commit()
+        monkeypatch.setattr("app.services.overdue_service.supports_returning", lambda kind: returning)
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            stats = OverdueService.sweep(now=now)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert stats["newly_overdue"] == 2
+        assert len([s for s in statements if s.lstrip().startswith("UPDATE transactions")]) == 2
+        assert [row.status for row in loans()] == ["Overdue", "Overdue", "Overdue", "Issued"]
+        assert [float(row.accrued_fee) for row in loans()[:3]] == [
+            TransactionService.calculate_fee(now - timedelta(minutes=age), now) for age in (30, 20, 15)
+        ]
+        assert db.session.execute(text("SELECT overdue_loans FROM member_stats WHERE member_id = 1")).scalar() == 2
+
+    def test_overdue_feed_and_return(self, client, app):
+        """Test swept loans are listed by status and lose Overdue on return."""
+        now = seed_loans([5])
+        OverdueService.sweep(now=now)
+
+        data = json.loads(client.get("/api/v1/transactions?status=Overdue").data)["data"]
+        assert [row["id"] for row in data] == [1]
+
+        TransactionService.return_book(1)
+        assert loans()[0].status == "Returned"
+
+    def test_cli(self, app):
+        """Test the sweep-overdue command reports its progress."""
+        seed_loans([5])
+
+        result = app.test_cli_runner().invoke(args=["sweep-overdue"])
+
+        assert "1 newly overdue" in result.output
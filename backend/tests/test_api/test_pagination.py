@@ -0,0 +1,87 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.utils import MAX_PAGE_SIZE
+
+
+def seed_books(count):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, isbn, total_stock, available_stock)
+        VALUES (:title, :author, :isbn, 1, 1)
+    """), [
+        {"title": f"Book {i}", "author": f"Author {i}", "isbn": f"isbn-{i}"}
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+class TestPagination:
+    """Tests for keyset pagination on the list endpoints."""
+
+    def test_books_first_page(self, client, app):
+        """Test the first page of books returns a cursor to the next one."""
+        seed_books(5)
+
+        response = client.get("/api/v1/books?limit=2")
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert [book["title"] for book in data["data"]] == ["Book 0", "Book 1"]
+        assert data["next_cursor"] == data["data"][-1]["id"]
+
+    def test_books_walk_all_pages(self, client, app):
+        """Test following next_cursor visits every book exactly once."""
+        seed_books(7)
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/v1/books?limit=3"
+            if cursor is not None:
+                url += f"&after={cursor}"
+            data = json.loads(client.get(url).data)
+            seen.extend(book["id"] for book in data["data"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == 7
+        assert seen == sorted(set(seen))
+
+    def test_limit_is_capped(self, client, app):
+        """Test the server enforces a maximum page size."""
+        seed_books(MAX_PAGE_SIZE + 5)
+
+        response = client.get(f"/api/v1/books?limit={MAX_PAGE_SIZE * 10}")
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert len(data["data"]) == MAX_PAGE_SIZE
+        assert data["next_cursor"] is not None
+
+    def test_invalid_cursor(self, client):
+        """Test a non-integer cursor is rejected."""
+        response = client.get("/api/v1/members?after=abc")
+
+        data = json.loads(response.data)
+        assert response.status_code == 400
+        assert data["status"] == "error"
+
+    def test_transactions_newest_first(self, client, app):
+        """Test transactions are paged newest first."""
+        seed_books(1)
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Reader', 0)"))
+        start = datetime(2025, 1, 1)
+        db.session.execute(text("""
+            INSERT INTO transactions (book_id, member_id, issue_date, is_returned, status)
+            VALUES (1, 1, :issue_date, FALSE, 'Issued')
+        """), [{"issue_date": start + timedelta(minutes=i)} for i in range(3)])
+        db.session.commit()
+
+        first = json.loads(client.get("/api/v1/transactions?limit=2").data)
+        second = json.loads(client.get(f"/api/v1/transactions?limit=2&after={first['next_cursor']}").data)
+
+        assert [t["id"] for t in first["data"]] == [3, 2]
+        assert [t["id"] for t in second["data"]] == [1]
+        assert second["next_cursor"] is None
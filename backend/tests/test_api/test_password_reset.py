@@ -2,26 +2,24 @@ import pytest
 import json
 import re
 import jwt
+from email import message_from_string
 from unittest.mock import patch, MagicMock
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.models.user import User
 from app.services.auth_service import AuthService
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.mailer import SmtpSender
+from app.utils import CircuitBreaker
 
 class TestPasswordReset:
     """Tests for password reset functionality."""
 
     @patch('smtplib.SMTP')
     def test_forgot_password(self, mock_smtp, client, app, init_database):
-        """Test forgot password endpoint."""
-        # Mock the environment variables
-        with patch.dict('os.environ', {
-            'EMAIL_USER': 'test@example.com',
-            'EMAIL_PASSWORD': 'test_password',
-            'BASE_SERVER_URL': 'http://localhost:5000'
-        }):
+        """Test forgot password queues the reset email and the outbox sends it."""
+        with patch.dict('os.environ', {'BASE_SERVER_URL': 'http://localhost:5000'}):
             # Setup mock SMTP connection
-            mock_connection = MagicMock()
-            mock_smtp.return_value.__enter__.return_value = mock_connection
+            mock_connection = mock_smtp.return_value
             
             # Prepare request
             payload = {
@@ -41,6 +39,13 @@ class TestPasswordReset:
             assert data["status"] == "success"
             assert "reset" in data["message"].lower()
             
+            # The request only queues the email
+            mock_smtp.assert_not_called()
+            
+            # Deliver the outbox
+            sender = SmtpSender('smtp.example.com', 587, 'test@example.com', 'test_password')
+            EmailOutboxService.deliver_batch(sender, CircuitBreaker('smtp', 5, 60), 10)
+            
             # Verify SMTP was called
             mock_connection.starttls.assert_called_once()
             mock_connection.login.assert_called_once_with('test@example.com', 'test_password')
@@ -48,7 +53,8 @@ class TestPasswordReset:
             
             # Verify email contains reset URL
             send_args = mock_connection.sendmail.call_args[0]
-            email_content = send_args[2]
+            assert send_args[1] == ["test1@example.com"]
+            email_content = message_from_string(send_args[2]).get_payload(decode=True).decode()
             assert "reset your password" in email_content
             reset_url_match = re.search(r'(http://[^\s]+)', email_content)
             assert reset_url_match is not None
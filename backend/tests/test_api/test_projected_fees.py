@@ -0,0 +1,76 @@
+import json
+import random
+import numpy as np
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.services import TransactionService, FeeService
+from app.services.fee_service import project_fees
+
+
+class TestProjectedFees:
+    """Tests for the vectorized fee engine and projected-debt endpoints."""
+
+    def test_matches_calculate_fee(self):
+        """Test vectorized fees equal calculate_fee, including half-cent boundaries."""
+        now = datetime(2026, 10, 16, 12, 0, 0)
+        rng = random.Random(7)
+        issue_dates = [now - timedelta(microseconds=rng.randrange(0, 10 ** 12)) for _ in range(20000)]
+        # Loans whose raw fee lands on or next to half a cent
+        issue_dates += [
+            now - timedelta(minutes=1, seconds=0.3 * k, microseconds=delta)
+            for k in range(1, 2000, 2) for delta in (-1, 0, 1)
+        ]
+
+        fees = project_fees(issue_dates, now)
+
+        expected = [TransactionService.calculate_fee(issued, now) for issued in issue_dates]
+        assert fees.tolist() == expected
+
+    def test_issue_dates_load_exactly(self, app):
+        """Test open-loan issue dates come back from the database to the microsecond."""
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0)"))
+        now = datetime(2026, 10, 16, 12, 0, 0)
+        rng = random.Random(11)
+        issue_dates = [now, datetime(1999, 12, 31, 23, 59, 59, 999999)]
+        issue_dates += [now - timedelta(microseconds=rng.randrange(0, 10 ** 12)) for _ in range(200)]
+        db.session.execute(text("""
+            INSERT INTO transactions (book_id, member_id, issue_date, is_returned, status)
+            VALUES (1, 1, :issue_date, FALSE, 'Issued')
+        """), [{"issue_date": issued} for issued in issue_dates])
+        db.session.commit()
+
+        loaded = FeeService._open_issue_dates(1)
+
+        assert loaded.dtype == np.dtype("datetime64[us]")
+        assert sorted(loaded.tolist()) == sorted(issue_dates)
+
+    def test_projected_debt_endpoint(self, client, app):
+        """Test projected debt adds open-loan fees to the outstanding debt."""
+        db.session.execute(text("""
+            INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 5, 3)
+        """))
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 2.5)"))
+        db.session.execute(text("""
+            INSERT INTO transactions (book_id, member_id, issue_date, is_returned, status)
+            VALUES (1, 1, :issue_date, FALSE, 'Issued')
+        """), [{"issue_date": datetime.now() - timedelta(minutes=11)}, {"issue_date": datetime.now()}])
+        db.session.commit()
+
+        response = client.get("/api/v1/members/1/projected-debt")
+
+        data = json.loads(response.data)["data"]
+        assert response.status_code == 200
+        assert data["open_loans"] == 2
+        assert 10.0 <= data["projected_fees"] < 10.5
+        assert data["projected_debt"] == round(2.5 + data["projected_fees"], 2)
+
+    def test_projected_debt_unknown_member(self, client, app):
+        """Test an unknown member is a 404."""
+        assert client.get("/api/v1/members/99/projected-debt").status_code == 404
+
+    def test_liability_empty(self, client, app):
+        """Test the library-wide liability with no open loans."""
+        data = json.loads(client.get("/api/v1/transactions/liability").data)["data"]
+
+        assert (data["open_loans"], data["projected_fees"]) == (0, 0.0)
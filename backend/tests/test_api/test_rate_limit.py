@@ -0,0 +1,103 @@
+import json
+from unittest.mock import patch
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models.user import User
+from app.utils import MemoryRateLimitStore, SQLiteRateLimitStore
+from app.utils.rate_limit import sliding_window
+
+
+def make_user():
+    db.session.add(User(username="reader", email="reader@example.com", password_hash=generate_password_hash("pw")))
+    db.session.commit()
+
+
+def login(client, email="reader@example.com", password="wrong", ip="10.0.0.1"):
+    return client.post("/api/v1/auth/login", json={"email": email, "password": password},
+                       environ_base={"REMOTE_ADDR": ip})
+
+
+class TestRateLimit:
+    """Tests for the sliding-window limits on auth endpoints."""
+
+    def test_login_over_account_limit_is_429(self, client, app):
+        """Test repeated logins for one account get a 429 with Retry-After."""
+        make_user()
+        app.config["RATELIMIT_LOGIN_ACCOUNT"] = "3/300"
+        for _ in range(3):
+            assert login(client).status_code == 401
+
+        response = login(client)
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert json.loads(response.data)["status"] == "error"
+
+    def test_account_limit_spans_addresses(self, client, app):
+        """Test the per-account limit holds when each attempt comes from a new IP."""
+        make_user()
+        app.config["RATELIMIT_LOGIN_ACCOUNT"] = "2/300"
+        login(client, ip="10.0.0.1")
+        login(client, ip="10.0.0.2")
+
+        assert login(client, ip="10.0.0.3").status_code == 429
+        assert login(client, email="other@example.com", ip="10.0.0.3").status_code == 401
+
+    def test_ip_limit_spans_accounts(self, client, app):
+        """Test the per-IP limit holds when each attempt names a different account."""
+        app.config["RATELIMIT_LOGIN_IP"] = "2/60"
+        login(client, email="a@example.com")
+        login(client, email="b@example.com")
+
+        assert login(client, email="c@example.com").status_code == 429
+        assert login(client, email="c@example.com", ip="10.0.0.9").status_code == 401
+
+    def test_rejected_before_password_check(self, client, app):
+        """Test a limited request does no password hashing."""
+        make_user()
+        app.config["RATELIMIT_LOGIN_ACCOUNT"] = "1/300"
+        login(client)
+
+        with patch("app.services.auth_service.check_password_hash") as check:
+            assert login(client).status_code == 429
+        check.assert_not_called()
+
+    def test_forgot_password_limited_per_account(self, client, app):
+        """Test forgot-password requests are limited per email."""
+        app.config["RATELIMIT_FORGOT_PASSWORD_ACCOUNT"] = "1/3600"
+        body = {"email": "Reader@Example.com"}
+        client.post("/api/v1/auth/forgot-password", json=body)
+
+        response = client.post("/api/v1/auth/forgot-password", json={"email": "reader@example.com"})
+
+        assert response.status_code == 429
+
+    def test_disabled(self, client, app):
+        """Test RATELIMIT_ENABLED=False turns the limits off."""
+        app.config["RATELIMIT_ENABLED"] = False
+        app.config["RATELIMIT_LOGIN_IP"] = "1/60"
+
+        assert login(client).status_code == 401
+        assert login(client).status_code == 401
+
+    def test_window_slides(self):
+        """Test the previous window's hits count in proportion to its overlap."""
+        store = MemoryRateLimitStore()
+        for _ in range(4):
+            assert store.hit("k", 4, 60, now=0)[0]
+        assert store.hit("k", 4, 60, now=30) == (False, 45)
+        # Halfway through the next window, 2 of the 4 old hits still count
+        assert store.hit("k", 4, 60, now=90)[0]
+        assert store.hit("k", 4, 60, now=90)[0]
+        assert not store.hit("k", 4, 60, now=90)[0]
+        assert sliding_window(0, 0, 0, 60, 1) == (True, 0)
+
+    def test_sqlite_store_shared_between_instances(self, tmp_path):
+        """Test two stores on one file, as two workers would have, share counters."""
+        path = str(tmp_path / "limits.db")
+        first, second = SQLiteRateLimitStore(path), SQLiteRateLimitStore(path)
+
+        assert first.hit("k", 2, 60, now=10)[0]
+        assert second.hit("k", 2, 60, now=11)[0]
+        assert first.hit("k", 2, 60, now=12) == (False, 78)
+        assert not second.hit("k", 2, 60, now=12)[0]
@@ -0,0 +1,79 @@
+import json
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.services import TransactionService, ReportService
+
+
+def seed():
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES ('Dune', 'Frank Herbert', 5, 5), ('Emma', 'Jane Austen', 5, 5)
+    """))
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0), ('Grace', 0)"))
+    db.session.commit()
+
+
+def report(client, name, query=""):
+    response = client.get(f"/api/v1/reports/{name}{query}")
+    assert response.status_code == 200
+    return json.loads(response.data)["data"]
+
+
+class TestReports:
+    """Tests for the /reports endpoints and their daily rollups."""
+
+    def test_events_update_rollups(self, client, app):
+        """Test issues and returns are counted in the daily rollups as they happen."""
+        seed()
+        first = TransactionService.issue_book(1, 1).data
+        TransactionService.issue_books(2, [1, 2])
+        TransactionService.return_book(first["id"])
+        TransactionService.return_books([2])
+
+        daily = report(client, "daily")
+        assert [(d["day"], d["issues"], d["returns"]) for d in daily] == [(date.today().isoformat(), 3, 2)]
+
+        top = report(client, "top-books")
+        assert [(b["title"], b["issues"]) for b in top] == [("Dune", 2), ("Emma", 1)]
+
+        members = report(client, "busiest-members", "?limit=1")
+        assert [(m["name"], m["issues"], m["returns"]) for m in members] == [("Grace", 2, 1)]
+
+    def test_rebuild_matches_incremental_counts(self, client, app):
+        """Test a rebuild from transactions reproduces the live rollups and restores lost ones."""
+        seed()
+        first = TransactionService.issue_book(1, 1).data
+        TransactionService.issue_books(2, [1, 2])
+        TransactionService.return_book(first["id"])
+        live = report(client, "daily"), report(client, "top-books"), report(client, "busiest-members")
+
+        db.session.execute(text("DELETE FROM daily_circulation"))
+        db.session.execute(text("DELETE FROM daily_book_issues"))
+        db.session.commit()
+        ReportService.rebuild(date.today() - timedelta(days=1), date.today())
+
+        assert (report(client, "daily"), report(client, "top-books"), report(client, "busiest-members")) == live
+
+    def test_window_filters_days(self, client, app):
+        """Test ?from=&to= limits a report to the given days."""
+        seed()
+        last_week = datetime.now() - timedelta(days=7)
+        db.session.execute(text("""
+            INSERT INTO transactions (book_id, member_id, issue_date, is_returned, status, fee_charged)
+            VALUES (1, 1, :issued, TRUE, 'Returned', 12.5)
+        """), {"issued": last_week})
+        db.session.execute(text("UPDATE transactions SET return_date = :returned"), {"returned": last_week})
+        db.session.commit()
+        ReportService.rebuild(last_week.date(), date.today())
+        TransactionService.issue_book(2, 2)
+
+        day = last_week.date().isoformat()
+        daily = report(client, "daily", f"?from={day}&to={day}")
+        assert [(d["issues"], d["returns"], d["fees_charged"]) for d in daily] == [(1, 1, 12.5)]
+        assert len(report(client, "daily")) == 2
+
+    def test_invalid_window(self, client):
+        """Test an unparseable or inverted date range is rejected."""
+        assert client.get("/api/v1/reports/daily?from=yesterday").status_code == 400
+        assert client.get("/api/v1/reports/top-books?from=2024-02-01&to=2024-01-01").status_code == 400
@@ -0,0 +1,107 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models.user import User
+from app.services.auth_service import AuthService
+
+
+def make_token(app):
+    user = User(username="reader", email="reader@example.com", password_hash=generate_password_hash("pw"))
+    db.session.add(user)
+    db.session.commit()
+    return AuthService.generate_access_token(user.id)
+
+
+def me(client, token):
+    return client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def revoke_elsewhere(token, user_id=1):
+    """Inserts a blocklist row directly, as another worker's logout would."""
+    payload = AuthService.validate_token(token)
+    db.session.execute(text("""
+        INSERT INTO token_blocklist (jti, token_type, user_id, revoked_at, expires_at)
+        VALUES (:jti, 'access', :user_id, :now, :expires_at)
+    """), {"jti": payload["jti"], "user_id": user_id, "now": datetime.now(),
+           "expires_at": datetime.now() + timedelta(hours=1)})
+    db.session.commit()
+
+
+class TestTokenRevocation:
+    """Tests for the in-memory revoked-token set behind token_required."""
+
+    def test_authenticated_requests_skip_the_blocklist(self, client, app):
+        """Test a valid token is checked without querying token_blocklist once the set is loaded."""
+        token = make_token(app)
+        me(client, token)
+        app.extensions["revoked_tokens"].poll_interval = 3600
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            for _ in range(3):
+                assert AuthService.validate_token(token) is not None
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert not [s for s in statements if "token_blocklist" in s]
+
+    def test_logout_revokes_immediately(self, client, app):
+        """Test a logged-out token is rejected at once, even between polls."""
+        token = make_token(app)
+        app.extensions["revoked_tokens"].poll_interval = 3600
+        assert me(client, token).status_code == 200
+
+        assert client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+        assert me(client, token).status_code == 401
+
+    def test_revocation_from_another_worker_is_picked_up(self, client, app):
+        """Test the since-id poll picks up blocklist rows written elsewhere."""
+        token = make_token(app)
+        revoked = app.extensions["revoked_tokens"]
+        assert me(client, token).status_code == 200
+
+        revoke_elsewhere(token)
+        revoked.refresh()
+
+        assert me(client, token).status_code == 401
+        assert len(revoked) == 1
+
+    def test_expired_entries_are_dropped(self, client, app):
+        """Test blocklist rows for already-expired tokens are not kept in memory."""
+        make_token(app)
+        db.session.execute(text("""
+            INSERT INTO token_blocklist (jti, token_type, user_id, revoked_at, expires_at)
+            VALUES (:jti, 'access', 1, :now, :now)
+        """), {"jti": str(uuid.uuid4()), "now": datetime.now() - timedelta(minutes=1)})
+        db.session.commit()
+
+        app.extensions["revoked_tokens"].refresh()
+
+        assert len(app.extensions["revoked_tokens"]) == 0
+
+    def test_out_of_order_commit_is_picked_up(self, app):
+        """Test a row committed after a higher id was already polled is still loaded."""
+        db.session.add(User(username="reader", email="reader@example.com", password_hash="x"))
+        db.session.commit()
+        revoked = app.extensions["revoked_tokens"]
+        insert = text("""
+            INSERT INTO token_blocklist (id, jti, token_type, user_id, revoked_at, expires_at)
+            VALUES (:id, :jti, 'access', 1, :now, :expires_at)
+        """)
+        params = {"now": datetime.now(), "expires_at": datetime.now() + timedelta(hours=1)}
+
+        # Logout B gets id 2 but commits before logout A, which holds id 1
+        db.session.execute(insert, dict(params, id=2, jti="second"))
+        db.session.commit()
+        revoked.refresh()
+        db.session.execute(insert, dict(params, id=1, jti="first"))
+        db.session.commit()
+        revoked.refresh()
+
+        assert revoked.is_revoked("first") and revoked.is_revoked("second")
+        assert len(revoked) == 2
@@ -0,0 +1,104 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+
+
+def seed():
+    """Two books, two members and four loans of varying age and state."""
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES ('Dune', 'Frank Herbert', 5, 5), ('Emma', 'Jane Austen', 5, 5)
+    """))
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 0), ('Grace', 0)"))
+    now = datetime.now()
+    db.session.execute(text("""
+        INSERT INTO transactions (book_id, member_id, issue_date, return_date, fee_charged, is_returned, status)
+        VALUES (:book_id, :member_id, :issue_date, :return_date, 0, :is_returned, :status)
+    """), [
+        {"book_id": 1, "member_id": 1, "issue_date": now - timedelta(days=10),
+         "return_date": now - timedelta(days=9), "is_returned": True, "status": "Returned"},
+        {"book_id": 2, "member_id": 1, "issue_date": now - timedelta(days=3),
+         "return_date": None, "is_returned": False, "status": "Issued"},
+        {"book_id": 1, "member_id": 2, "issue_date": now - timedelta(days=2),
+         "return_date": None, "is_returned": False, "status": "Issued"},
+        {"book_id": 2, "member_id": 2, "issue_date": now,
+         "return_date": None, "is_returned": False, "status": "Issued"},
+    ])
+    db.session.commit()
+
+
+def ids(response):
+    return [transaction["id"] for transaction in json.loads(response.data)["data"]]
+
+
+class TestTransactionFilters:
+    """Tests for server-side filtering of the transactions feed."""
+
+    def test_filter_by_member_and_open(self, client, app):
+        """Test member_id and is_returned combine."""
+        seed()
+
+        response = client.get("/api/v1/transactions?member_id=1&is_returned=false")
+
+        assert response.status_code == 200
+        assert ids(response) == [2]
+
+    def test_filter_by_status_and_book(self, client, app):
+        """Test status and book_id filters."""
+        seed()
+
+        assert ids(client.get("/api/v1/transactions?status=Returned")) == [1]
+        assert ids(client.get("/api/v1/transactions?book_id=1")) == [3, 1]
+
+    def test_issue_date_range(self, client, app):
+        """Test the issue date range is inclusive and applied in SQL."""
+        seed()
+        since = (datetime.now() - timedelta(days=4)).isoformat()
+        until = (datetime.now() - timedelta(days=1)).isoformat()
+
+        response = client.get(f"/api/v1/transactions?issued_from={since}&issued_to={until}")
+
+        assert ids(response) == [3, 2]
+
+    def test_date_only_bounds_cover_whole_day(self, client, app):
+        """Test a date-only issued_to includes loans issued later that day."""
+        seed()
+        today = datetime.now().date().isoformat()
+        two_days_ago = (datetime.now() - timedelta(days=2)).date().isoformat()
+
+        assert ids(client.get(f"/api/v1/transactions?issued_from={today}&issued_to={today}")) == [4]
+        assert ids(client.get(f"/api/v1/transactions?issued_to={two_days_ago}")) == [3, 2, 1]
+        assert ids(client.get(f"/api/v1/transactions?issued_from={two_days_ago}")) == [4, 3]
+
+    def test_overdue_only(self, client, app):
+        """Test overdue=true returns open loans past the loan period."""
+        seed()
+
+        assert ids(client.get("/api/v1/transactions?overdue=true")) == [3, 2]
+
+    def test_overdue_is_never_answered_with_304(self, client, app):
+        """Test ?overdue=true skips the ETag, since loans fall due without any write."""
+        seed()
+        plain = client.get("/api/v1/transactions")
+
+        response = client.get("/api/v1/transactions?overdue=true", headers={"If-None-Match": "*"})
+
+        assert "ETag" in plain.headers
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+    def test_filtered_pages_ascending(self, client, app):
+        """Test filters combine with ascending keyset pagination."""
+        seed()
+
+        first = json.loads(client.get("/api/v1/transactions?is_returned=false&order=asc&limit=2").data)
+        second = client.get(f"/api/v1/transactions?is_returned=false&order=asc&limit=2&after={first['next_cursor']}")
+
+        assert [transaction["id"] for transaction in first["data"]] == [2, 3]
+        assert ids(second) == [4]
+
+    def test_invalid_filter(self, client, app):
+        """Test invalid filter values are rejected."""
+        assert client.get("/api/v1/transactions?status=Lost").status_code == 400
+        assert client.get("/api/v1/transactions?issued_from=yesterday").status_code == 400
@@ -0,0 +1,108 @@
+import json
+import threading
+from sqlalchemy import text
+from app.extensions import db
+from app.services import TransactionService
+
+
+def seed(stock=1, debt=0):
+    db.session.execute(text("""
+        INSERT INTO books (title, author, total_stock, available_stock)
+        VALUES ('Dune', 'Frank Herbert', :stock, :stock)
+    """), {"stock": stock})
+    db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', :debt)"), {"debt": debt})
+    db.session.commit()
+
+
+def issue(client, book_id=1, member_id=1):
+    return client.post(
+        "/api/v1/transactions/issue",
+        data=json.dumps({"book_id": book_id, "member_id": member_id}),
+        content_type="application/json"
+    )
+
+
+def available_stock(book_id=1):
+    return db.session.execute(text("SELECT available_stock FROM books WHERE id = :id"), {"id": book_id}).scalar()
+
+
+class TestIssueReturnAPI:
+    """Tests for issuing and returning books."""
+
+    def test_issue_decrements_stock(self, client, app):
+        """Test a successful issue takes one copy."""
+        seed(stock=2)
+
+        response = issue(client)
+
+        assert response.status_code == 201
+        assert available_stock() == 1
+
+    def test_issue_last_copy_only_once(self, client, app):
+        """Test the last copy cannot be issued twice."""
+        seed(stock=1)
+
+        first = issue(client)
+        second = issue(client)
+
+        data = json.loads(second.data)
+        assert first.status_code == 201
+        assert second.status_code == 400
+        assert data["message"] == "Book not available."
+        assert available_stock() == 0
+
+    def test_issue_blocked_by_debt(self, client, app):
+        """Test members over the debt limit cannot borrow and stock is untouched."""
+        seed(stock=1, debt=600)
+
+        response = issue(client)
+
+        data = json.loads(response.data)
+        assert response.status_code == 400
+        assert "outstanding debt" in data["message"]
+        assert available_stock() == 1
+
+    def test_issue_unknown_member(self, client, app):
+        """Test issuing to a missing member returns 404."""
+        seed(stock=1)
+
+        response = issue(client, member_id=99)
+
+        assert response.status_code == 404
+        assert available_stock() == 1
+
+    def test_return_restocks_once(self, client, app):
+        """Test a loan can only be returned once."""
+        seed(stock=1)
+        issue(client)
+
+        first = client.post("/api/v1/transactions/return/1")
+        second = client.post("/api/v1/transactions/return/1")
+
+        assert first.status_code == 200
+        assert second.status_code == 400
+        assert json.loads(second.data)["message"] == "Book already returned."
+        assert available_stock() == 1
+
+    def test_concurrent_issues_never_oversell(self, app):
+        """Test parallel checkouts of a title never issue more copies than exist."""
+        seed(stock=3)
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES (:name, 0)"),
+                           [{"name": f"Reader {i}"} for i in range(10)])
+        db.session.commit()
+        results = []
+
+        def checkout(member_id):
+            with app.app_context():
+                results.append(TransactionService.issue_book(1, member_id).ok)
+                db.session.remove()
+
+        threads = [threading.Thread(target=checkout, args=(i + 1,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        open_loans = db.session.execute(text("SELECT COUNT(*) FROM transactions WHERE is_returned = FALSE")).scalar()
+        assert results.count(True) == open_loans <= 3
+        assert available_stock() == 3 - open_loans
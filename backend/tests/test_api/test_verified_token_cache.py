@@ -0,0 +1,82 @@
+import hashlib
+import time
+from unittest.mock import patch
+import jwt
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.services.entity_cache import verified_token_cache
+
+
+def make_user():
+    user = User(username="reader", email="reader@example.com", password_hash=generate_password_hash("pw"))
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def counting_decode():
+    return patch("app.services.auth_service.jwt.decode", wraps=jwt.decode)
+
+
+class TestVerifiedTokenCache:
+    """Tests for the cache of verified JWT payloads."""
+
+    def test_repeat_requests_verify_once(self, client, app):
+        """Test a token's signature is checked on the first request only."""
+        token = AuthService.generate_access_token(make_user().id)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        with counting_decode() as decode:
+            for _ in range(3):
+                assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        assert decode.call_count == 1
+
+    def test_cached_token_still_checks_revocation(self, client, app):
+        """Test a cached token is rejected once it is logged out."""
+        token = AuthService.generate_access_token(make_user().id)
+        headers = {"Authorization": f"Bearer {token}"}
+        client.get("/api/v1/auth/me", headers=headers)
+
+        with counting_decode() as decode:
+            assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+            assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+        decode.assert_not_called()
+
+    def test_tampered_token_is_verified(self, client, app):
+        """Test a token differing from a cached one is verified and rejected."""
+        token = AuthService.generate_access_token(make_user().id)
+        AuthService.validate_token(token)
+
+        assert AuthService.validate_token(token[:-2] + ("AA" if token[-2:] != "AA" else "BB")) is None
+
+    def test_entry_expires_with_token(self, app):
+        """Test entries live until the token's exp, and expired tokens are not cached."""
+        now = time.time()
+        short = jwt.encode({"sub": "1", "type": "access", "exp": int(now) + 120},
+                           AuthService.JWT_SECRET, algorithm=AuthService.JWT_ALGORITHM)
+        expired = jwt.encode({"sub": "1", "type": "access", "exp": int(now) - 10},
+                             AuthService.JWT_SECRET, algorithm=AuthService.JWT_ALGORITHM)
+
+        assert AuthService.validate_token(short) is not None
+        assert AuthService.validate_token(expired) is None
+        assert verified_token_cache.stats()["size"] == 1
+
+        later = time.monotonic() + 121
+        with patch("app.utils.cache.time.monotonic", return_value=later):
+            assert verified_token_cache.get(
+                hashlib.sha256(short.encode()).hexdigest()) is None
+
+    def test_reset_form_and_reset_share_cache(self, client, app):
+        """Test the reset form and the reset itself verify the token once."""
+        token = AuthService.generate_password_reset_token(make_user().id)
+
+        with counting_decode() as decode:
+            assert client.get(f"/api/v1/auth/reset-password/{token}").status_code == 200
+            response = client.post("/api/v1/auth/reset-password",
+                                   json={"reset_token": token, "new_password": "new-pw"})
+
+        assert response.status_code == 200
+        assert decode.call_count == 1
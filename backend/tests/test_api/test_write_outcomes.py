@@ -0,0 +1,97 @@
+import json
+from sqlalchemy import text
+from app.extensions import db
+
+
+def post_json(client, url, body, method="post"):
+    return getattr(client, method)(url, data=json.dumps(body), content_type="application/json")
+
+
+class TestWriteOutcomesAPI:
+    """Tests for write endpoints returning the written row and a typed failure."""
+
+    def test_create_book_returns_row(self, client, app):
+        """Test creating a book returns the inserted row with its id and stock."""
+        response = post_json(client, "/api/v1/books", {"title": "Dune", "author": "Frank Herbert", "total_stock": 3})
+
+        data = json.loads(response.data)
+        assert response.status_code == 201
+        assert data["data"]["id"] == 1
+        assert data["data"]["available_stock"] == 3
+
+    def test_create_book_duplicate_isbn_conflicts(self, client, app):
+        """Test a duplicate ISBN is reported as 409 Conflict."""
+        book = {"title": "Dune", "author": "Frank Herbert", "total_stock": 1, "isbn": "111"}
+        post_json(client, "/api/v1/books", book)
+
+        response = post_json(client, "/api/v1/books", book)
+
+        assert response.status_code == 409
+
+    def test_update_book_returns_row(self, client, app):
+        """Test updating total_stock returns the row with adjusted availability."""
+        db.session.execute(text("""
+            INSERT INTO books (title, author, total_stock, available_stock) VALUES ('Dune', 'Frank Herbert', 3, 1)
+        """))
+        db.session.commit()
+
+        response = post_json(client, "/api/v1/books/1", {"total_stock": 5}, method="put")
+
+        data = json.loads(response.data)["data"]
+        assert response.status_code == 200
+        assert (data["total_stock"], data["available_stock"]) == (5, 3)
+
+    def test_update_missing_book(self, client, app):
+        """Test updating an unknown book is a 404."""
+        response = post_json(client, "/api/v1/books/99", {"title": "Nope"}, method="put")
+
+        assert response.status_code == 404
+
+    def test_delete_book_with_open_loan(self, client, app):
+        """Test a book with an open loan cannot be deleted."""
+        post_json(client, "/api/v1/books", {"title": "Dune", "author": "Frank Herbert", "total_stock": 1})
+        post_json(client, "/api/v1/members", {"name": "Ada"})
+        post_json(client, "/api/v1/transactions/issue", {"book_id": 1, "member_id": 1})
+
+        response = client.delete("/api/v1/books/1")
+
+        assert response.status_code == 400
+        assert "issued" in json.loads(response.data)["message"]
+
+    def test_delete_member_with_debt(self, client, app):
+        """Test a member who owes money cannot be deleted."""
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 12.5)"))
+        db.session.commit()
+
+        response = client.delete("/api/v1/members/1")
+
+        assert response.status_code == 400
+        assert "Outstanding debt" in json.loads(response.data)["message"]
+
+    def test_delete_missing_member(self, client, app):
+        """Test deleting an unknown member is a 404."""
+        response = client.delete("/api/v1/members/99")
+
+        assert response.status_code == 404
+
+    def test_payment_returns_member(self, client, app):
+        """Test a payment returns the member with the reduced debt."""
+        db.session.execute(text("INSERT INTO members (name, outstanding_debt) VALUES ('Ada', 30)"))
+        db.session.commit()
+
+        response = post_json(client, "/api/v1/members/1/payment", {"amount": 20})
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert float(data["data"]["outstanding_debt"]) == 10
+
+    def test_issue_returns_transaction(self, client, app):
+        """Test issuing a book returns the new transaction row."""
+        post_json(client, "/api/v1/books", {"title": "Dune", "author": "Frank Herbert", "total_stock": 1})
+        post_json(client, "/api/v1/members", {"name": "Ada"})
+
+        response = post_json(client, "/api/v1/transactions/issue", {"book_id": 1, "member_id": 1})
+
+        data = json.loads(response.data)["data"]
+        assert response.status_code == 201
+        assert (data["id"], data["book_id"], data["status"]) == (1, 1, "Issued")